@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import plotly.express as px
@@ -162,6 +163,69 @@ def plot_most_frequent_codes(df:pd.DataFrame, highlight_code:str, interval="D"):
 
     return fig #, df_code_groups, ranking
 
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: picks the row indices of `max_points` points that keep the
+    visual shape of the series. The first and last points are always kept."""
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    # Interior points are split into max_points - 2 buckets of (nearly) equal size
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    indices = np.empty(max_points, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    previous = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        # Third vertex: average of the next bucket (or the last point)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[end:next_end].mean() if next_end > end else x[-1]
+        next_y = y[end:next_end].mean() if next_end > end else y[-1]
+
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        indices[i + 1] = previous
+    return indices
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Keeps the minimum and maximum of each of (max_points - 2) / 2 equal buckets, plus the first
+    and last points, so every peak survives."""
+    n = len(y)
+    if max_points >= n or max_points < 4:
+        return np.arange(n)
+
+    buckets = np.linspace(0, (max_points - 2) // 2, n, endpoint=False).astype(int)
+    grouped = pd.Series(y).groupby(buckets)
+    return np.unique(np.concatenate([grouped.idxmax(), grouped.idxmin(), [0, n - 1]]))
+
+def downsample_series(df: pd.DataFrame, max_points: int, method: str = "minmax") -> pd.DataFrame:
+    """Reduces a timestamp/frequency series to at most about `max_points` rows before plotting.
+
+    Args:
+        df (pd.DataFrame): Series sorted by timestamp
+        max_points (int): Point budget. 0 or a budget larger than the series returns it unchanged.
+        method (str, optional): "minmax" (keeps each bucket's minimum and maximum) or "lttb"
+            (Largest-Triangle-Three-Buckets, smoother but slower). Defaults to "minmax".
+
+    Returns:
+        pd.DataFrame: The selected rows, in timestamp order
+    """
+    if max_points <= 0 or len(df) <= max_points:
+        return df
+
+    y = df['frequency'].to_numpy(dtype=float)
+    if method == "lttb":
+        x = pd.to_datetime(df['timestamp']).to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(float)
+        indices = lttb_indices(x, y, max_points)
+    elif method == "minmax":
+        indices = minmax_indices(y, max_points)
+    else:
+        raise ValueError(f"Unsupported downsampling method: {method}. Use 'lttb' or 'minmax'.")
+    return df.iloc[indices].reset_index(drop=True)
+
 def generate_plot(df:pd.DataFrame, code:str, interval="D"):
     """Returns a plotly line graph of all the searches containing a given code.
 
@@ -226,48 +290,48 @@ def generate_plot(df:pd.DataFrame, code:str, interval="D"):
 
     return fig, df
 
+DAY_NAMES = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+# Heatmap rows from the bottom up, so Monday is at the top
+HEATMAP_ROW_DOWS = np.array([0, 6, 5, 4, 3, 2, 1])
+
+def hourly_matrix(df) -> np.ndarray:
+    """Returns a 7x24 matrix of searches indexed by [dow, hour] (0 = Sunday) from long-form dow/hour/frequency rows"""
+    matrix = np.zeros((7, 24))
+    if len(df):
+        np.add.at(
+            matrix,
+            (df['dow'].to_numpy(dtype=int), df['hour'].to_numpy(dtype=int)),
+            df['frequency'].to_numpy(dtype=float),
+        )
+    return matrix
+
 def gen_hourly_heatmap(df, code=None):
+    """Returns a heatmap of searches per hour of the week.
+
+    Args:
+        df (pd.DataFrame): Searches per dow (0 = Sunday), hour and frequency
+        code (str, optional): Course code the searches were filtered to, shown in the title
+
+    Returns:
+        go.Figure: 7x24 heatmap with Monday at the top
     """
-    """
-    grid = pd.MultiIndex.from_product(
-        [range(7), range(24)],
-        names=['dow', 'hour']
-    ).to_frame(index=False)
-
-    # Right/left join doesn’t matter here as long as grid is preserved
-    heatmap_data = pd.merge(grid, df, how='left', on=['dow', 'hour'])
-    heatmap_data['frequency'] = heatmap_data['frequency'].fillna(0)
-
-    # Map dow → day name and set display order
-    dow_to_name = {
-        0: 'Sunday',
-        1: 'Monday',
-        2: 'Tuesday',
-        3: 'Wednesday',
-        4: 'Thursday',
-        5: 'Friday',
-        6: 'Saturday',
-    }
-    heatmap_data['day_of_week'] = heatmap_data['dow'].map(dow_to_name)
-
-    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    day_order.reverse()  # if you still want Monday at top
+    z = hourly_matrix(df)[HEATMAP_ROW_DOWS]
+    day_names = [DAY_NAMES[dow] for dow in HEATMAP_ROW_DOWS]
 
     fig = go.Figure(data=go.Heatmap(
-        z=heatmap_data['frequency'],
-        x=heatmap_data['hour'],
-        y=heatmap_data['day_of_week'],
-        hovertemplate='%{text}<extra></extra>',
-        text=heatmap_data.apply(lambda row: f"{row['frequency']} searches on {row['day_of_week']} at {row['hour']}:00", axis=1),
+        z=z,
+        x=list(range(24)),
+        y=day_names,
+        hovertemplate='%{z} searches on %{y} at %{x}:00<extra></extra>',
         colorscale='thermal',
-        colorbar=dict(title='', tickvals=[heatmap_data['frequency'].min(), heatmap_data['frequency'].max()], ticktext=['Less', 'More']),  # Change colorbar labels
+        colorbar=dict(title='', tickvals=[z.min(), z.max()], ticktext=['Less', 'More']),  # Change colorbar labels
     ))
 
     # Customize layout
     fig.update_layout(
-        title='Searches Throughout The Week',
+        title='Searches Throughout The Week' if code is None else f'{code} Searches Throughout The Week',
         xaxis=dict(title='Hour', tickvals=list(range(0, 24, 3))),
-        yaxis=dict(title='Day Of Week', categoryorder='array', categoryarray=day_order),
+        yaxis=dict(title='Day Of Week'),
         font=dict(family='Arial', size=14, color='black'),
         margin=dict(l=40, r=20),
         hoverlabel=dict(
@@ -411,11 +475,10 @@ def get_buttons(page):
                               className="content-font", style={'margin-right': '10px',
                                                                "border-radius": '10px', 
                                                                'background-color':'#0D6DCD'}))
-    if page != 'hourly-':
-        buttons.append(dbc.Button('Course: None', id=f'{page}course-btn', 
-                                n_clicks=0, 
-                                className="content-font", 
-                                style={'margin-right': '10px',"border-radius": '10px', 'background-color':'#0D6DCD'}))
+    buttons.append(dbc.Button('Course: None', id=f'{page}course-btn', 
+                              n_clicks=0, 
+                              className="content-font", 
+                              style={'margin-right': '10px',"border-radius": '10px', 'background-color':'#0D6DCD'}))
     if page not in ["course-", "hourly-"]:
         buttons.append(dbc.Button('Aggregate: Daily', 
                                   id=f'{page}aggregate-btn',
@@ -8,18 +8,25 @@ from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_limiter.errors import RateLimitExceeded
 from get_assessment import *
+from scrape_engine import get_assessments
 from log_events import *
 from sqlalchemy import exc
 from os import path
 from ast import literal_eval as make_tuple
 import os
+import json
+import hashlib
+from datetime import date
 from pathlib import Path
 import ipaddress
 from dotenv import load_dotenv
-from flask_cache import cache, get_semester_list, get_cached_df, get_announcement, init_cache
+from flask_cache import cache, get_semester_list, get_cached_df, get_announcement, init_cache, get_cache_stats
 from dash_app import create_dash_app
-from db_connection import db, Course, SearchLogs, create_database, run_startup_migrations
-import requests
+from db_connection import db, Course, SearchLogs, create_database, run_startup_migrations, assessments_to_json, assessments_from_json, get_courses_by_key, get_existing_course_keys, ensure_search_log_partitions
+from single_flight import SingleFlight
+from course_index import course_index
+from search_rollup import search_rollup
+import http_client
 
 
 load_dotenv()
@@ -43,6 +50,8 @@ COURSE_PROFILE_PROXY_URL = os.getenv("COURSE_PROFILE_PROXY_URL", "")
 db.init_app(app)
 create_database(app=app)
 run_startup_migrations(app=app)
+ensure_search_log_partitions(app)
+course_index.init_app(app)
 dash_app = create_dash_app(app)
 
 @app.route('/dash', methods=['GET'])
@@ -64,16 +73,48 @@ def redirect_dash():
 
     return redirect('/')
 
+NEGATIVE_CACHE_TIMEOUT = 300 # Short, so a newly published course profile is picked up quickly
+
+# Concurrent cache misses for the same course share a single DB lookup/scrape
+course_flight = SingleFlight()
+
+def negative_course_cache_key(code:str, semester, year, section_code:str=None):
+    return f"course_error:{code.upper()}:{int(semester)}:{int(year)}:{section_code}"
+
 @cache.memoize(timeout=86400) # Unlikely for a course weighting to change
 def get_course(code:str, semester:str, year:str, section_code:str=None):
     code=code.upper()
+    error_key = negative_course_cache_key(code, semester, year, section_code)
+
+    # Repeat lookups of a course we recently failed to resolve fail fast instead of
+    # going through the DB, proxy and scraper again
+    cached_error = cache.get(error_key)
+    if cached_error == "missing":
+        raise CourseMissingError(code)
+    if cached_error == "incorrect_profile":
+        raise IncorrectCourseProfileError(code, int(semester), int(year))
+
+    try:
+        flight_key = (code, int(semester), int(year), section_code)
+        return course_flight.do(flight_key, load_course, code, semester, year, section_code)
+    except CourseMissingError:
+        cache.set(error_key, "missing", timeout=NEGATIVE_CACHE_TIMEOUT)
+        raise
+    except IncorrectCourseProfileError:
+        cache.set(error_key, "incorrect_profile", timeout=NEGATIVE_CACHE_TIMEOUT)
+        raise
+
+def load_course(code:str, semester:str, year:str, section_code:str=None):
     sem = int(semester)
     yr = int(year)
     
     # Check if we have existing db entry for this course
     found_course = db.session.query(Course).filter_by(code=code, year=yr, semester=sem).first()
     if found_course:
-        return make_tuple(found_course.asmts)
+        course_index.add(code, sem, yr)
+        if found_course.assessments is not None:
+            return assessments_from_json(found_course.assessments)
+        return make_tuple(found_course.asmts) # Legacy row that has not been backfilled yet
     if section_code is None:
         if not COURSE_PROFILE_PROXY_URL:
             raise CourseMissingError(code)
@@ -89,8 +130,7 @@ def get_course(code:str, semester:str, year:str, section_code:str=None):
         
     
     weightings = get_assessments(code, semester, year, section_code)
-    db_asmts = str(weightings)
-    new_course = Course(code=code, semester=sem, year=yr, asmts=db_asmts)
+    new_course = Course(code=code, semester=sem, year=yr, assessments=assessments_to_json(weightings))
     
     # Sometimes error occurs due to unique constraint, we don't care about
     # it, so we just pass it.
@@ -99,6 +139,10 @@ def get_course(code:str, semester:str, year:str, section_code:str=None):
         db.session.commit()
     except exc.IntegrityError as e:
         pass
+    course_index.add(code, sem, yr)
+
+    # The course now resolves without a course profile URL too
+    cache.delete(negative_course_cache_key(code, semester, year))
     return weightings
 
 def is_valid_course_code(code):
@@ -112,6 +156,9 @@ def course_exists_for_semester_id(course_code, semester_id):
         return False
     year = int(semester_id.split("S")[0])
     semester = int(semester_id.split("S")[1])
+    exists = course_index.contains(course_code, semester, year)
+    if exists is not None:
+        return exists
     return db.session.query(Course).filter_by(code=course_code, year=year, semester=semester).first() is not None
 
 def is_valid_course_profile_url(url):
@@ -137,7 +184,7 @@ def fetch_course_profile_url_from_proxy(course_code, semester, year):
 
     try:
         semester_id = f"{year}S{semester}"
-        response = requests.get(
+        response = http_client.get(
             COURSE_PROFILE_PROXY_URL,
             params={"courseCode": course_code, "semester": semester_id},
             timeout=10,
@@ -154,6 +201,59 @@ def fetch_course_profile_url_from_proxy(course_code, semester, year):
 
     return None
 
+COURSE_RESPONSE_TIMEOUT = 86400
+
+def build_course_response_body(course_code:str, semester_id:str, weightings):
+    """Serialise a successful /api/getcourse/ payload once, returning (body bytes, ETag)"""
+    payload = {
+        'success': True,
+        'courseCode': course_code,
+        'semesterId': semester_id,
+        'assessmentItems': [{"title": w[0], "weight": w[1]} for w in weightings],
+    }
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    return body, etag
+
+def get_course_cache_max_age(semester:int, year:int, today:date=None):
+    """Returns how long (seconds) browsers and CDNs may reuse a course response.
+
+    Weightings for a finished semester are final, so they can be kept for a week.
+    Current and upcoming semesters may still have their course profile edited.
+    """
+    today = today or date.today()
+    match semester:
+        case 1:
+            semester_end = date(year, 7, 31)
+        case 2:
+            semester_end = date(year, 12, 31)
+        case _:
+            semester_end = date(year + 1, 2, 28)
+
+    if today > semester_end:
+        return 60*60*24*7
+    return 60*60
+
+def make_course_response(body:bytes, etag:str, max_age:int):
+    """Wrap a pre-serialised course payload, answering 304 when the client's ETag still matches"""
+    response = app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response.make_conditional(request)
+
+def get_course_error(e:Exception, course_code:str, semester:str, year:str):
+    """Map an exception raised while resolving a course to the (error payload, HTTP status) the API returns"""
+    if isinstance(e, CourseMissingError):
+        return {'success': False, 'error': '', 'showURLRequest': True}, 404
+    if isinstance(e, (CourseNotFoundError, WrongSemesterError)):
+        return {'success': False, 'error': str(e.message)}, 400
+    if isinstance(e, IncorrectCourseProfileError):
+        return {'success': False, 'error': str(e.message), 'showURLRequest': True}, 400
+
+    log_error(e, course_code, semester, year)
+    return {'success': False, 'error': DEFAULT_INVALID_TEXT}, 400
+
 @app.errorhandler(RateLimitExceeded)
 def handle_ratelimit(e):
     return jsonify({
@@ -195,44 +295,121 @@ def api_get_course():
     semester = semester_id.split("S")[1]
 
     try:
+        section_code = None
         if len(course_profile_url) > 0:
             section_code = get_section_code_from_url(course_profile_url, course_code, semester, year)
-            weightings = get_course(course_code, semester, year, section_code=section_code)
-            assessment_items = []
-            for w in weightings:
-                assessment_items.append({"title": w[0], "weight": w[1]})
-            log_search(course_code, semester, year, THIS_FOLDER, app.config['ENABLE_LOGGING'])
-
-            return jsonify({
-                'success': True,
-                'courseCode': course_code,
-                'semesterId': semester_id,
-                'assessmentItems': assessment_items
-            })
-        else:
-            weightings = get_course(course_code, semester, year)
-            assessment_items = []
-            for w in weightings:
-                assessment_items.append({"title": w[0], "weight": w[1]})
-            log_search(course_code, semester, year, THIS_FOLDER, app.config['ENABLE_LOGGING'])
-
-            return jsonify({
-                'success': True,
-                'courseCode': course_code,
-                'semesterId': semester_id,
-                'assessmentItems': assessment_items
-            })
-    except CourseMissingError as e:
-        return jsonify({'success': False, 'error': '', 'showURLRequest': True}), 404
-    except CourseNotFoundError as e:
-        return jsonify({'success': False, 'error': str(e.message)}), 400
-    except WrongSemesterError as e:
-        return jsonify({'success': False, 'error': str(e.message)}), 400
-    except IncorrectCourseProfileError as e:
-        return jsonify({'success': False, 'error': str(e.message), 'showURLRequest': True}), 400
+
+        response_key = f"course_response:{course_code}:{semester_id}"
+        cached_response = cache.get(response_key)
+        if cached_response is None:
+            if section_code is not None:
+                weightings = get_course(course_code, semester, year, section_code=section_code)
+            else:
+                weightings = get_course(course_code, semester, year)
+            cached_response = build_course_response_body(course_code, semester_id, weightings)
+            # An empty table prompts the user for a course profile URL, so don't pin it
+            if weightings:
+                cache.set(response_key, cached_response, timeout=COURSE_RESPONSE_TIMEOUT)
+        # Cached responses may come from another worker, whose store this index hasn't seen yet
+        course_index.add(course_code, semester, year)
+
+        log_search(course_code, semester, year, THIS_FOLDER, app.config['ENABLE_LOGGING'])
+
+        body, etag = cached_response
+        return make_course_response(body, etag, get_course_cache_max_age(int(semester), int(year)))
     except Exception as e:
-        log_error(e, course_code, semester, year)
-        return jsonify({'success': False, 'error': DEFAULT_INVALID_TEXT}), 400
+        error, status = get_course_error(e, course_code, semester, year)
+        return jsonify(error), status
+
+MAX_BATCH_COLD_FETCHES = 1 # Keeps one batch request to at most one upstream scrape
+
+@app.route('/api/getcourses/', methods=['POST'])
+@cross_origin(origins=["https://www.uqmarks.com", "https://uqmarks.com", "http://localhost:5173", "http://127.0.0.1:5000/"])
+@limiter.limit("30/minute")
+def api_get_courses():
+    """Resolve several (courseCode, semesterId) pairs at once, e.g. to restore every saved card.
+
+    Stored courses are fetched with one query. At most MAX_BATCH_COLD_FETCHES other courses
+    go through get_course, since each may scrape upstream; the rest are reported with
+    'fetchIndividually' so the client can request them from /api/getcourse/ instead.
+    Each entry in 'results' reports its own success or error.
+
+    The Vue frontend doesn't call this: Home.vue restores saved cards from the cookie without
+    any request, and only fetches a course when a card is added.
+    """
+    max_entries = 10
+    payload = request.get_json(silent=True)
+    if payload is None:
+        payload = {}
+    if not isinstance(payload, dict):
+        return jsonify({'success': False, 'error': 'Invalid JSON payload.'}), 400
+
+    entries = payload.get("courses", [])
+
+    if not isinstance(entries, list):
+        return jsonify({'success': False, 'error': 'Invalid courses payload.'}), 400
+
+    if len(entries) > max_entries:
+        return jsonify({'success': False, 'error': f'Maximum {max_entries} courses per request.'}), 400
+
+    requested = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        course_code = str(entry.get("courseCode", "")).upper()
+        semester_id = str(entry.get("semesterId", ""))
+        if (course_code, semester_id) not in requested:
+            requested.append((course_code, semester_id))
+
+    valid_keys = [
+        (course_code, int(semester_id.split("S")[1]), int(semester_id.split("S")[0]))
+        for course_code, semester_id in requested
+        if is_valid_course_code(course_code) and is_valid_semester_id(semester_id)
+    ]
+    stored_courses = get_courses_by_key(valid_keys)
+
+    results = []
+    searches = []
+    cold_fetches = 0
+    for course_code, semester_id in requested:
+        result = {'courseCode': course_code, 'semesterId': semester_id}
+        if not is_valid_course_code(course_code) or not is_valid_semester_id(semester_id):
+            results.append({**result, 'success': False, 'error': 'Invalid course code or semester', 'status': 400})
+            continue
+
+        year, semester = semester_id.split("S", 1)
+        weightings = stored_courses.get((course_code, int(semester), int(year)))
+        # Courses we recently failed to resolve fail fast in get_course, so they don't count
+        if weightings is None and cache.get(negative_course_cache_key(course_code, semester, year)) is None:
+            if cold_fetches >= MAX_BATCH_COLD_FETCHES:
+                results.append({
+                    **result,
+                    'success': False,
+                    'error': 'Course is not cached yet, fetch it individually.',
+                    'fetchIndividually': True,
+                    'status': 202,
+                })
+                continue
+            cold_fetches += 1
+
+        try:
+            if weightings is None:
+                weightings = get_course(course_code, semester, year)
+        except Exception as e:
+            error, status = get_course_error(e, course_code, semester, year)
+            results.append({**result, **error, 'status': status})
+            continue
+
+        results.append({
+            **result,
+            'success': True,
+            'assessmentItems': [{"title": w[0], "weight": w[1]} for w in weightings],
+        })
+        course_index.add(course_code, semester, year)
+        searches.append((course_code, semester, year))
+
+    log_searches(searches, THIS_FOLDER, app.config['ENABLE_LOGGING'])
+    return jsonify({'success': True, 'results': results}), 200
 
 @app.route('/api/announcement/', methods=['GET'])
 @cross_origin(origins=["https://www.uqmarks.com", "https://uqmarks.com", "http://localhost:5173", "http://127.0.0.1:5000/"])
@@ -261,24 +438,42 @@ def api_analytics_page_load():
     if len(entries) > max_entries:
         return jsonify({'success': False, 'error': f'Maximum {max_entries} entries per request.'}), 400
 
-    logged = 0
-
+    candidates = []
     for entry in entries:
         if not isinstance(entry, dict):
             continue
 
         course_code = str(entry.get("courseCode", "")).upper()
         semester_id = str(entry.get("semesterId", ""))
-
-        if not course_exists_for_semester_id(course_code, semester_id):
+        if not is_valid_course_code(course_code) or not is_valid_semester_id(semester_id):
             continue
 
-        try:
-            year, semester = semester_id.split("S", 1)
-            log_search(course_code, semester, year, THIS_FOLDER, app.config['ENABLE_LOGGING'], event_type="page_load")
-            logged += 1
-        except Exception:
-            continue
+        year, semester = semester_id.split("S", 1)
+        candidates.append((course_code, semester, year))
+
+    # One lookup for every entry, then one write for all of the courses that exist
+    keys = [(code, int(semester), int(year)) for code, semester, year in candidates]
+    existing = course_index.filter_existing(keys)
+    if existing is None:
+        existing = get_existing_course_keys(keys)
+    elif len(existing) < len(set(keys)):
+        # The index only sees courses other workers or prescrape.py stored at its next refresh,
+        # so misses are checked against the database before their events are dropped
+        stored = get_existing_course_keys([key for key in keys if key not in existing])
+        for key in stored:
+            course_index.add(*key)
+        existing |= stored
+    searches = [
+        (code, semester, year) for code, semester, year in candidates
+        if (code, int(semester), int(year)) in existing
+    ]
+
+    try:
+        log_searches(searches, THIS_FOLDER, app.config['ENABLE_LOGGING'], event_type="page_load")
+        logged = len(searches)
+    except Exception as e:
+        print(f"Error logging page load: {e}")
+        logged = 0
 
     return jsonify({'success': True, 'logged': logged}), 200
 
@@ -301,7 +496,27 @@ def static_proxy(path):
 def health():
     return "ok", 200
 
+@app.route("/health/search-logs")
+def health_search_logs():
+    """Search log pipeline counters for this worker, including how far the spool lags behind"""
+    return jsonify(get_search_log_stats()), 200
+
+@app.route("/health/cache")
+def health_cache():
+    """Cache hits and misses per memoized function or key for this worker. Each gunicorn
+    worker counts separately, so the pid says which worker answered."""
+    return jsonify({"pid": os.getpid(), "namespaces": get_cache_stats()}), 200
+
+def start_background_jobs():
+    """Start the background threads only the web server needs. Called from start_app and, under
+    gunicorn, from gunicorn.conf.py in each worker, never on import, so CLIs that import app
+    (prescrape.py, manage_partitions.py) don't run them. Those write search logs synchronously,
+    and never touch the spool, where they can't tell a live worker's segments from a dead one's."""
+    init_search_log_writer(app)
+    search_rollup.init_app(app)
+
 def start_app():
+    start_background_jobs()
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port, debug=DEBUG_MODE)
 
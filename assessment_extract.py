@@ -0,0 +1,213 @@
+"""Fast extraction of assessment tables from course profile pages.
+
+Parses the page once with lxml and reads only the parts the scraper needs: the hero
+section (or the legacy title and breadcrumb) and the assessment table. Rows are cleaned
+in plain Python, without BeautifulSoup or pandas. The results match
+get_assessment.parse_course_profile and get_assessment.parse_legacy_report. Layouts
+those parsers handle in ways this module doesn't replicate raise ExtractionError, and
+the caller then falls back to the full parsers.
+"""
+import re
+
+from lxml import html as lxml_html
+
+RE_NAMESPACE = {"re": "http://exslt.org/regular-expressions"}
+
+# Same whitespace collapsing and missing-value markers as pandas.read_html
+WHITESPACE_PATTERN = re.compile(r"[\r\n]+|\s{2,}")
+NA_VALUES = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+INTEGER_PATTERN = re.compile(r"[+-]?\d+")
+
+
+class ExtractionError(Exception):
+    """The page layout is outside what the fast path reproduces exactly"""
+
+
+def has_class(class_name: str) -> str:
+    """XPath predicate matching elements whose class list contains `class_name`"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def expected_semester_text(semester: int, year: int) -> str:
+    if semester == 3:
+        return f"Summer {year}"
+    return f"Sem {semester} {year}"
+
+
+def normalise_weights(rows: list, weight_index: int) -> list:
+    """Apply the scraper's weight clean-up to rows of strings.
+
+    Weights without a '%' that are all whole numbers (e.g. DECO2200, DECO7200) are
+    replaced by an even split. Any weight containing '%' is then cut back to the number
+    before the first '%'.
+    """
+    non_percentage = [row[weight_index] for row in rows if "%" not in row[weight_index]]
+    even_split = None
+    if non_percentage and all(weight.isdigit() for weight in non_percentage):
+        even_split = f"{100 / len(non_percentage):.2f}%"
+
+    normalised = []
+    for row in rows:
+        weight = row[weight_index]
+        if "%" not in weight and even_split is not None:
+            weight = even_split
+        if "%" in weight:
+            weight = weight.partition("%")[0] + "%"
+        normalised.append(row[:weight_index] + (weight,) + row[weight_index + 1:])
+    return normalised
+
+
+def extract_course_profile(html: str, course_code: str, semester: int, year: int):
+    """Extract assessment items from a course profile page (2024 Semester 2 onwards)
+
+    Args:
+        html (str): Page HTML
+        course_code (str): Course code
+        semester (int): Semester for course
+        year (int): year for course
+
+    Returns:
+        list[tuple] | None: Assessment items, or None if the page is for another course or semester
+    """
+    try:
+        document = lxml_html.document_fromstring(html)
+    except Exception as e:
+        raise ExtractionError(f"Could not parse page: {e}") from e
+
+    hero = document.xpath(f"(//div[{has_class('hero__text')}])[1]")
+    if not hero:
+        return None
+    titles = hero[0].xpath(".//h1")
+    offerings = hero[0].xpath(f".//dd[{has_class('hero__course-offering__value')}]")
+    if not titles or not offerings:
+        return None
+    if (course_code not in titles[0].text_content().strip()
+            or expected_semester_text(semester, year) not in offerings[0].text_content().strip()):
+        return None
+
+    tables = document.xpath(f"(//table[not(ancestor::ul[{has_class('icon-list')}])])[1]")
+    if not tables:
+        raise ExtractionError("No assessment table")
+    table = tables[0]
+    for icon_list in table.xpath(f".//ul[{has_class('icon-list')}]"):
+        icon_list.drop_tree()
+
+    tbody = table.find(".//tbody")
+    if tbody is None:
+        raise ExtractionError("Assessment table has no tbody")
+
+    headers = [header.text_content().strip() for header in table.iter("th")]
+    if len(set(headers)) != len(headers) or not {"Category", "Due date", "Weight"} <= set(headers):
+        raise ExtractionError(f"Unexpected headers: {headers}")
+
+    rows = [[cell.text_content().strip() for cell in row.iter("td")] for row in tbody.iter("tr")]
+    if rows and max(len(row) for row in rows) != len(headers):
+        raise ExtractionError("Row width does not match headers")
+
+    keep = [i for i, header in enumerate(headers) if header not in ("Category", "Due date")]
+    # Short rows are padded with missing values and then dropped
+    items = [tuple(row[i] for i in keep) for row in rows if len(row) == len(headers)]
+    return normalise_weights(items, keep.index(headers.index("Weight")))
+
+
+def text_with_spaces(element) -> str:
+    """Equivalent of BeautifulSoup's get_text(" ", strip=True)"""
+    return " ".join(text.strip() for text in element.itertext() if text.strip())
+
+
+def cell_text(cell) -> str:
+    return WHITESPACE_PATTERN.sub(" ", cell.text_content().strip())
+
+
+def extract_legacy_report(status_code: int, html: str, course_code: str, semester: int, year: int):
+    """Extract assessment items from the assessment report used before 2024 Semester 2
+
+    Args:
+        status_code (int): HTTP status code of the page
+        html (str): Page HTML
+        course_code (str): Course code
+        semester (int): Semester for course
+        year (int): year for course
+
+    Returns:
+        list[tuple] | None: Assessment items, or None if the page is for another course or semester
+    """
+    # Task names are split from their category on the literal '<br />', e.g.
+    # Computer Exercise <br /> Assignment 1
+    html = html.replace("<br />", "||")
+    if status_code != 200 or not html.strip() or "<table" not in html.lower():
+        return None
+
+    try:
+        document = lxml_html.document_fromstring(html)
+    except Exception as e:
+        raise ExtractionError(f"Could not parse page: {e}") from e
+
+    titles = document.xpath(f"(//h1[{has_class('page__title')}])[1]")
+    breadcrumbs = document.xpath(f"(//div[{has_class('page__breadcrumb')}])[1]")
+    if not titles or not breadcrumbs:
+        return None
+    breadcrumb_text = text_with_spaces(breadcrumbs[0]).replace("Semester ", "Sem ").replace(",", "")
+    if course_code not in text_with_spaces(titles[0]) or expected_semester_text(semester, year) not in breadcrumb_text:
+        return None
+
+    # pandas.read_html skips tables without text and tables hidden with display:none
+    tables = [
+        table for table in document.xpath("//table[.//text()[re:test(., '.+')]]", namespaces=RE_NAMESPACE)
+        if "display:none" not in table.get("style", "").replace(" ", "")
+    ]
+    if len(tables) < 2:
+        raise ExtractionError("No assessment table")
+    table = tables[1]
+    if table.xpath(".//table|.//tfoot|.//style|.//*[@style]|.//*[@colspan]|.//*[@rowspan]"):
+        raise ExtractionError("Assessment table layout needs the full parser")
+    for br in table.iter("br"):
+        br.tail = "\n" + (br.tail or "")
+
+    header_rows = table.xpath(".//thead/tr")
+    if table.xpath(".//thead/td|.//thead/th"):
+        raise ExtractionError("Header cells outside a row")
+    body_rows = table.xpath(".//tbody//tr") + table.xpath("./tr")
+    if not header_rows:
+        while body_rows and all(cell.tag == "th" for cell in body_rows[0].xpath("./td|./th")):
+            header_rows.append(body_rows.pop(0))
+    if len(header_rows) != 1:
+        raise ExtractionError("Expected exactly one header row")
+
+    headers = [cell_text(cell) for cell in header_rows[0].xpath("./td|./th")]
+    rows = [[cell_text(cell) for cell in row.xpath("./td|./th")] for row in body_rows]
+    if sorted(headers) != ["Assessment Task", "Course", "Due Date", "Weighting"]:
+        raise ExtractionError(f"Unexpected headers: {headers}")
+    if any(len(row) > len(headers) for row in rows):
+        raise ExtractionError("Row wider than headers")
+
+    task_index = headers.index("Assessment Task")
+    weight_index = headers.index("Weighting")
+    tasks = [row[task_index] if len(row) > task_index else "" for row in rows]
+    weights = [row[weight_index] if len(row) > weight_index else "" for row in rows]
+
+    # pandas infers a type per column, which only changes the text when no value keeps the column as text
+    present_tasks = [task for task in tasks if task not in NA_VALUES]
+    if present_tasks and not any("||" in task for task in present_tasks):
+        raise ExtractionError("Assessment Task column may be inferred as non-text")
+    present_weights = [weight for weight in weights if weight not in NA_VALUES]
+    integer_weights = False
+    if present_weights and not any("%" in weight for weight in present_weights):
+        if len(present_weights) != len(weights) or not all(INTEGER_PATTERN.fullmatch(w) for w in present_weights):
+            raise ExtractionError("Weighting column may be inferred as non-text")
+        integer_weights = True
+
+    task_first = task_index < weight_index
+    items = []
+    for task, weight in zip(tasks, weights):
+        if task in NA_VALUES or weight in NA_VALUES:
+            continue
+        if integer_weights:
+            weight = str(int(weight))
+        # Drop the category before the first '||' and any notes after the next one
+        task = task.partition("||")[2].partition("||")[0]
+        items.append((task, weight) if task_first else (weight, task))
+    return normalise_weights(items, 1 if task_first else 0)
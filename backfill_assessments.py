@@ -0,0 +1,27 @@
+"""Convert legacy repr-encoded course assessments to JSONB, once after upgrading.
+
+Usage:
+    python backfill_assessments.py
+
+Rows whose asmts can't be parsed are reported and left as they are; the app keeps reading
+them from asmts.
+"""
+import argparse
+import sys
+
+import app as uqmarks
+from db_connection import backfill_course_assessments
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Convert legacy course assessments to JSONB.")
+    parser.parse_args(argv)
+
+    backfilled, skipped = backfill_course_assessments(uqmarks.app)
+    if not backfilled and not skipped:
+        print("No legacy course assessments to backfill")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Compare the fast assessment extractor with the BeautifulSoup/pandas parsers.
+
+Usage:
+    python benchmarks/bench_extract.py [--repeat 200] [html files ...]
+
+Reports mean parse time and peak traced memory per page for each fixture. The peak only
+covers the Python heap, since libxml2 allocates outside tracemalloc. Files other
+than the bundled fixtures are treated as course profiles unless their name contains
+"legacy"; pass them as CODE_SEMESTER_YEAR.html, e.g. CSSE1001_2_2025.html.
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from assessment_extract import extract_course_profile, extract_legacy_report
+from get_assessment import parse_course_profile, parse_legacy_report
+
+FIXTURES = Path(__file__).resolve().parents[1] / "tests" / "fixtures"
+DEFAULT_PAGES = [
+    (FIXTURES / "course_profile.html", "CSSE1001", 2, 2025),
+    (FIXTURES / "course_profile_numeric_weights.html", "DECO2200", 3, 2025),
+    (FIXTURES / "legacy_report.html", "CSSE2002", 1, 2023),
+]
+
+
+def page_from_path(path: Path):
+    code, semester, year = path.stem.split("_")[-3:]
+    return path, code, int(semester), int(year)
+
+
+def parsers_for(path: Path):
+    if "legacy" in path.name:
+        return (
+            ("bs4+pandas", lambda html, *args: parse_legacy_report(200, html, *args)),
+            ("lxml fast path", lambda html, *args: extract_legacy_report(200, html, *args)),
+        )
+    return (
+        ("bs4+pandas", parse_course_profile),
+        ("lxml fast path", extract_course_profile),
+    )
+
+
+def measure(parse, html: str, args: tuple, repeat: int):
+    parse(html, *args)  # Warm up imports and caches
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        parse(html, *args)
+    mean_ms = (time.perf_counter() - started) / repeat * 1000
+
+    tracemalloc.start()
+    result = parse(html, *args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return mean_ms, peak / 1024, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", type=Path, help="Extra saved course profile pages")
+    parser.add_argument("--repeat", type=int, default=200, help="Parses per measurement (default: 200)")
+    args = parser.parse_args(argv)
+
+    pages = DEFAULT_PAGES + [page_from_path(path) for path in args.pages]
+    print(f"{'page':<36} {'parser':<16} {'ms/page':>9} {'peak KiB':>9}")
+    for path, code, semester, year in pages:
+        html = path.read_text(encoding="utf-8")
+        results = []
+        for name, parse in parsers_for(path):
+            mean_ms, peak_kib, result = measure(parse, html, (code, semester, year), args.repeat)
+            results.append(result)
+            print(f"{path.name:<36} {name:<16} {mean_ms:>9.3f} {peak_kib:>9.1f}")
+        if results[0] != results[1]:
+            print(f"  WARNING: results differ for {path.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Compare the NumPy heatmap builder with the previous merge/apply implementation.
+
+Usage:
+    python benchmarks/bench_heatmap.py [--repeat 200]
+
+Times what the hourly page's callback spends on the heatmap: building the figure from the
+dow/hour/frequency rows and serialising it to JSON for Dash. The payload size of each
+figure is reported as well.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from analyse_search import gen_hourly_heatmap
+
+
+def merge_apply_heatmap(df, code=None):
+    """The previous implementation: merge onto a long-form grid and build hover text row by row"""
+    grid = pd.MultiIndex.from_product([range(7), range(24)], names=['dow', 'hour']).to_frame(index=False)
+    heatmap_data = pd.merge(grid, df, how='left', on=['dow', 'hour'])
+    heatmap_data['frequency'] = heatmap_data['frequency'].fillna(0)
+    dow_to_name = {0: 'Sunday', 1: 'Monday', 2: 'Tuesday', 3: 'Wednesday', 4: 'Thursday', 5: 'Friday', 6: 'Saturday'}
+    heatmap_data['day_of_week'] = heatmap_data['dow'].map(dow_to_name)
+    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    day_order.reverse()
+
+    fig = go.Figure(data=go.Heatmap(
+        z=heatmap_data['frequency'],
+        x=heatmap_data['hour'],
+        y=heatmap_data['day_of_week'],
+        hovertemplate='%{text}<extra></extra>',
+        text=heatmap_data.apply(lambda row: f"{row['frequency']} searches on {row['day_of_week']} at {row['hour']}:00", axis=1),
+        colorscale='thermal',
+        colorbar=dict(title='', tickvals=[heatmap_data['frequency'].min(), heatmap_data['frequency'].max()], ticktext=['Less', 'More']),
+    ))
+    fig.update_layout(
+        title='Searches Throughout The Week',
+        xaxis=dict(title='Hour', tickvals=list(range(0, 24, 3))),
+        yaxis=dict(title='Day Of Week', categoryorder='array', categoryarray=day_order),
+        font=dict(family='Arial', size=14, color='black'),
+        margin=dict(l=40, r=20),
+        hoverlabel=dict(font=dict(family='Arial', color='black'), bgcolor="white", font_size=14,
+                        bordercolor='white', font_family='Arial'),
+    )
+    fig.update_layout({'plot_bgcolor': 'rgba(0,0,0,0)', 'paper_bgcolor': 'rgba(0,0,0,0)'})
+    return fig
+
+
+def sample_hours() -> pd.DataFrame:
+    """Searches for most hours of the week, as returned by get_search_logs_df"""
+    rng = np.random.default_rng(0)
+    rows = [(dow, hour) for dow in range(7) for hour in range(24) if rng.random() > 0.1]
+    return pd.DataFrame({
+        "dow": [dow for dow, _ in rows],
+        "hour": [hour for _, hour in rows],
+        "frequency": rng.integers(1, 5000, len(rows)),
+    })
+
+
+def time_builder(build, df, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        payload = build(df.copy()).to_json()
+    return (time.perf_counter() - start) / repeat * 1000, len(payload)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the hourly heatmap builders.")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    df = sample_hours()
+    print(f"{'builder':<14}  {'ms/callback':>11}  {'payload bytes':>13}")
+    for name, build in (("merge+apply", merge_apply_heatmap), ("numpy matrix", gen_hourly_heatmap)):
+        mean_ms, payload = time_builder(build, df, args.repeat)
+        print(f"{name:<14}  {mean_ms:>11.2f}  {payload:>13}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
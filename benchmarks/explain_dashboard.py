@@ -0,0 +1,138 @@
+"""EXPLAIN ANALYZE the dashboard's query shapes with and without the dashboard indexes.
+
+Usage:
+    python benchmarks/explain_dashboard.py [--year 2026 --semester 2] [--days 90] [--code CSSE1001] [--plans]
+
+Connects with the POSTGRES_* settings from .env. Each query is run twice: "before" inside
+a transaction that swaps the indexes from migrations/20261021_add_dashboard_indexes.sql
+for the ones they replaced and is then rolled back, and "after" against the live indexes.
+The swap holds an ACCESS EXCLUSIVE lock on search_logs and search_log_hourly until the
+rollback, so run it against a copy or outside busy hours.
+"""
+import argparse
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from db_connection import get_sqlalchemy_engine
+
+BEFORE_INDEXES = [
+    "DROP INDEX idx_search_logs_ts_brin",
+    "DROP INDEX idx_search_log_hourly_bucket",
+    "DROP INDEX idx_search_log_hourly_year_sem_bucket",
+    "DROP INDEX idx_search_log_hourly_code_bucket",
+    "CREATE INDEX ix_search_logs_code_sem_year ON search_logs (code)",
+    "CREATE INDEX idx_search_logs_ts ON search_logs (ts)",
+]
+
+LOCAL_TS = "ts AT TIME ZONE 'UTC' AT TIME ZONE 'Australia/Brisbane'"
+
+# Query shapes run by dash_app.py (against search_log_hourly) and by the rollup's range
+# scans of new rows (against search_logs)
+QUERIES = {
+    "hourly: searches per day": """
+        SELECT date_trunc('day', bucket), SUM(frequency) FROM search_log_hourly
+        WHERE bucket >= :start_date AND bucket < :end_date
+        GROUP BY 1 ORDER BY 1
+    """,
+    "hourly: searches per day for a semester": """
+        SELECT date_trunc('day', bucket), SUM(frequency) FROM search_log_hourly
+        WHERE year = :year AND semester = :semester AND bucket >= :start_date AND bucket < :end_date
+        GROUP BY 1 ORDER BY 1
+    """,
+    "hourly: searches per day for a course": """
+        SELECT date_trunc('day', bucket), SUM(frequency) FROM search_log_hourly
+        WHERE code = :code AND bucket >= :start_date AND bucket < :end_date
+        GROUP BY 1 ORDER BY 1
+    """,
+    "hourly: most searched courses in a semester": """
+        SELECT code, SUM(frequency) AS frequency FROM search_log_hourly
+        WHERE year = :year AND semester = :semester
+        GROUP BY code ORDER BY frequency DESC LIMIT 10
+    """,
+    "hourly: searches per course in a date range": """
+        SELECT code, SUM(frequency) FROM search_log_hourly
+        WHERE bucket >= :start_date AND bucket < :end_date
+        GROUP BY code
+    """,
+    "raw: searches in a date range": """
+        SELECT COUNT(*) FROM search_logs WHERE ts >= :start_date AND ts < :end_date
+    """,
+}
+
+
+def explain(conn, sql: str, params: dict):
+    """Returns (execution time in ms, plan lines)"""
+    lines = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params).scalars().all()
+    execution_time = next(line for line in reversed(lines) if line.startswith("Execution Time:"))
+    return float(execution_time.split()[2]), lines
+
+
+def run_all(conn, params: dict, repeat: int) -> dict:
+    results = {}
+    for label, sql in QUERIES.items():
+        # Keep the fastest run so the comparison isn't skewed by a cold cache
+        runs = [explain(conn, sql, params) for _ in range(repeat)]
+        results[label] = min(runs, key=lambda run: run[0])
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE the dashboard queries before and after the dashboard indexes.")
+    parser.add_argument("--year", type=int, default=date.today().year)
+    parser.add_argument("--semester", type=int, default=2 if date.today().month >= 7 else 1)
+    parser.add_argument("--days", type=int, default=90, help="Length of the date range ending today")
+    parser.add_argument("--code", default="CSSE1001")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--plans", action="store_true", help="Print the full plans")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    end_date = date.today() + timedelta(days=1)
+    params = {
+        "year": args.year,
+        "semester": args.semester,
+        "code": args.code.upper(),
+        "start_date": end_date - timedelta(days=args.days),
+        "end_date": end_date,
+    }
+
+    engine = get_sqlalchemy_engine()
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            for statement in BEFORE_INDEXES:
+                conn.execute(text(statement))
+            conn.execute(text("ANALYZE search_logs"))
+            conn.execute(text("ANALYZE search_log_hourly"))
+            before = run_all(conn, params, args.repeat)
+        finally:
+            transaction.rollback()
+
+        with conn.begin():
+            conn.execute(text("ANALYZE search_logs"))
+            conn.execute(text("ANALYZE search_log_hourly"))
+        after = run_all(conn, params, args.repeat)
+
+    width = max(len(label) for label in QUERIES)
+    print(f"{'query':<{width}}  {'before ms':>10}  {'after ms':>10}  {'speedup':>8}")
+    for label in QUERIES:
+        before_ms, after_ms = before[label][0], after[label][0]
+        speedup = before_ms / after_ms if after_ms else float("inf")
+        print(f"{label:<{width}}  {before_ms:>10.2f}  {after_ms:>10.2f}  {speedup:>7.1f}x")
+
+    if args.plans:
+        for label in QUERIES:
+            for name, results in (("before", before), ("after", after)):
+                print(f"\n== {label} ({name}) ==")
+                print("\n".join(results[label][1]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
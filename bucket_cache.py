@@ -0,0 +1,124 @@
+"""Cache dashboard aggregates per aligned date bucket instead of per requested range.
+
+A requested range of Brisbane-local dates is split into whole calendar months and single
+days that are closed, plus one open tail covering yesterday and today. Each bucket's
+partial result is cached under its own key. Overlapping ranges ("Last 30 Days" today and
+tomorrow, or two custom pickers) then share buckets, and only buckets missing from the
+cache are queried, all in one query. Callers merge the partial results, which works for
+anything that can be summed, such as counts per day, per hour of the week or per course.
+
+A day is only closed once a full day has passed since it ended, so the rollup interval
+and most spooled events still land while it is open. The open tail is cached for
+DASH_OPEN_BUCKET_TIMEOUT seconds and closed buckets for DASH_CLOSED_BUCKET_TIMEOUT.
+Events can still reach a closed day later, e.g. when a spool is replayed after a
+database outage. The rollup then calls invalidate_closed_buckets. Every bucket key
+carries a generation number, so bumping it makes the cached buckets unreachable at once.
+"""
+import os
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta, timezone
+
+OPEN_BUCKET_TIMEOUT = int(os.getenv("DASH_OPEN_BUCKET_TIMEOUT", 300))
+CLOSED_BUCKET_TIMEOUT = int(os.getenv("DASH_CLOSED_BUCKET_TIMEOUT", 60*60*24))
+OPEN_DAYS = 2
+GENERATION_KEY = "dash_buckets.generation"
+BRISBANE = timezone(timedelta(hours=10))  # Australia/Brisbane has no daylight saving
+
+Bucket = namedtuple("Bucket", ["start", "end", "closed"])  # [start, end) as dates
+
+
+def brisbane_today() -> date:
+    return datetime.now(BRISBANE).date()
+
+
+def open_tail_start(today: date = None) -> datetime:
+    """Returns the first Brisbane-local hour of the open tail. Every hour before it is in a closed bucket."""
+    today = today or brisbane_today()
+    return datetime.combine(today - timedelta(days=OPEN_DAYS - 1), time())
+
+
+def new_generation() -> int:
+    return int(datetime.now(timezone.utc).timestamp() * 1_000_000)
+
+
+def get_generation(cache) -> int:
+    """Returns the current bucket generation, starting a new one if the key is missing"""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Evicted or never set: no bucket cached under an earlier generation can be reused
+        generation = new_generation()
+        if not cache.add(GENERATION_KEY, generation, timeout=0):
+            generation = cache.get(GENERATION_KEY) or generation  # Another worker started one first
+    return generation
+
+
+def invalidate_closed_buckets(cache):
+    """Stop serving every cached bucket, e.g. after new events landed in a closed day"""
+    cache.set(GENERATION_KEY, new_generation(), timeout=0)
+
+
+def next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def split_date_range(start_date: date, end_date: date, today: date = None) -> list:
+    """Split the inclusive range [start_date, end_date] into aligned buckets, oldest first.
+
+    Whole months that are closed become one bucket each, other closed days one bucket
+    each, and anything from yesterday onwards a single open bucket.
+    """
+    today = today or brisbane_today()
+    end = end_date + timedelta(days=1)
+    closed_end = min(end, today - timedelta(days=OPEN_DAYS - 1))
+
+    buckets = []
+    day = start_date
+    while day < closed_end:
+        month_end = next_month(day)
+        if day.day == 1 and month_end <= closed_end:
+            buckets.append(Bucket(day, month_end, True))
+            day = month_end
+        else:
+            buckets.append(Bucket(day, day + timedelta(days=1), True))
+            day += timedelta(days=1)
+
+    if day < end:
+        buckets.append(Bucket(day, end, False))
+    return buckets
+
+
+def bucket_key(name: str, params: tuple, bucket: Bucket, generation) -> str:
+    return f"dash_buckets.{name}:{generation}:{params!r}:{bucket.start.isoformat()}:{bucket.end.isoformat()}"
+
+
+def get_bucketed(cache, name: str, params: tuple, start_date: date, end_date: date, fetch, today: date = None) -> list:
+    """Returns one partial result per bucket of [start_date, end_date], from the cache where possible.
+
+    Args:
+        cache: flask_caching Cache (or cachelib backend) to store buckets in
+        name (str): Name of the aggregate, e.g. "daily_counts"
+        params (tuple): Every other filter the aggregate depends on, e.g. (year, semester, code)
+        start_date (date): First day of the range
+        end_date (date): Last day of the range, inclusive
+        fetch: Called with the list of uncached buckets. Returns {bucket: partial result}
+            from a single query, with a result (e.g. an empty DataFrame) for every bucket.
+        today (date, optional): Today's Brisbane date, for tests
+
+    Returns:
+        list: Partial results in bucket order
+    """
+    buckets = split_date_range(start_date, end_date, today)
+    generation = get_generation(cache)
+    keys = [bucket_key(name, params, bucket, generation) for bucket in buckets]
+    results = [cache.get(key) for key in keys]
+
+    missing = [bucket for bucket, result in zip(buckets, results) if result is None]
+    if missing:
+        fetched = fetch(missing)
+        for i, bucket in enumerate(buckets):
+            if results[i] is not None:
+                continue
+            results[i] = fetched[bucket]
+            timeout = CLOSED_BUCKET_TIMEOUT if bucket.closed else OPEN_BUCKET_TIMEOUT
+            cache.set(keys[i], results[i], timeout=timeout)
+    return results
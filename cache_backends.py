@@ -0,0 +1,217 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from flask_caching import Cache
+from flask_caching.backends.base import BaseCache
+from flask_caching.backends.filesystemcache import FileSystemCache
+from flask_caching.backends.simplecache import SimpleCache
+from flask_caching.utils import function_namespace
+
+
+def key_namespace(key) -> str:
+    """Returns the namespace of a cache key, e.g. 'app.get_course' for 'app.get_course:abc123'"""
+    return str(key).split(":", 1)[0]
+
+
+class NamespacedCache(Cache):
+    """Cache that prefixes memoized keys with the function name, so hits and misses
+    can be reported per memoized function instead of per opaque hash."""
+
+    def _memoize_make_cache_key(self, *args, **kwargs):
+        make_cache_key = super()._memoize_make_cache_key(*args, **kwargs)
+
+        def namespaced_cache_key(f, *args, **kwargs):
+            fname, _ = function_namespace(f)
+            return f"{fname}:{make_cache_key(f, *args, **kwargs)}"
+
+        return namespaced_cache_key
+
+    def get_stats(self) -> dict:
+        """Returns {namespace: {"hits": int, "misses": int}} for this worker"""
+        backend = getattr(self, "cache", None)
+        if backend is None or not hasattr(backend, "get_stats"):
+            return {}
+        return backend.get_stats()
+
+
+class CacheStatsMixin:
+    """Counts hits and misses per key namespace for any cachelib backend."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._hits = defaultdict(int)
+        self._misses = defaultdict(int)
+
+    def _record(self, key, hit: bool):
+        # Memoize version lookups and backend counters are bookkeeping, not cached results
+        if str(key).endswith("_memver") or str(key).startswith("__wz_"):
+            return
+        namespace = key_namespace(key)
+        with self._stats_lock:
+            if hit:
+                self._hits[namespace] += 1
+            else:
+                self._misses[namespace] += 1
+
+    def get(self, key):
+        value = super().get(key)
+        self._record(key, value is not None)
+        return value
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            namespaces = set(self._hits) | set(self._misses)
+            return {
+                namespace: {"hits": self._hits[namespace], "misses": self._misses[namespace]}
+                for namespace in sorted(namespaces)
+            }
+
+
+class SimpleStatsCache(CacheStatsMixin, SimpleCache):
+    """Per-process in-memory cache. Only useful with a single worker."""
+
+
+class FileSystemStatsCache(CacheStatsMixin, FileSystemCache):
+    """Cache stored as one pickle file per key, shared by every worker using the same CACHE_DIR."""
+
+
+class SQLiteCache(BaseCache):
+    """Cache stored in a single SQLite file (WAL mode), shared by every worker on the host.
+
+    Values are pickled with the highest protocol. Expired rows are pruned lazily on
+    writes, and the oldest rows are evicted once the table grows past `threshold`.
+    """
+
+    PRUNE_EVERY = 100
+
+    def __init__(self, path, default_timeout: int = 300, threshold: int = 5000, **kwargs):
+        super().__init__(default_timeout=default_timeout, **kwargs)
+        self._path = str(path)
+        self._threshold = threshold
+        self._local = threading.local()
+        self._writes = 0
+        Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, expires REAL NOT NULL, value BLOB NOT NULL)"
+        )
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        kwargs.update(dict(threshold=config["CACHE_THRESHOLD"]))
+        args.insert(0, config["CACHE_SQLITE_PATH"])
+        return cls(*args, **kwargs)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads or forked workers,
+        # so keep one per thread and reopen it after a fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self._path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _expires_at(self, timeout) -> float:
+        timeout = self._normalize_timeout(timeout)
+        return 0 if timeout == 0 else time.time() + timeout
+
+    def _prune(self, conn: sqlite3.Connection):
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY:
+            return
+        conn.execute("DELETE FROM cache WHERE expires != 0 AND expires <= ?", (time.time(),))
+        (count,) = conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        if count > self._threshold:
+            conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY expires = 0, expires LIMIT ?)",
+                (count - self._threshold,),
+            )
+
+    def get(self, key):
+        try:
+            row = self._connection().execute(
+                "SELECT value FROM cache WHERE key = ? AND (expires = 0 OR expires > ?)",
+                (key, time.time()),
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row is None:
+            return None
+        return pickle.loads(row[0])
+
+    def get_many(self, *keys):
+        if not keys:
+            return []
+        try:
+            rows = self._connection().execute(
+                f"SELECT key, value FROM cache WHERE key IN ({','.join('?' * len(keys))}) "
+                "AND (expires = 0 OR expires > ?)",
+                (*keys, time.time()),
+            ).fetchall()
+        except sqlite3.Error:
+            rows = []
+        found = {key: pickle.loads(value) for key, value in rows}
+        return [found.get(key) for key in keys]
+
+    def set(self, key, value, timeout=None):
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, expires, value) VALUES (?, ?, ?)",
+                (key, self._expires_at(timeout), pickle.dumps(value, pickle.HIGHEST_PROTOCOL)),
+            )
+            self._prune(conn)
+        except sqlite3.Error:
+            return False
+        return True
+
+    def add(self, key, value, timeout=None):
+        try:
+            conn = self._connection()
+            conn.execute("DELETE FROM cache WHERE key = ? AND expires != 0 AND expires <= ?", (key, time.time()))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO cache (key, expires, value) VALUES (?, ?, ?)",
+                (key, self._expires_at(timeout), pickle.dumps(value, pickle.HIGHEST_PROTOCOL)),
+            )
+        except sqlite3.Error:
+            return False
+        return cursor.rowcount == 1
+
+    def delete(self, key):
+        try:
+            cursor = self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.Error:
+            return False
+        return cursor.rowcount == 1
+
+    def has(self, key):
+        try:
+            row = self._connection().execute(
+                "SELECT 1 FROM cache WHERE key = ? AND (expires = 0 OR expires > ?)",
+                (key, time.time()),
+            ).fetchone()
+        except sqlite3.Error:
+            return False
+        return row is not None
+
+    def clear(self):
+        try:
+            self._connection().execute("DELETE FROM cache")
+        except sqlite3.Error:
+            return False
+        return True
+
+
+class SQLiteStatsCache(CacheStatsMixin, SQLiteCache):
+    """SQLite cache with per-namespace hit/miss counters."""
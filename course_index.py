@@ -0,0 +1,129 @@
+"""In-process index of every (code, semester, year) stored in `courses`.
+
+Each key is packed into one int, so the whole table fits in a small set of ints and
+existence checks are memory lookups. The index is loaded at startup and updated
+whenever this worker stores or serves a course. Every COURSE_INDEX_REFRESH_INTERVAL
+seconds it is reloaded in the background to pick up courses stored by other workers or
+by prescrape.py. Until then, a course missing from the index may still be stored, so
+callers that drop data on a miss check the database first.
+"""
+import os
+import re
+import threading
+import time
+
+from db_connection import db, Course
+
+REFRESH_INTERVAL = float(os.getenv("COURSE_INDEX_REFRESH_INTERVAL", 300))
+
+COURSE_CODE_PATTERN = re.compile(r"[A-Z]{4}[0-9]{4}")
+MIN_YEAR = 2000
+
+
+def pack_course_key(code: str, semester, year):
+    """Packs a course key into an int, or returns None if it can't be a stored course.
+
+    Bits: 19 for the four letters (base 26), 14 for the number, 2 for the semester and
+    the rest for the year since MIN_YEAR.
+    """
+    code = str(code).upper()
+    semester = int(semester)
+    year = int(year)
+    if not COURSE_CODE_PATTERN.fullmatch(code) or not 1 <= semester <= 3 or year < MIN_YEAR:
+        return None
+
+    letters = 0
+    for letter in code[:4]:
+        letters = letters * 26 + (ord(letter) - 65)
+    return ((((year - MIN_YEAR) << 2 | semester) << 14 | int(code[4:])) << 19) | letters
+
+
+class CourseIndex:
+    def __init__(self, refresh_interval: float = REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self.app = None
+        self._keys = None
+        self._loaded_at = 0.0
+        self._added_during_load = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._keys is not None
+
+    def init_app(self, app):
+        self.app = app
+        self.load()
+
+    def load(self) -> bool:
+        """Reload every stored key from the database. Returns False if the query failed."""
+        with self._lock:
+            self._added_during_load = set()
+        try:
+            with self.app.app_context():
+                rows = db.session.query(Course.code, Course.semester, Course.year).all()
+        except Exception as e:
+            print(f"Error loading course index: {e}")
+            with self._lock:
+                self._added_during_load = None
+                self._loaded_at = time.monotonic()  # Wait a full interval before retrying
+            return False
+
+        keys = {pack_course_key(code, semester, year) for code, semester, year in rows}
+        keys.discard(None)
+        with self._lock:
+            # The snapshot may predate courses this worker stored while the query ran
+            keys |= self._added_during_load
+            self._added_during_load = None
+            self._keys = keys
+            self._loaded_at = time.monotonic()
+        return True
+
+    def _refresh_in_background(self):
+        try:
+            self.load()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _refresh_if_stale(self):
+        if self.app is None or time.monotonic() - self._loaded_at < self.refresh_interval:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_in_background, name="course-index-refresh", daemon=True).start()
+
+    def add(self, code: str, semester, year):
+        key = pack_course_key(code, semester, year)
+        if key is None:
+            return
+        with self._lock:
+            if self._keys is not None:
+                self._keys.add(key)
+            if self._added_during_load is not None:
+                self._added_during_load.add(key)
+
+    def contains(self, code: str, semester, year):
+        """Returns whether the course is stored, or None if the index hasn't been loaded"""
+        if not self.loaded:
+            return None
+        self._refresh_if_stale()
+        return pack_course_key(code, semester, year) in self._keys
+
+    def filter_existing(self, keys: list):
+        """Returns the subset of (code, semester, year) keys that are stored, or None if the
+        index hasn't been loaded"""
+        if not self.loaded:
+            return None
+        self._refresh_if_stale()
+        index = self._keys
+        return {key for key in keys if pack_course_key(*key) in index}
+
+    def __len__(self) -> int:
+        return len(self._keys or ())
+
+
+course_index = CourseIndex()
@@ -3,62 +3,120 @@ from datetime import datetime as dt
 import dash_bootstrap_components as dbc
 from analyse_search import *
 from flask_cache import cache, get_semester_list, get_cached_df
+from bucket_cache import OPEN_BUCKET_TIMEOUT, get_bucketed, brisbane_today
+from timeseries_store import concat_series, resample_series
 from datetime import datetime
 import plotly.express as px
 from dateutil.relativedelta import relativedelta
 import time
 
-from sqlalchemy import func, Integer
-from db_connection import get_sqlalchemy_engine, db, SearchLogs
+from sqlalchemy import func, and_, case, or_, Integer
+from db_connection import db, SearchLogHourly
 import pandas as pd
 import os
 
-@cache.memoize(timeout=3600)
-def get_search_logs_df(year=None, semester=None, start_date=None, end_date=None):
-    """Fetch data from the search_logs table in PostgreSQL and return it as a Pandas DataFrame."""
-    local_ts = (
-        SearchLogs.ts
-            .op("AT TIME ZONE")("UTC") 
-            .op("AT TIME ZONE")("Australia/Brisbane")
-    )
-
-    dow = func.extract('dow', local_ts).cast(Integer).label('dow')
-    hour = func.extract('hour', local_ts).cast(Integer).label('hour')
+DATA_START = dt(2023, 2, 1).date()
+# Most points sent to the browser per line chart (0 disables downsampling) and how they are picked
+DASH_MAX_POINTS = int(os.getenv("DASH_MAX_POINTS", 2000))
+DASH_DOWNSAMPLE = os.getenv("DASH_DOWNSAMPLE", "minmax")
 
-    query = db.session.query(
-        dow,
-        hour,
-        func.count(SearchLogs.id).label("frequency"),
-    ).filter(SearchLogs.ts.isnot(None))
+def apply_search_log_filters(query, year=None, semester=None, start_date=None, end_date=None, code=None):
+    """Apply a consistent set of filters to SearchLogHourly queries. Dates are Brisbane-local."""
     if year is not None:
-        query = query.filter(SearchLogs.year == year)
+        query = query.filter(SearchLogHourly.year == year)
     if semester is not None:
-        query = query.filter(SearchLogs.semester == semester)
-    
+        query = query.filter(SearchLogHourly.semester == semester)
     if start_date is not None:
-        query = query.filter(SearchLogs.ts >= start_date)
+        query = query.filter(SearchLogHourly.bucket >= start_date)
     if end_date is not None:
-        query = query.filter(SearchLogs.ts <= end_date)
+        # Make end date inclusive for date-picker based filters.
+        end_dt = dt.strptime(end_date, "%Y-%m-%d").date()
+        end_plus_one = (end_dt + relativedelta(days=1)).strftime("%Y-%m-%d")
+        query = query.filter(SearchLogHourly.bucket < end_plus_one)
+    if code is not None:
+        query = query.filter(SearchLogHourly.code == code)
+    return query
+
+def parse_date_range(start_date=None, end_date=None):
+    """Returns the inclusive date range for '%Y-%m-%d' strings, defaulting to all data up to today."""
+    start = dt.strptime(start_date, "%Y-%m-%d").date() if start_date else DATA_START
+    end = dt.strptime(end_date, "%Y-%m-%d").date() if end_date else brisbane_today()
+    return start, end
+
+def fetch_rollup_buckets(buckets, columns, group_by, year=None, semester=None, code=None):
+    """
+    Aggregate the rollup for several date buckets in one query.
 
-    query = query.group_by(dow, hour).order_by(dow, hour)
+    Parameters:
+    - buckets (list[Bucket]): Date buckets to aggregate, oldest first.
+    - columns (list): Labelled columns to select, aggregated per bucket.
+    - group_by (list): Expressions to group by within each bucket.
+
+    Returns:
+    - dict: {bucket: DataFrame of columns}, with an empty DataFrame for buckets without searches.
+    """
+    in_bucket = [
+        and_(SearchLogHourly.bucket >= bucket.start, SearchLogHourly.bucket < bucket.end)
+        for bucket in buckets
+    ]
+    bucket_index = case(*[(condition, i) for i, condition in enumerate(in_bucket)]).label("bucket_index")
+
+    # Adjacent buckets are fetched as one range
+    ranges = []
+    for bucket in buckets:
+        if ranges and ranges[-1][1] == bucket.start:
+            ranges[-1][1] = bucket.end
+        else:
+            ranges.append([bucket.start, bucket.end])
+
+    query = db.session.query(bucket_index, *columns)
+    query = apply_search_log_filters(query, year=year, semester=semester, code=code)
+    query = query.filter(or_(*[
+        and_(SearchLogHourly.bucket >= start, SearchLogHourly.bucket < end) for start, end in ranges
+    ]))
+    query = query.group_by(bucket_index, *group_by)
 
     with db.engine.connect() as conn:
-        return pd.read_sql(query.statement, conn)
+        df = pd.read_sql(query.statement, conn)
+
+    return {
+        bucket: df[df["bucket_index"] == i].drop(columns="bucket_index").reset_index(drop=True)
+        for i, bucket in enumerate(buckets)
+    }
+
+def merge_buckets(partials, keys, columns):
+    """Sum per-bucket partial results that share the same keys."""
+    if not partials:
+        return pd.DataFrame(columns=keys + columns)
+    return pd.concat(partials, ignore_index=True).groupby(keys, as_index=False)[columns].sum()
+
+# The merged results are memoized too, for no longer than the open tail they include
+@cache.memoize(timeout=OPEN_BUCKET_TIMEOUT)
+def get_search_logs_df(year=None, semester=None, start_date=None, end_date=None, code=None):
+    """Return the number of searches per (day of week, hour) in Brisbane time as a Pandas DataFrame."""
+    dow = func.extract('dow', SearchLogHourly.bucket).cast(Integer).label('dow')
+    hour = func.extract('hour', SearchLogHourly.bucket).cast(Integer).label('hour')
+    columns = [dow, hour, func.sum(SearchLogHourly.frequency).label("frequency")]
+
+    start, end = parse_date_range(start_date, end_date)
+    partials = get_bucketed(
+        cache, "hourly_counts", (year, semester, code), start, end,
+        lambda buckets: fetch_rollup_buckets(buckets, columns, [dow, hour], year=year, semester=semester, code=code),
+    )
+    return merge_buckets(partials, ["dow", "hour"], ["frequency"])
 
-@cache.memoize(timeout=3600)
-def group_data_from_db(engine, year=None, semester=None, interval='D', start_date=None, end_date=None, code=None):
+@cache.memoize(timeout=OPEN_BUCKET_TIMEOUT)
+def group_data_from_db(year=None, semester=None, interval='D', start_date=None, end_date=None, code=None):
     """
-    Group data at the database level based on the specified interval.
+    Group searches based on the specified interval.
 
     Parameters:
-    - engine: SQLAlchemy engine connected to the PostgreSQL database.
     - interval (str): The interval for grouping. Defaults to 'D' (day).
       Possible values: 'D' for day, 'W' for week, 'M' for month, 'H' for hour, etc.
 
     Returns:
     - DataFrame: A Pandas DataFrame containing the grouped data.
     """
-    # Map interval to PostgreSQL date_trunc function
     interval_map = {
         'D': 'day',
         'W': 'week',
@@ -68,185 +126,67 @@ def group_data_from_db(engine, year=None, semester=None, interval='D', start_dat
     if interval not in interval_map:
         raise ValueError(f"Unsupported interval: {interval}. Use one of {list(interval_map.keys())}.")
 
-    trunc_unit = interval_map[interval]
-    local_ts = (
-        SearchLogs.ts
-            .op("AT TIME ZONE")("UTC")
-            .op("AT TIME ZONE")("Australia/Brisbane")
+    # Searches per hour are cached per date bucket, so any interval is a resample of them
+    columns = [SearchLogHourly.bucket.label("timestamp"), func.sum(SearchLogHourly.frequency).label("frequency")]
+    start, end = parse_date_range(start_date, end_date)
+    partials = get_bucketed(
+        cache, "hourly_series", (year, semester, code), start, end,
+        lambda buckets: fetch_rollup_buckets(buckets, columns, [SearchLogHourly.bucket], year=year, semester=semester, code=code),
     )
-    trunc_ts = func.date_trunc(trunc_unit, local_ts)
+    return resample_series(concat_series(partials), interval)
 
-    query = db.session.query(
-            trunc_ts.label("timestamp"),
-            func.count().label("frequency")
-        )
-    
-    if year is not None:
-        query = query.filter(SearchLogs.year == year)
-    if semester is not None:
-        query = query.filter(SearchLogs.semester == semester)
-    
-    if start_date is not None:
-        query = query.filter(SearchLogs.ts >= start_date)
-    if end_date is not None:
-        # make end date inclusive
-        end_dt = dt.strptime(end_date, "%Y-%m-%d").date()
-        end_plus_one = (end_dt + relativedelta(days=1)).strftime("%Y-%m-%d")
-        query = query.filter(SearchLogs.ts < end_plus_one)
-    if code is not None:
-        query = query.filter(SearchLogs.code == code)
+@cache.memoize(timeout=OPEN_BUCKET_TIMEOUT)
+def get_course_counts(year=None, semester=None, start_date=None, end_date=None):
+    """Return the number of searches per course as a DataFrame of code and cnt, most searched first."""
+    columns = [SearchLogHourly.code, func.sum(SearchLogHourly.frequency).label("cnt")]
 
-    query = (query
-        .filter(SearchLogs.ts.isnot(None))
-        .group_by(trunc_ts)
-        .order_by(trunc_ts)
+    start, end = parse_date_range(start_date, end_date)
+    partials = get_bucketed(
+        cache, "course_counts", (year, semester), start, end,
+        lambda buckets: fetch_rollup_buckets(buckets, columns, [SearchLogHourly.code], year=year, semester=semester),
     )
-    with db.engine.connect() as conn:
-        return pd.read_sql(query.statement, conn)
+    counts = merge_buckets(partials, ["code"], ["cnt"])
+    return counts.sort_values(["cnt", "code"], ascending=[False, True], ignore_index=True)
+
+def get_top_courses(counts, limit, code=None):
+    """Returns the first `limit` rows of ranked course counts as code and frequency, plus `code` if it isn't among them."""
+    shown = counts.index < limit
+    if code is not None:
+        shown |= counts["code"] == code
+    return counts.loc[shown].rename(columns={"cnt": "frequency"}).reset_index(drop=True)
 
-@cache.memoize(timeout=3600)
-def get_most_searched_course(engine, year=None, semester=None, limit=1, code=None):
+def get_most_searched_course(year=None, semester=None, start_date=None, end_date=None, limit=1, code=None):
     """
-    Query the database to find the most searched course.
+    Find the most searched courses in the filtered dataset.
 
     Parameters:
-    - engine: SQLAlchemy engine connected to the PostgreSQL database.
+    - limit (int): Number of courses to return. `code` is appended if it isn't among them.
 
     Returns:
-    - A tuple containing the most searched course code and its frequency.
+    - DataFrame: code and frequency of the most searched courses, most searched first.
     """
+    counts = get_course_counts(year=year, semester=semester, start_date=start_date, end_date=end_date)
+    return get_top_courses(counts, limit, code)
 
-    base_query = db.session.query(
-            SearchLogs.code.label("code"),
-            func.count().label("frequency")
-    )
-
-    if year is not None:
-        base_query = base_query.filter(SearchLogs.year == year)
-    if semester is not None:
-        base_query = base_query.filter(SearchLogs.semester == semester)
-
-    query = (
-        base_query.group_by(SearchLogs.code)
-             .order_by(func.count().desc())
-             .limit(limit)
-    )
-
-    with db.engine.connect() as conn:
-        df = pd.read_sql(query.statement, conn)
-    
-    if code is None or code in df['code'].values:
-        return df
-    
-    code_query = base_query.group_by(SearchLogs.code).filter(SearchLogs.code == code).limit(1)
-
-    with db.engine.connect() as conn:
-        code_df = pd.read_sql(code_query.statement, conn)
-
-    return pd.concat([df, code_df], ignore_index=True)
-
-def apply_search_log_filters(query, year=None, semester=None, start_date=None, end_date=None, code=None):
-    """Apply a consistent set of filters to SearchLogs queries."""
-    if year is not None:
-        query = query.filter(SearchLogs.year == year)
-    if semester is not None:
-        query = query.filter(SearchLogs.semester == semester)
-    if start_date is not None:
-        query = query.filter(SearchLogs.ts >= start_date)
-    if end_date is not None:
-        # Make end date inclusive for date-picker based filters.
-        end_dt = dt.strptime(end_date, "%Y-%m-%d").date()
-        end_plus_one = (end_dt + relativedelta(days=1)).strftime("%Y-%m-%d")
-        query = query.filter(SearchLogs.ts < end_plus_one)
-    if code is not None:
-        query = query.filter(SearchLogs.code == code)
-    return query
-
-@cache.memoize(timeout=86400)
-def get_num_unique_courses(year=None, semester=None, start_date=None, end_date=None, code=None):
-    """Return the number of unique searched course codes in the filtered dataset."""
-    query = db.session.query(db.func.count(db.func.distinct(SearchLogs.code)))
-    query = apply_search_log_filters(
-        query,
-        year=year,
-        semester=semester,
-        start_date=start_date,
-        end_date=end_date,
-        code=code,
-    )
-    return query.scalar()
-
-@cache.memoize(timeout=86400)
-def get_median_searches_per_course(year=None, semester=None, start_date=None, end_date=None, code=None):
-    """Return the median number of searches per course."""
-    subquery = db.session.query(
-        SearchLogs.code,
-        db.func.count(SearchLogs.id).label("cnt")
-    )
-    subquery = apply_search_log_filters(
-        subquery,
-        year=year,
-        semester=semester,
-        start_date=start_date,
-        end_date=end_date,
-        code=code,
-    )
-
-    subquery = (
-        subquery.group_by(SearchLogs.code)
-                .subquery()
-    )
-
-    median_query = db.session.query(
-        db.func.percentile_cont(0.5).within_group(subquery.c.cnt)
-    )
-
-    return median_query.scalar()
-
-@cache.memoize(timeout=86400)
-def get_searches_for_top_50_courses(year=None, semester=None, start_date=None, end_date=None, code=None):
-    """Return percentage of searches from the top 50 courses."""
-
-    base_query = db.session.query(SearchLogs)
-    base_query = apply_search_log_filters(
-        base_query,
-        year=year,
-        semester=semester,
-        start_date=start_date,
-        end_date=end_date,
-        code=code,
-    )
-
-    total_searches = base_query.count()
-
-    if total_searches == 0:
-        return 0
-
-    subquery = db.session.query(
-        SearchLogs.code,
-        db.func.count(SearchLogs.id).label("cnt")
-    )
-    subquery = apply_search_log_filters(
-        subquery,
-        year=year,
-        semester=semester,
-        start_date=start_date,
-        end_date=end_date,
-        code=code,
-    )
-    subquery = (
-        subquery.group_by(SearchLogs.code)
-        .order_by(db.desc("cnt"))
-        .limit(50)
-        .subquery()
-    )
+def get_course_stats(year=None, semester=None, start_date=None, end_date=None, code=None, limit=10):
+    """
+    Compute the Courses page statistics from one set of per-course search counts.
 
-    top_50_searches = (
-        db.session.query(db.func.sum(subquery.c.cnt))
-        .scalar()
-    )
+    Parameters:
+    - limit (int): Number of most searched courses to return. `code` is appended if it isn't among them.
 
-    return top_50_searches / total_searches
+    Returns:
+    - dict: top_courses (DataFrame of code and frequency, most searched first), num_courses,
+      median (searches per course) and top_50_share (fraction of searches for the top 50 courses).
+    """
+    counts = get_course_counts(year=year, semester=semester, start_date=start_date, end_date=end_date)
+    total = counts["cnt"].sum()
+    return {
+        "top_courses": get_top_courses(counts, limit, code),
+        "num_courses": len(counts),
+        "median": float(counts["cnt"].median()) if len(counts) else None,
+        "top_50_share": float(counts["cnt"].iloc[:50].sum()) / float(total) if total else 0,
+    }
 
 def get_box_styles() -> tuple[dict]:
     """Returns the style dict for boxes in the analytics page
@@ -402,15 +342,17 @@ def create_home_callbacks(dash_app):
                                                                                               semester, year, sem_lock,
                                                                                               date_range)
 
-        engine = get_sqlalchemy_engine()
         if code and len(code) == 8:
             code = code.upper()
         else:
             code = None
-        grouped_df = group_data_from_db(engine, year=year, semester=semester, interval=interval, start_date=new_start_date_str, end_date=end_date_str, code=code)
+        grouped_df = group_data_from_db(year=year, semester=semester, interval=interval, start_date=new_start_date_str, end_date=end_date_str, code=code)
         
-        fig1, df_code_only = generate_plot(grouped_df.copy(), code, interval=interval)
-        most_searched_course, frequency =  get_most_searched_course(engine, year=year, semester=semester, limit=1, code=code).iloc[0]
+        plot_df = downsample_series(grouped_df, DASH_MAX_POINTS, DASH_DOWNSAMPLE)
+        fig1, df_code_only = generate_plot(plot_df.copy(), code, interval=interval)
+        top_courses = get_most_searched_course(year=year, semester=semester, start_date=new_start_date_str,
+                                               end_date=end_date_str, limit=1)
+        most_searched_course = top_courses['code'].iloc[0] if len(top_courses) else "None"
 
         # Calculate number of days in timeframe
         if end_date is None:
@@ -517,32 +459,22 @@ def create_courses_callbacks(dash_app):
         else:
             code = None
 
-        engine = get_sqlalchemy_engine()
-        df = get_most_searched_course(engine, year=year, semester=semester, limit=10, code=code)
-        df = df.iloc[::-1].reset_index(drop=True)
-        
-        fig2 = plot_most_frequent_codes(df, code)
-
-        box_style, left_box_style, middle_box_style, right_box_style = get_box_styles()
-
-        num_courses = get_num_unique_courses(
-            year=year,
-            semester=semester,
-            start_date=new_start_date_str,
-            end_date=end_date_str,
-        )
-        median_num_searches = get_median_searches_per_course(
-            year=year,
-            semester=semester,
-            start_date=new_start_date_str,
-            end_date=end_date_str,
-        )
-        top_50_share = get_searches_for_top_50_courses(
+        stats = get_course_stats(
             year=year,
             semester=semester,
             start_date=new_start_date_str,
             end_date=end_date_str,
+            code=code,
         )
+        df = stats["top_courses"].iloc[::-1].reset_index(drop=True)
+        
+        fig2 = plot_most_frequent_codes(df, code)
+
+        box_style, left_box_style, middle_box_style, right_box_style = get_box_styles()
+
+        num_courses = stats["num_courses"]
+        median_num_searches = stats["median"]
+        top_50_share = stats["top_50_share"]
 
         content = html.Div([
             html.Div([
@@ -593,21 +525,24 @@ def create_hourly_callbacks(dash_app):
         [
         Output('hourly-dynamic-content', 'children'),
         Output('hourly-date-btn','children'),
+        Output('hourly-course-btn','children'),
         Output('hourly-semester-btn','children'),
         Output('hourly-date-picker-range', 'start_date')
         ],
         [
         Input('hourly-close-date', 'n_clicks'),
+        Input('hourly-close-course', 'n_clicks'),
         Input('hourly-close-semester', 'n_clicks'),
         Input('hourly-date-range-radio', 'value'),
         ],
         [
         State('hourly-date-picker-range', 'start_date'),
         State('hourly-date-picker-range', 'end_date'),
+        State('hourly-search-input', 'value'),
         State('hourly-semester-select', 'value'),
         State('hourly-semester-switch','value')],
     )
-    def update_hourly_output(date_clicks, semester_clicks, date_range, start_date, end_date, sem_text, sem_lock):
+    def update_hourly_output(date_clicks, course_clicks, semester_clicks, date_range, start_date, end_date, code, sem_text, sem_lock):
         config={
             'displayModeBar': False,
             'displaylogo': False,                                       
@@ -623,9 +558,14 @@ def create_hourly_callbacks(dash_app):
                                                                                               semester, year, sem_lock,
                                                                                               date_range)
 
-        df = get_search_logs_df(year=year, semester=semester, start_date=new_start_date_str, end_date=end_date_str)
+        if code and len(code) == 8:
+            code = code.upper()
+        else:
+            code = None
+
+        df = get_search_logs_df(year=year, semester=semester, start_date=new_start_date_str, end_date=end_date_str, code=code)
         
-        fig = gen_hourly_heatmap(df.copy())
+        fig = gen_hourly_heatmap(df, code)
     
         content = html.Div([
             dcc.Graph(
@@ -642,6 +582,7 @@ def create_hourly_callbacks(dash_app):
         
         filter_content = [
                 f'Date: {date_time}',
+                f'Course: {code}',
                 f'Semester: {semester_list[sem_text]}',
             ]
         
@@ -662,17 +603,16 @@ def create_general_callbacks(dash_app, page):
                 return not is_open
             return is_open
         
-        if page != "hourly-":
-            @dash_app.callback(
-                Output(f"{page}modal-course", "is_open"),
-                [Input(f"{page}course-btn", "n_clicks"), 
-                Input(f"{page}close-course", "n_clicks")],
-                [State(f"{page}modal-course", "is_open")],
-            )
-            def toggle_course_modal(n1, n2, is_open):
-                if n1 or n2:
-                    return not is_open
-                return is_open
+        @dash_app.callback(
+            Output(f"{page}modal-course", "is_open"),
+            [Input(f"{page}course-btn", "n_clicks"), 
+            Input(f"{page}close-course", "n_clicks")],
+            [State(f"{page}modal-course", "is_open")],
+        )
+        def toggle_course_modal(n1, n2, is_open):
+            if n1 or n2:
+                return not is_open
+            return is_open
 
         if page == "home-":
             @dash_app.callback(
@@ -1,6 +1,10 @@
 import os
-from sqlalchemy import create_engine, text
+import re
+from sqlalchemy import create_engine, text, tuple_
 from sqlalchemy import Column, Integer, Text, TIMESTAMP, text, String
+from sqlalchemy.dialects.postgresql import JSONB
+from ast import literal_eval
+from datetime import date, datetime, timezone
 from sqlalchemy.ext.declarative import declarative_base
 from pathlib import Path
 
@@ -17,9 +21,12 @@ class Course(db.Model):
     code = db.Column(db.String(8), primary_key=True)
     semester = db.Column(db.Integer, primary_key=True)
     year = db.Column(db.Integer, primary_key=True)
-    asmts = db.Column(db.Text)  # Changed to Text for consistency with SQLAlchemy
+    asmts = db.Column(db.Text)  # Legacy Python repr of the assessment tuples
+    assessments = db.Column(JSONB)
 
 class SearchLogs(db.Model):
+    # Partitioned by month on ts with primary key (id, ts), see
+    # migrations/20261019_partition_search_logs_by_month.sql
     __tablename__ = 'search_logs'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     ts = db.Column(TIMESTAMP, server_default=text('CURRENT_TIMESTAMP'))
@@ -29,10 +36,25 @@ class SearchLogs(db.Model):
     event_type = db.Column(db.String(16), nullable=False, server_default=text("'add'"))
     
     __table_args__ = (
-        db.Index('ix_search_logs_code_sem_year', 'code'),
-        db.Index('idx_search_logs_ts', 'ts'),
+        db.Index('idx_search_logs_ts_brin', 'ts', postgresql_using='brin'),
     )
-    
+
+class SearchLogHourly(db.Model):
+    # Search counts per Brisbane-local hour, maintained from search_logs by search_rollup.py
+    __tablename__ = 'search_log_hourly'
+    bucket = db.Column(TIMESTAMP, primary_key=True)
+    code = db.Column(db.Text, primary_key=True)
+    semester = db.Column(db.Integer, primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(16), primary_key=True)
+    frequency = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_search_log_hourly_bucket', 'bucket', postgresql_include=['code', 'semester', 'year', 'frequency']),
+        db.Index('idx_search_log_hourly_year_sem_bucket', 'year', 'semester', 'bucket', postgresql_include=['code', 'frequency']),
+        db.Index('idx_search_log_hourly_code_bucket', 'code', 'bucket', postgresql_include=['semester', 'year', 'frequency']),
+    )
+
 def create_database(app):
     """
     Create all tables in the database if they don't already exist.
@@ -90,6 +112,246 @@ def run_startup_migrations(app):
                     {"filename": migration_file.name}
                 )
 
+SEARCH_LOG_PARTITION_MONTHS_AHEAD = int(os.getenv("SEARCH_LOG_PARTITION_MONTHS_AHEAD", 3))
+SEARCH_LOG_PARTITION_PATTERN = re.compile(r"^search_logs_(\d{4})_(\d{2})$")
+
+
+def add_months(day: date, months: int) -> date:
+    """Returns the first day of the month `months` after the month containing `day`"""
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def utc_today() -> date:
+    """search_logs.ts is naive UTC, so partition months follow the UTC date"""
+    return datetime.now(timezone.utc).date()
+
+
+def search_log_partition_name(month: date) -> str:
+    return f"search_logs_{month.year}_{month.month:02d}"
+
+
+def plan_search_log_partitions(today: date, months_ahead: int):
+    """Returns [(partition name, start, end)] for the current month through `months_ahead`
+    months ahead, with [start, end) the range of ts the partition holds"""
+    month = add_months(today, 0)
+    plan = []
+    for offset in range(months_ahead + 1):
+        start = add_months(month, offset)
+        plan.append((search_log_partition_name(start), start, add_months(start, 1)))
+    return plan
+
+
+def search_log_partitions_to_detach(partitions: dict, older_than_months: int, today: date):
+    """Returns the names of partitions ({name: first day of its month}) whose month ended
+    more than `older_than_months` months before the current one, oldest first"""
+    cutoff = add_months(today, -older_than_months)
+    return [
+        name for name, month in sorted(partitions.items(), key=lambda item: item[1])
+        if add_months(month, 1) <= cutoff
+    ]
+
+
+def get_search_log_partitions(conn):
+    """Returns {partition name: first day of its month} for the monthly search_logs partitions"""
+    rows = conn.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'search_logs'::regclass
+    """)).fetchall()
+    partitions = {}
+    for (name,) in rows:
+        match = SEARCH_LOG_PARTITION_PATTERN.match(name)
+        if match:
+            partitions[name] = date(int(match.group(1)), int(match.group(2)), 1)
+    return partitions
+
+
+def search_logs_is_partitioned(conn) -> bool:
+    return conn.execute(text(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('search_logs')"
+    )).scalar() is True
+
+
+def list_search_log_partitions(app):
+    """Returns [(partition name, first day of its month)] for the monthly search_logs partitions, oldest first"""
+    with app.app_context(), db.engine.connect() as conn:
+        if not search_logs_is_partitioned(conn):
+            return []
+        return sorted(get_search_log_partitions(conn).items(), key=lambda item: item[1])
+
+
+def ensure_search_log_partitions(app, months_ahead: int = SEARCH_LOG_PARTITION_MONTHS_AHEAD, today: date = None):
+    """Create monthly search_logs partitions from the current month through `months_ahead` months ahead.
+
+    Rows that already landed in search_logs_default for a new month are moved into its partition.
+
+    Returns:
+        list[str]: Names of the partitions created
+    """
+    plan = plan_search_log_partitions(today or utc_today(), months_ahead)
+    created = []
+    try:
+        with app.app_context(), db.engine.begin() as conn:
+            if not search_logs_is_partitioned(conn):
+                return created
+            # Workers start together, so only one of them creates partitions at a time
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('search_logs_partitions'))"))
+            existing = get_search_log_partitions(conn)
+
+            for name, start, end in plan:
+                if name in existing:
+                    continue
+
+                bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                stranded = conn.execute(
+                    text("SELECT EXISTS (SELECT 1 FROM search_logs_default WHERE ts >= :start AND ts < :end)"),
+                    {"start": start, "end": end},
+                ).scalar()
+                if not stranded:
+                    conn.execute(text(f"CREATE TABLE {name} PARTITION OF search_logs FOR VALUES {bounds}"))
+                else:
+                    conn.execute(text(f"CREATE TABLE {name} (LIKE search_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+                    conn.execute(
+                        text(f"""
+                            WITH moved AS (
+                                DELETE FROM search_logs_default WHERE ts >= :start AND ts < :end RETURNING *
+                            )
+                            INSERT INTO {name} SELECT * FROM moved
+                        """),
+                        {"start": start, "end": end},
+                    )
+                    conn.execute(text(f"ALTER TABLE search_logs ATTACH PARTITION {name} FOR VALUES {bounds}"))
+                created.append(name)
+    except Exception as e:
+        print(f"Error creating search_logs partitions: {e}")
+        return []
+
+    if created:
+        print(f"Created search_logs partitions: {', '.join(created)}")
+    return created
+
+
+def detach_search_log_partitions(app, older_than_months: int, drop: bool = False, today: date = None):
+    """Detach monthly search_logs partitions for months that ended more than `older_than_months` ago.
+
+    Detached partitions stay as standalone tables (e.g. for archiving) unless `drop` is set.
+
+    Returns:
+        list[str]: Names of the partitions detached
+    """
+    today = today or utc_today()
+    detached = []
+    with app.app_context(), db.engine.begin() as conn:
+        if not search_logs_is_partitioned(conn):
+            return detached
+        for name in search_log_partitions_to_detach(get_search_log_partitions(conn), older_than_months, today):
+            conn.execute(text(f"ALTER TABLE search_logs DETACH PARTITION {name}"))
+            if drop:
+                conn.execute(text(f"DROP TABLE {name}"))
+            detached.append(name)
+    return detached
+
+
+def parse_weight_value(weight):
+    """Return the numeric part of a weight such as '20%' or '33.33%', or None if it has none."""
+    match = re.match(r"^\s*(\d+(?:\.\d+)?)", str(weight))
+    if match is None:
+        return None
+    return float(match.group(1))
+
+def assessments_to_json(weightings):
+    """Convert scraped (title, weight) tuples into the JSONB layout stored on Course.assessments."""
+    return [
+        {"title": item[0], "weight": item[1], "weight_value": parse_weight_value(item[1])}
+        for item in weightings
+    ]
+
+def assessments_from_json(assessments):
+    """Convert Course.assessments back into the (title, weight) tuples used by the API."""
+    return [(item["title"], item["weight"]) for item in assessments]
+
+def get_existing_course_keys(keys):
+    """Check which courses are stored with a single query, without loading their assessments.
+
+    Args:
+        keys (list[tuple]): (code, semester, year) tuples, with semester and year as ints
+
+    Returns:
+        set: The (code, semester, year) keys that exist in `courses`
+    """
+    keys = list(set(keys))
+    if not keys:
+        return set()
+
+    rows = db.session.query(Course.code, Course.semester, Course.year).filter(
+        tuple_(Course.code, Course.semester, Course.year).in_(keys)
+    ).all()
+    return {(code, semester, year) for code, semester, year in rows}
+
+
+def get_courses_by_key(keys):
+    """Fetch many stored courses with a single query.
+
+    Args:
+        keys (list[tuple]): (code, semester, year) tuples, with semester and year as ints
+
+    Returns:
+        dict: {(code, semester, year): [(title, weight), ...]} for the courses that exist
+    """
+    keys = list(set(keys))
+    if not keys:
+        return {}
+
+    found_courses = db.session.query(Course).filter(
+        tuple_(Course.code, Course.semester, Course.year).in_(keys)
+    ).all()
+
+    courses = {}
+    for course in found_courses:
+        if course.assessments is not None:
+            weightings = assessments_from_json(course.assessments)
+        else:
+            weightings = literal_eval(course.asmts)
+        courses[(course.code, course.semester, course.year)] = weightings
+    return courses
+
+def backfill_course_assessments(app):
+    """Convert legacy repr-encoded Course.asmts rows into Course.assessments.
+    Run once after the 20261018 migration with backfill_assessments.py.
+
+    Rows whose asmts can't be parsed into (title, weight) tuples are skipped and left
+    for manual review.
+
+    Returns:
+        tuple: (backfilled, skipped) row counts
+    """
+    with app.app_context():
+        legacy_courses = db.session.query(Course).filter(
+            Course.assessments.is_(None),
+            Course.asmts.isnot(None),
+        ).all()
+        if not legacy_courses:
+            return 0, 0
+
+        backfilled = skipped = 0
+        for course in legacy_courses:
+            try:
+                course.assessments = assessments_to_json(literal_eval(course.asmts))
+                backfilled += 1
+            except (ValueError, SyntaxError, TypeError, IndexError) as e:
+                skipped += 1
+                print(f"Skipping assessments backfill for {course.code} {course.semester} {course.year}: {e}")
+        try:
+            db.session.commit()
+            print(f"Backfilled assessments for {backfilled} courses, skipped {skipped} malformed rows.")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error backfilling course assessments: {e}")
+            return 0, skipped
+        return backfilled, skipped
+
 def get_sqlalchemy_engine():
     """Create and return an SQLAlchemy engine for PostgreSQL."""
     db_user = os.getenv("POSTGRES_USER")
@@ -1,18 +1,52 @@
-from flask_caching import Cache
 from datetime import datetime
 from pathlib import Path
 import json
+import os
 from flask import current_app
 from analyse_search import load_data
+from cache_backends import NamespacedCache
 
-cache = Cache(config={'CACHE_TYPE': 'simple', 'CACHE_DEFAULT_TIMEOUT': 300}) 
 THIS_FOLDER = (Path(__file__).parent / "data").resolve()
 
+# CACHE_BACKEND selects where cached values live. "sqlite" and "filesystem" are shared by
+# every gunicorn worker on the host, "simple" keeps a private copy per worker.
+CACHE_BACKENDS = {
+    "simple": "cache_backends.SimpleStatsCache",
+    "filesystem": "cache_backends.FileSystemStatsCache",
+    "sqlite": "cache_backends.SQLiteStatsCache",
+}
+
+def get_cache_config():
+    """
+    Build the flask_caching config from the CACHE_BACKEND, CACHE_DIR and CACHE_THRESHOLD env vars.
+    """
+    backend = os.getenv("CACHE_BACKEND", "sqlite").lower()
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"Unsupported CACHE_BACKEND: {backend}. Use one of {list(CACHE_BACKENDS.keys())}.")
+
+    cache_dir = Path(os.getenv("CACHE_DIR", THIS_FOLDER / "cache"))
+    return {
+        'CACHE_TYPE': CACHE_BACKENDS[backend],
+        'CACHE_DEFAULT_TIMEOUT': 300,
+        'CACHE_THRESHOLD': int(os.getenv("CACHE_THRESHOLD", 5000)),
+        'CACHE_DIR': str(cache_dir),
+        'CACHE_SQLITE_PATH': str(cache_dir / "cache.sqlite"),
+    }
+
+cache = NamespacedCache(config=get_cache_config())
+
 def init_cache(app):
     """
     Initialize the cache with the Flask app.
     """
-    cache.init_app(app, config={'CACHE_TYPE': 'simple', 'CACHE_DEFAULT_TIMEOUT': 300})
+    cache.init_app(app, config=get_cache_config())
+
+def get_cache_stats():
+    """
+    Returns the cache hits and misses of this worker, grouped by key namespace
+    (memoized function name or plain key such as 'semester_list').
+    """
+    return cache.get_stats()
 
 def get_semester_list():
     # check if we already cached a recent semester list (within 24 hrs)
@@ -1,4 +1,5 @@
 import requests
+import http_client
 import json
 from bs4 import BeautifulSoup
 import os
@@ -7,6 +8,8 @@ import pandas as pd
 from pathlib import Path
 from io import StringIO
 
+from assessment_extract import ExtractionError, extract_course_profile, extract_legacy_report
+
 
 THIS_FOLDER = (Path(__file__).parent / "data").resolve()
 
@@ -51,23 +54,93 @@ class WrongSemesterError(Exception):
         super().__init__(self.message)
 
 
-def get_table_old(section_code, course_code, semester, year):
-    """Get table for courses before 2024 Semester 2
+LEGACY_REPORT_URL = 'https://www.courses.uq.edu.au/student_section_report.php?report=assessment&profileIds={section_code}'
+COURSE_PROFILE_URL = 'https://course-profiles.uq.edu.au/course-profiles/{section_code}#assessment'
 
-    Args:
-        section_code (str): Course code
-    """
+
+def is_legacy_semester(semester: int, year: int) -> bool:
+    """Courses before 2024 Semester 2 use the old version of course profile"""
+    return (year == 2024 and semester == 1) or year < 2024
+
+def get_legacy_headers():
     headers = requests.utils.default_headers()
     headers.update(
         {
             'User-Agent': 'My User Agent 1.0',
         }
     )
-    url = f'https://www.courses.uq.edu.au/student_section_report.php?report=assessment&profileIds={section_code}'
-    page = requests.get(url, headers=headers)
-    html = page.text.replace('<br />','||')
+    return headers
+
+def get_course_profile_headers():
+    return {
+        "User-Agent": (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/124.0.0.0 Safari/537.36"
+        ),
+        "Accept": (
+            "text/html,application/xhtml+xml,application/xml;q=0.9,"
+            "image/avif,image/webp,image/apng,*/*;q=0.8"
+        ),
+        "Accept-Language": "en-US,en;q=0.9",
+        "Accept-Encoding": "gzip, deflate, br",
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1",
+        "Sec-Fetch-Dest": "document",
+        "Sec-Fetch-Mode": "navigate",
+        "Sec-Fetch-Site": "none",
+        "Sec-Fetch-User": "?1",
+    }
+
+def fetch_assessment_page(section_code, semester, year):
+    """Download the page holding a course's assessment table
+
+    Args:
+        section_code (str): Code for the course profile page
+        semester (int): Semester for course
+        year (int): year for course
 
-    if page.status_code != 200 or not html.strip() or "<table" not in html.lower():
+    Returns:
+        tuple[int, str]: HTTP status code and page HTML
+    """
+    if is_legacy_semester(semester, year):
+        page = http_client.get(LEGACY_REPORT_URL.format(section_code=section_code), headers=get_legacy_headers())
+    else:
+        page = http_client.get(COURSE_PROFILE_URL.format(section_code=section_code), headers=get_course_profile_headers())
+    return page.status_code, page.text
+
+def parse_assessment_page(status_code, html, course_code, semester, year):
+    """Extract the assessment items from a page returned by fetch_assessment_page
+
+    Args:
+        status_code (int): HTTP status code of the page
+        html (str): Page HTML
+        course_code (str): Course code
+        semester (int): Semester for course
+        year (int): year for course
+    """
+    legacy = is_legacy_semester(semester, year)
+    try:
+        if legacy:
+            table = extract_legacy_report(status_code, html, course_code, semester, year)
+        else:
+            table = extract_course_profile(html, course_code, semester, year)
+    except ExtractionError as e:
+        print(f"Fast extraction skipped for {course_code} {semester} {year}: {e}")
+    else:
+        if table is None:
+            raise IncorrectCourseProfileError(course_code, semester, year)
+        return table
+
+    if legacy:
+        return parse_legacy_report(status_code, html, course_code, semester, year)
+    return parse_course_profile(html, course_code, semester, year)
+
+def parse_legacy_report(status_code, html, course_code, semester, year):
+    """Parse the assessment report used for courses before 2024 Semester 2"""
+    html = html.replace('<br />','||')
+
+    if status_code != 200 or not html.strip() or "<table" not in html.lower():
         raise IncorrectCourseProfileError(course_code, semester, year)
 
     expected_semester_text = f"Sem {semester} {year}"
@@ -105,42 +178,8 @@ def get_table_old(section_code, course_code, semester, year):
     df.loc[df['Assessment Task'].str.contains("||"), ['Assessment Task']] = df['Assessment Task'].str.partition('||')[0]
     return list(df.itertuples(index=False, name=None))
 
-def get_table(semester, year, course_code, section_code):
-    """Gets the assessment items for courses
-
-    Args:
-        semester (int): Semester for course
-        year (int): year for course
-        course_code (str): Course code
-        section_code (str): Code for the course profile page
-    """
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/124.0.0.0 Safari/537.36"
-        ),
-        "Accept": (
-            "text/html,application/xhtml+xml,application/xml;q=0.9,"
-            "image/avif,image/webp,image/apng,*/*;q=0.8"
-        ),
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1",
-        "Sec-Fetch-Dest": "document",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-Site": "none",
-        "Sec-Fetch-User": "?1",
-    }
-    
-    # For previous semesters, use old version of course profile
-    if (year == 2024 and semester == 1)or year < 2024:
-        return get_table_old(section_code, course_code, semester, year)
-    
-    url = f'https://course-profiles.uq.edu.au/course-profiles/{section_code}#assessment'
-    page = requests.get(url, headers=headers)
-    html_content = page.text
+def parse_course_profile(html_content, course_code, semester, year):
+    """Parse the course profile page used from 2024 Semester 2 onwards"""
     soup = BeautifulSoup(html_content, 'html.parser')
 
     # Check that course is correct semester and year
@@ -189,6 +228,27 @@ def get_table(semester, year, course_code, section_code):
     df.loc[df['Weight'].str.contains("%"), ['Weight']] = df['Weight'].str.partition('%')[0]  + "%"
     return list(df.itertuples(index=False, name=None))
 
+def get_table_old(section_code, course_code, semester, year):
+    """Get table for courses before 2024 Semester 2
+
+    Args:
+        section_code (str): Course code
+    """
+    status_code, html = fetch_assessment_page(section_code, semester, year)
+    return parse_legacy_report(status_code, html, course_code, semester, year)
+
+def get_table(semester, year, course_code, section_code):
+    """Gets the assessment items for courses
+
+    Args:
+        semester (int): Semester for course
+        year (int): year for course
+        course_code (str): Course code
+        section_code (str): Code for the course profile page
+    """
+    status_code, html = fetch_assessment_page(section_code, semester, year)
+    return parse_assessment_page(status_code, html, course_code, semester, year)
+
 
 def get_assessments(code:str, semester:str, year:str, section_code:str):
     year = int(year)
@@ -0,0 +1,7 @@
+"""Gunicorn settings hooks. Gunicorn reads ./gunicorn.conf.py by default."""
+
+
+def post_worker_init(worker):
+    # Web server only background threads start in each worker after the fork, see app.start_background_jobs
+    import app
+    app.start_background_jobs()
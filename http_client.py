@@ -0,0 +1,116 @@
+"""Shared HTTP client for every upstream call (course profiles, the course profile proxy and
+Discord webhooks).
+
+One keep-alive session per process with per-host connection pools, default connect/read
+timeouts, bounded retries with exponential backoff for idempotent requests, and per-host
+latency metrics.
+
+Only failed connects and 5xx responses are retried. A read timeout is raised straight away:
+retrying it would hold the request thread for another full read timeout per attempt, which
+under gunicorn's worker timeout costs more than the failed lookup.
+"""
+import os
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 10))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 2))
+BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", 0.5))
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", 8))  # Number of hosts to keep pools for
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 10))  # Connections kept alive per host
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+_metrics_lock = threading.Lock()
+_metrics = defaultdict(lambda: {"requests": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=0,  # Never wait out another read timeout on the request path
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),  # Never replay webhook POSTs
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Returns the process-wide session, rebuilding it after a fork so workers don't share sockets"""
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                _session = _build_session()
+                _session_pid = os.getpid()
+    return _session
+
+
+def _record(host: str, seconds: float, failed: bool):
+    with _metrics_lock:
+        host_metrics = _metrics[host]
+        host_metrics["requests"] += 1
+        host_metrics["total_seconds"] += seconds
+        host_metrics["max_seconds"] = max(host_metrics["max_seconds"], seconds)
+        if failed:
+            host_metrics["errors"] += 1
+
+
+def request(method: str, url: str, timeout=None, **kwargs) -> requests.Response:
+    """Send a request through the shared session.
+
+    Args:
+        method (str): HTTP method
+        url (str): URL to request
+        timeout (float | tuple, optional): Overrides the default (connect, read) timeout
+
+    Returns:
+        requests.Response: The response. Connection errors and timeouts are raised after retries.
+    """
+    if timeout is None:
+        timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+    host = urlsplit(url).netloc
+    started = time.perf_counter()
+    failed = True
+    try:
+        response = get_session().request(method, url, timeout=timeout, **kwargs)
+        failed = response.status_code >= 500
+        return response
+    finally:
+        _record(host, time.perf_counter() - started, failed)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def get_metrics() -> dict:
+    """Returns {host: {requests, errors, total_seconds, max_seconds, avg_seconds}} for this process"""
+    with _metrics_lock:
+        return {
+            host: {**values, "avg_seconds": values["total_seconds"] / values["requests"] if values["requests"] else 0.0}
+            for host, values in _metrics.items()
+        }
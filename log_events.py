@@ -6,6 +6,8 @@ import psycopg2
 from psycopg2 import sql
 from datetime import datetime
 from db_connection import db, SearchLogs
+from search_log_writer import search_log_writer
+from webhook_dispatcher import webhook_dispatcher
 
 # Load PostgreSQL connection details from environment variables
 DB_CONFIG = {
@@ -32,6 +34,47 @@ def log_search_to_db(code, semester, year, event_type="add"):
         print(f"Error logging search to database: {e}")
 
 
+def log_searches_to_db(searches, event_type="add"):
+    """Log many search events to the PostgreSQL database in a single commit.
+
+    Args:
+        searches (list[tuple]): (code, semester, year) tuples
+        event_type (str): Event type recorded for every search
+    """
+    try:
+        db.session.add_all([
+            SearchLogs(code=code, semester=semester, year=year, event_type=event_type)
+            for code, semester, year in searches
+        ])
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error logging searches to database: {e}")
+
+
+def init_search_log_writer(app):
+    """Write search logs from a background thread in batches instead of once per request"""
+    search_log_writer.init_app(app)
+
+
+def get_search_log_stats():
+    """Returns this worker's search log writer counters and spool backlog"""
+    return search_log_writer.get_stats()
+
+
+def queue_search_logs(searches, event_type="add"):
+    """Hand search events to the batched writer, or write them now if it isn't set up.
+
+    Args:
+        searches (list[tuple]): (code, semester, year) tuples
+        event_type (str): Event type recorded for every search
+    """
+    if search_log_writer.app is None:
+        log_searches_to_db(searches, event_type=event_type)
+        return
+    search_log_writer.enqueue_many(searches, event_type=event_type)
+
+
 def log_error(exception:Exception, code:str, semester:str, year:str):
     """Log errors that occur to the discord webhook
 
@@ -41,16 +84,13 @@ def log_error(exception:Exception, code:str, semester:str, year:str):
         semester (str): Semester used as input
         year (str): Year used as input
     """
-    headers = get_headers()
-    data = get_data()
-    data["content"] = f"<@{os.environ['MANAGER_ID']}> An error has occurred!"
-    data["embeds"] = [
-        {
-            "title" : f"Input: {code} | {semester} | {year}",
-            "description" : f"{exception}",
-        }
-    ]
-    result = requests.post(os.environ['ERROR_LOG_LINK'], json = data, headers=headers)
+    webhook_dispatcher.send(
+        os.environ['ERROR_LOG_LINK'],
+        title=f"Input: {code} | {semester} | {year}",
+        description=f"{exception}",
+        content=f"<@{os.environ['MANAGER_ID']}> An error has occurred!",
+        headers=get_headers(),
+    )
 
 def log_search(code:str, semester:str, year:str, folder, enable_logging:bool, event_type:str="add"):
     """Logs a successful search for a course code.
@@ -62,34 +102,39 @@ def log_search(code:str, semester:str, year:str, folder, enable_logging:bool, ev
         folder (Path): Path to the folder of search_logs.txt
         enable_logging (bool): If true, also sends to discord webhook. If false, only logs event locally
     """
-    headers = get_headers()
-    data = get_data()
+    if enable_logging:
+        webhook_dispatcher.send(os.environ['LOG_LINK'], title=code, description=f"{semester} {year}", headers=get_headers())
+
+    queue_search_logs([(code, semester, year)], event_type=event_type)
+
+def log_searches(searches:list, folder, enable_logging:bool, event_type:str="add"):
+    """Logs several successful searches with one database write. Webhook embeds are coalesced by the dispatcher.
+
+    Args:
+        searches (list[tuple]): (code, semester, year) tuples
+        folder (Path): Path to the folder of search_logs.txt
+        enable_logging (bool): If true, also sends to discord webhook. If false, only logs event locally
+        event_type (str): Event type recorded for every search
+    """
+    if not searches:
+        return
 
-    data["embeds"] = [
-        {
-            "description" : f"{semester} {year}",
-            "title" : code,
-        }
-    ]
     if enable_logging:
-        requests.post(os.environ['LOG_LINK'], json = data, headers=headers)
+        headers = get_headers()
+        for code, semester, year in searches:
+            webhook_dispatcher.send(os.environ['LOG_LINK'], title=code, description=f"{semester} {year}", headers=headers)
 
-    log_search_to_db(code, semester, year, event_type=event_type)
+    queue_search_logs(searches, event_type=event_type)
 
 def log_quiz():
     """Push a log that the quiz page was opened"""
-    headers = get_headers()
-
-    data = get_data()
-    data["username"] = "UQmarks - QUIZ"
-
-    data["embeds"] = [
-        {
-            "description" : "Quiz was used",
-            "title" : "User opened the quiz page",
-        }
-    ]
-    result = requests.post(os.environ['LOG_LINK'], json = data, headers=headers)
+    webhook_dispatcher.send(
+        os.environ['LOG_LINK'],
+        title="User opened the quiz page",
+        description="Quiz was used",
+        username="UQmarks - QUIZ",
+        headers=get_headers(),
+    )
 
 def get_headers():
     """Returns the necessary headers for webhook"""
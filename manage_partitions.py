@@ -0,0 +1,63 @@
+"""Create, list and retire the monthly partitions of search_logs.
+
+Usage:
+    python manage_partitions.py list
+    python manage_partitions.py ensure --months-ahead 6
+    python manage_partitions.py detach --older-than 24 [--drop]
+
+The app creates SEARCH_LOG_PARTITION_MONTHS_AHEAD months of partitions at startup, so
+`ensure` is only needed to create more. `detach` removes partitions for months that ended
+more than --older-than months ago from search_logs. They are kept as standalone tables
+unless --drop is given.
+"""
+import argparse
+import sys
+
+import app as uqmarks
+from db_connection import (
+    SEARCH_LOG_PARTITION_MONTHS_AHEAD,
+    detach_search_log_partitions,
+    ensure_search_log_partitions,
+    list_search_log_partitions,
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Manage the monthly partitions of search_logs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="List monthly partitions")
+
+    ensure = commands.add_parser("ensure", help="Create partitions from this month onwards")
+    ensure.add_argument("--months-ahead", type=int, default=SEARCH_LOG_PARTITION_MONTHS_AHEAD,
+                        help="Months after the current one to create partitions for")
+
+    detach = commands.add_parser("detach", help="Detach partitions for old months")
+    detach.add_argument("--older-than", type=int, required=True,
+                        help="Detach months that ended more than this many months ago")
+    detach.add_argument("--drop", action="store_true", help="Drop detached partitions instead of keeping them")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        partitions = list_search_log_partitions(uqmarks.app)
+        for name, month in partitions:
+            print(f"{name}  {month:%Y-%m}")
+        print(f"{len(partitions)} monthly partitions")
+        return 0
+
+    if args.command == "ensure":
+        created = ensure_search_log_partitions(uqmarks.app, months_ahead=args.months_ahead)
+        print(f"Created {len(created)} partitions")
+        return 0
+
+    if args.older_than < 1:
+        parser.error("--older-than must be at least 1")
+    detached = detach_search_log_partitions(uqmarks.app, args.older_than, drop=args.drop)
+    action = "Dropped" if args.drop else "Detached"
+    print(f"{action} {len(detached)} partitions: {', '.join(detached) or 'none'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
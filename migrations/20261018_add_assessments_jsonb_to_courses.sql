@@ -0,0 +1,5 @@
+-- Assessment items are stored as JSONB ([{title, weight, weight_value}]) instead
+-- of the Python repr kept in asmts. Convert existing rows once with
+-- `python backfill_assessments.py`; until then they are read from asmts.
+ALTER TABLE courses
+ADD COLUMN IF NOT EXISTS assessments JSONB;
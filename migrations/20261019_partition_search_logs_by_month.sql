@@ -0,0 +1,73 @@
+-- Convert search_logs into monthly RANGE partitions on ts (naive UTC).
+--
+-- The old table is renamed and its rows copied into the new partitioned table in this
+-- migration's transaction. Partitions are created from the month of the oldest row
+-- through three months ahead. Later months are created by ensure_search_log_partitions
+-- at startup or with manage_partitions.py. Rows outside every monthly partition
+-- land in search_logs_default.
+--
+-- The primary key must include the partition key, so it becomes (id, ts). Rows whose
+-- ts was NULL are dropped: they can't be placed in a month, and the dashboard queries
+-- always filtered them out.
+DO $$
+DECLARE
+    id_sequence TEXT;
+    month_start DATE;
+    last_month DATE;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'search_logs'::regclass) = 'p' THEN
+        RETURN;
+    END IF;
+
+    id_sequence := pg_get_serial_sequence('search_logs', 'id');
+
+    ALTER TABLE search_logs RENAME TO search_logs_unpartitioned;
+    -- Index names are unique per schema, so free up the primary key's index name
+    ALTER TABLE search_logs_unpartitioned RENAME CONSTRAINT search_logs_pkey TO search_logs_unpartitioned_pkey;
+    -- Keep the id sequence when the old table is dropped
+    EXECUTE format('ALTER SEQUENCE %s OWNED BY NONE', id_sequence);
+
+    EXECUTE format($sql$
+        CREATE TABLE search_logs (
+            id INTEGER NOT NULL DEFAULT nextval(%L::regclass),
+            ts TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            code TEXT NOT NULL,
+            semester INTEGER NOT NULL,
+            year INTEGER NOT NULL,
+            event_type VARCHAR(16) NOT NULL DEFAULT 'add',
+            CONSTRAINT search_logs_pkey PRIMARY KEY (id, ts),
+            CONSTRAINT search_logs_event_type_check CHECK (event_type IN ('page_load', 'add'))
+        ) PARTITION BY RANGE (ts)
+    $sql$, id_sequence);
+    EXECUTE format('ALTER SEQUENCE %s OWNED BY search_logs.id', id_sequence);
+
+    CREATE TABLE search_logs_default PARTITION OF search_logs DEFAULT;
+
+    SELECT COALESCE(date_trunc('month', MIN(ts))::date, date_trunc('month', CURRENT_DATE)::date)
+    INTO month_start
+    FROM search_logs_unpartitioned;
+    last_month := (date_trunc('month', CURRENT_DATE) + INTERVAL '3 months')::date;
+
+    WHILE month_start <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF search_logs FOR VALUES FROM (%L) TO (%L)',
+            'search_logs_' || to_char(month_start, 'YYYY_MM'),
+            month_start,
+            (month_start + INTERVAL '1 month')::date
+        );
+        month_start := (month_start + INTERVAL '1 month')::date;
+    END LOOP;
+
+    INSERT INTO search_logs (id, ts, code, semester, year, event_type)
+    SELECT id, ts, code, semester, year, event_type
+    FROM search_logs_unpartitioned
+    WHERE ts IS NOT NULL;
+
+    DROP TABLE search_logs_unpartitioned;
+END
+$$;
+
+-- Indexes on the partitioned table are created on every partition, current and future
+CREATE INDEX IF NOT EXISTS ix_search_logs_code_sem_year ON search_logs (code);
+CREATE INDEX IF NOT EXISTS idx_search_logs_ts ON search_logs (ts);
+CREATE INDEX IF NOT EXISTS idx_search_logs_event_type ON search_logs (event_type);
@@ -0,0 +1,24 @@
+-- Hourly rollup of search_logs, read by the analytics dashboard instead of the raw events.
+--
+-- bucket is the Brisbane-local hour (Brisbane has no daylight saving, so every local hour
+-- is exactly one UTC hour). search_rollup.py adds the events with ids above the watermark
+-- in rollup_watermarks and then moves the watermark, so each event is counted once.
+CREATE TABLE IF NOT EXISTS search_log_hourly (
+    bucket TIMESTAMP NOT NULL,
+    code TEXT NOT NULL,
+    semester INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    event_type VARCHAR(16) NOT NULL,
+    frequency INTEGER NOT NULL,
+    PRIMARY KEY (bucket, code, semester, year, event_type)
+);
+
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    name TEXT PRIMARY KEY,
+    last_id BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO rollup_watermarks (name, last_id)
+VALUES ('search_log_hourly', 0)
+ON CONFLICT (name) DO NOTHING;
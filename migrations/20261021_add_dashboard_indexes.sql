@@ -0,0 +1,16 @@
+-- Indexes matched to the dashboard's query shapes.
+--
+-- search_logs: the dashboard reads search_log_hourly instead, and the rollup scans new rows
+-- by id and ts, so search_logs only keeps what the rollup needs. Every index here is paid for
+-- on each insert and in each monthly partition. ts is written in roughly append order, so a
+-- BRIN index replaces the btree on ts at a fraction of its size. Nothing looks rows up by
+-- code any more, so the old code index goes.
+CREATE INDEX IF NOT EXISTS idx_search_logs_ts_brin ON search_logs USING brin (ts);
+DROP INDEX IF EXISTS ix_search_logs_code_sem_year;
+DROP INDEX IF EXISTS idx_search_logs_ts;
+
+-- search_log_hourly: the dashboard reads it by date range, optionally narrowed to a
+-- semester or one course, and sums frequency per bucket or per code.
+CREATE INDEX IF NOT EXISTS idx_search_log_hourly_bucket ON search_log_hourly (bucket) INCLUDE (code, semester, year, frequency);
+CREATE INDEX IF NOT EXISTS idx_search_log_hourly_year_sem_bucket ON search_log_hourly (year, semester, bucket) INCLUDE (code, frequency);
+CREATE INDEX IF NOT EXISTS idx_search_log_hourly_code_bucket ON search_log_hourly (code, bucket) INCLUDE (semester, year, frequency);
@@ -0,0 +1,179 @@
+"""Seed the courses table for a semester before students start searching.
+
+Usage:
+    python prescrape.py 2026S2 CSSE1001 MATH1051
+    python prescrape.py 2026S2 --file codes.txt --workers 4 --delay 0.5
+
+Codes already stored for the semester are skipped. Section codes are resolved through
+COURSE_PROFILE_PROXY_URL, course profiles are scraped through the shared scrape engine
+(capped by SCRAPE_CONCURRENCY), and the results are bulk-inserted into `courses`.
+"""
+import argparse
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from sqlalchemy.dialects.postgresql import insert
+
+import app as uqmarks
+from db_connection import db, Course, assessments_to_json, get_courses_by_key
+from scrape_engine import get_assessments_batch
+
+INSERT_BATCH_SIZE = 50
+
+
+class PolitenessLimiter:
+    """Spaces out upstream requests across all worker threads by at least `delay` seconds."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._next_allowed = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_allowed)
+            self._next_allowed = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
+
+def read_course_codes(codes: list, file: str = None) -> list:
+    """Returns the unique, upper-cased course codes given on the command line and/or in a file.
+    The file may separate codes by newlines, spaces or commas, and use '#' for comments."""
+    raw_codes = list(codes)
+    if file:
+        for line in Path(file).read_text(encoding="utf-8").splitlines():
+            line = line.split("#", 1)[0]
+            raw_codes.extend(line.replace(",", " ").split())
+
+    unique_codes = []
+    for code in raw_codes:
+        code = code.strip().upper()
+        if code and code not in unique_codes:
+            unique_codes.append(code)
+    return unique_codes
+
+
+def resolve_section_code(code: str, semester: str, year: str, limiter: PolitenessLimiter) -> str:
+    """Resolve one course's section code through the course profile proxy"""
+    limiter.wait()
+    course_profile_url = uqmarks.fetch_course_profile_url_from_proxy(code, semester, year)
+    if course_profile_url is None:
+        raise uqmarks.CourseMissingError(code)
+    return uqmarks.get_section_code_from_url(course_profile_url, code, semester, year)
+
+
+def insert_courses(rows: list) -> int:
+    """Bulk-insert course rows, ignoring ones another worker stored first. Returns rows inserted."""
+    if not rows:
+        return 0
+    result = db.session.execute(insert(Course).values(rows).on_conflict_do_nothing())
+    db.session.commit()
+    return result.rowcount
+
+
+def prescrape(semester_id: str, codes: list, workers: int = 4, delay: float = 0.5):
+    year, semester = semester_id.split("S", 1)
+    started = time.monotonic()
+    failures = Counter()
+    failed_codes = []
+    inserted = 0
+
+    with uqmarks.app.app_context():
+        keys = [(code, int(semester), int(year)) for code in codes]
+        stored = get_courses_by_key(keys)
+        pending = [code for code in codes if (code, int(semester), int(year)) not in stored]
+        print(f"{len(codes)} codes, {len(stored)} already stored, scraping {len(pending)} "
+              f"with {workers} workers ({delay}s between upstream requests)")
+
+        limiter = PolitenessLimiter(delay)
+        section_codes = {}
+        done = 0
+
+        def record_failure(code, e):
+            nonlocal done
+            done += 1
+            failures[type(e).__name__] += 1
+            failed_codes.append(code)
+            print(f"[{done}/{len(pending)}] {code}: {type(e).__name__}")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(resolve_section_code, code, semester, year, limiter): code
+                for code in pending
+            }
+            for future in as_completed(futures):
+                code = futures[future]
+                try:
+                    section_codes[code] = future.result()
+                except Exception as e:
+                    record_failure(code, e)
+
+        resolved = [code for code in pending if code in section_codes]
+        for start in range(0, len(resolved), INSERT_BATCH_SIZE):
+            chunk = resolved[start:start + INSERT_BATCH_SIZE]
+            results = get_assessments_batch(
+                [(code, semester, year, section_codes[code]) for code in chunk], delay=delay
+            )
+
+            rows = []
+            for code, weightings in zip(chunk, results):
+                if isinstance(weightings, Exception):
+                    record_failure(code, weightings)
+                    continue
+                done += 1
+                rows.append({
+                    "code": code,
+                    "semester": int(semester),
+                    "year": int(year),
+                    "assessments": assessments_to_json(weightings),
+                })
+                uqmarks.cache.delete(uqmarks.negative_course_cache_key(code, semester, year))
+                print(f"[{done}/{len(pending)}] {code}: {len(weightings)} assessment items")
+            inserted += insert_courses(rows)
+
+    elapsed = time.monotonic() - started
+    scraped = len(pending) - sum(failures.values())
+    print()
+    print(f"Scraped {scraped}/{len(pending)} courses in {elapsed:.1f}s "
+          f"({scraped / elapsed if elapsed else 0:.2f} courses/s), inserted {inserted} rows")
+    for reason, count in failures.most_common():
+        print(f"  {reason}: {count}")
+    if failed_codes:
+        print(f"Failed: {' '.join(sorted(failed_codes))}")
+    return scraped, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-scrape course assessments for a semester.")
+    parser.add_argument("semester_id", help="Semester to seed, e.g. 2026S2")
+    parser.add_argument("codes", nargs="*", help="Course codes to scrape")
+    parser.add_argument("--file", help="File containing course codes")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent section code lookups (default: 4)")
+    parser.add_argument("--delay", type=float, default=0.5,
+                        help="Minimum seconds between upstream requests across all workers (default: 0.5)")
+    args = parser.parse_args(argv)
+
+    if not uqmarks.is_valid_semester_id(args.semester_id):
+        parser.error(f"Invalid semester ID: {args.semester_id}")
+    if not uqmarks.COURSE_PROFILE_PROXY_URL:
+        parser.error("COURSE_PROFILE_PROXY_URL must be set to resolve course profiles")
+
+    codes = read_course_codes(args.codes, args.file)
+    invalid_codes = [code for code in codes if not uqmarks.is_valid_course_code(code)]
+    if invalid_codes:
+        parser.error(f"Invalid course codes: {' '.join(invalid_codes)}")
+    if not codes:
+        parser.error("No course codes given")
+
+    _, failures = prescrape(args.semester_id, codes, workers=max(1, args.workers), delay=max(0.0, args.delay))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
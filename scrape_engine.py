@@ -0,0 +1,107 @@
+"""Asyncio scraping engine for course assessment tables.
+
+A single event loop runs on a background thread per process and schedules every scrape,
+whether it comes from a web request (get_assessments) or an offline job
+(get_assessments_batch). A global semaphore caps the number of course-profile fetches in
+flight. Downloads use the shared pooled http_client on a dedicated executor, and parsing
+runs on a separate executor so slow pages never hold the event loop. Scrape throughput is
+therefore bounded by SCRAPE_CONCURRENCY rather than by the number of gunicorn threads.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from get_assessment import fetch_assessment_page, parse_assessment_page
+
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", 8))
+# Must stay well below gunicorn's --timeout (60 s), which also has to cover the proxy lookup
+# and DB write around the scrape, or the worker is killed before the timeout is handled
+SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", 20))
+
+
+class ScrapeEngine:
+    def __init__(self, concurrency: int = SCRAPE_CONCURRENCY):
+        self.concurrency = concurrency
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._semaphore = None
+        self._fetch_pool = None
+        self._parse_pool = None
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        # Start lazily, and again after a fork, since threads don't survive into gunicorn workers
+        if self._loop is not None and self._pid == os.getpid():
+            return self._loop
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="scrape-engine", daemon=True).start()
+                self._fetch_pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="scrape-fetch")
+                self._parse_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="scrape-parse")
+                self._semaphore = asyncio.Semaphore(self.concurrency)
+                self._loop = loop
+                self._pid = os.getpid()
+        return self._loop
+
+    async def scrape(self, code: str, semester, year, section_code: str):
+        """Fetch and parse one course's assessment table"""
+        semester = int(semester)
+        year = int(year)
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            status_code, html = await loop.run_in_executor(
+                self._fetch_pool, fetch_assessment_page, section_code, semester, year
+            )
+        return await loop.run_in_executor(
+            self._parse_pool, parse_assessment_page, status_code, html, code, semester, year
+        )
+
+    async def scrape_many(self, courses: list, delay: float = 0.0):
+        """Scrape many courses concurrently, starting them at least `delay` seconds apart.
+        Results line up with `courses`; failures are returned as exception instances."""
+        next_start = time.monotonic()
+
+        async def scrape_politely(course):
+            nonlocal next_start
+            start = max(time.monotonic(), next_start)
+            next_start = start + delay
+            await asyncio.sleep(start - time.monotonic())
+            return await self.scrape(*course)
+
+        return await asyncio.gather(*(scrape_politely(course) for course in courses), return_exceptions=True)
+
+    def run(self, coroutine, timeout: float = None):
+        """Run a coroutine on the engine's loop from synchronous code and wait for its result"""
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+
+engine = ScrapeEngine()
+
+
+def get_assessments(code: str, semester: str, year: str, section_code: str):
+    """Scrape one course's assessment items, same contract as get_assessment.get_assessments"""
+    return engine.run(engine.scrape(code, semester, year, section_code), timeout=SCRAPE_TIMEOUT)
+
+
+def get_assessments_batch(courses: list, delay: float = 0.0):
+    """Scrape many courses under the engine's global concurrency cap.
+
+    Args:
+        courses (list[tuple]): (code, semester, year, section_code) tuples
+        delay (float): Minimum seconds between starting consecutive scrapes
+
+    Returns:
+        list: Assessment tuples for each course, or the exception raised while scraping it
+    """
+    if not courses:
+        return []
+    return engine.run(engine.scrape_many(list(courses), delay=delay))
@@ -0,0 +1,246 @@
+"""Background batched writer for search_logs.
+
+Requests never write to Postgres. With SEARCH_SPOOL_DIR set (the default), each event is
+appended to a local spool file (see search_spool.py). A flusher thread seals the spool
+segment once SEARCH_LOG_BATCH_SIZE events are waiting or SEARCH_LOG_FLUSH_INTERVAL
+seconds have passed, and replays ready segments into search_logs. Each segment goes in
+with one multi-row INSERT and one commit. While the database is slow or down, events
+simply wait on disk, and survive a restart.
+
+Without a spool, or when the disk write fails, rows go on a bounded in-process queue
+instead. That queue holds at most SEARCH_LOG_QUEUE_SIZE rows. When it is full, new rows
+are dropped and counted. Anything still queued is written when the worker exits.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from db_connection import db, SearchLogs
+from search_spool import SearchSpool
+
+BATCH_SIZE = int(os.getenv("SEARCH_LOG_BATCH_SIZE", 500))
+FLUSH_INTERVAL = float(os.getenv("SEARCH_LOG_FLUSH_INTERVAL", 2))
+QUEUE_SIZE = int(os.getenv("SEARCH_LOG_QUEUE_SIZE", 10000))
+SPOOL_DIR = os.getenv("SEARCH_SPOOL_DIR", str(Path(__file__).resolve().parent / "data" / "spool"))
+
+
+def utc_now() -> datetime:
+    """search_logs.ts is a naive UTC timestamp"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class SearchLogWriter:
+    def __init__(self, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL,
+                 queue_size: int = QUEUE_SIZE, write_rows=None, spool: SearchSpool = None):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool = spool
+        self.app = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._write_rows = write_rows or self._insert_rows
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stopping = threading.Event()
+        self._wake = threading.Event()
+        self._stats = {
+            "queued": 0, "spooled": 0, "written": 0, "dropped": 0, "failed": 0, "flushes": 0,
+            "replay_errors": 0, "malformed": 0, "flusher_errors": 0,
+        }
+
+    def init_app(self, app):
+        self.app = app
+        if self.spool is not None:
+            recovered = self.spool.recover()
+            if recovered:
+                print(f"Recovered {recovered} search log spool segments")
+            self._ensure_started()  # Replay whatever is already spooled
+        atexit.register(self.close)
+
+    def _ensure_started(self):
+        # Start lazily, and again after a fork, since threads don't survive into gunicorn workers
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="search-log-writer", daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def enqueue(self, code: str, semester, year, event_type: str = "add") -> bool:
+        """Queue one search log row. Returns False if the queue is full and the row was dropped."""
+        return self.enqueue_many([(code, semester, year)], event_type=event_type) == 1
+
+    def enqueue_many(self, searches: list, event_type: str = "add") -> int:
+        """Queue (code, semester, year) rows sharing one event type. Returns the number queued."""
+        self._ensure_started()
+        ts = utc_now()
+        rows = [
+            {"ts": ts, "code": code, "semester": int(semester), "year": int(year), "event_type": event_type}
+            for code, semester, year in searches
+        ]
+
+        if self.spool is not None:
+            try:
+                self.spool.append(rows)
+            except OSError as e:
+                print(f"Error writing search logs to spool: {e}")
+            else:
+                with self._lock:
+                    self._stats["spooled"] += len(rows)
+                if self.spool.active_rows >= self.batch_size:
+                    self._wake.set()
+                return len(rows)
+
+        queued = 0
+        for row in rows:
+            try:
+                self._queue.put_nowait(row)
+                queued += 1
+            except queue.Full:
+                with self._lock:
+                    self._stats["dropped"] += 1
+        with self._lock:
+            self._stats["queued"] += queued
+        return queued
+
+    def _take_batch(self, deadline: float) -> list:
+        """Block until a full batch is ready, the deadline passes or the writer is stopping"""
+        rows = []
+        while len(rows) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stopping.is_set():
+                break
+            try:
+                rows.append(self._queue.get(timeout=min(remaining, 0.5)))
+            except queue.Empty:
+                continue
+        return rows
+
+    def _run(self):
+        while not self._stopping.is_set():
+            # Nothing restarts this thread until the next fork, so an error must not end the loop
+            try:
+                if self.spool is None:
+                    rows = self._take_batch(time.monotonic() + self.flush_interval)
+                    if rows:
+                        self._write(rows)
+                    continue
+
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                if not self._stopping.is_set():
+                    self.flush()
+            except Exception as e:
+                with self._lock:
+                    self._stats["flusher_errors"] += 1
+                print(f"Error in search log flusher: {e}")
+
+    def _drain(self) -> list:
+        rows = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                return rows
+
+    def _write(self, rows: list, spooled: bool = False) -> bool:
+        with self._flush_lock:
+            try:
+                self._write_rows(rows)
+            except Exception as e:
+                with self._lock:
+                    # Spooled rows stay on disk and are retried, queued rows are lost
+                    if spooled:
+                        self._stats["replay_errors"] += 1
+                    else:
+                        self._stats["failed"] += len(rows)
+                print(f"Error writing {len(rows)} search logs to database: {e}")
+                return False
+            with self._lock:
+                self._stats["written"] += len(rows)
+                self._stats["flushes"] += 1
+            return True
+
+    def _insert_rows(self, rows: list):
+        if self.app is None:
+            raise RuntimeError("SearchLogWriter.init_app has not been called")
+        with self.app.app_context():
+            try:
+                # A list of parameter sets is sent as batched multi-row INSERT ... VALUES statements
+                db.session.execute(SearchLogs.__table__.insert(), rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def replay_spool(self) -> int:
+        """Seal this worker's spool segment and write every ready segment. Returns rows written.
+        Stops at the first failed segment, which stays spooled for the next attempt."""
+        if self.spool is None:
+            return 0
+        try:
+            self.spool.seal()
+        except OSError as e:
+            print(f"Error sealing search log spool: {e}")
+
+        written = 0
+        while True:
+            segment = self.spool.claim()
+            if segment is None:
+                return written
+            try:
+                rows, malformed = self.spool.read(segment)
+            except OSError as e:
+                print(f"Error reading search log spool segment {segment.name}: {e}")
+                self._release(segment)
+                return written
+            with self._lock:
+                self._stats["malformed"] += malformed
+            if rows and not self._write(rows, spooled=True):
+                self._release(segment)
+                return written
+            self.spool.complete(segment)
+            written += len(rows)
+
+    def _release(self, segment):
+        try:
+            self.spool.release(segment)
+        except OSError as e:
+            # Left claimed, so recover() makes it ready again after this worker restarts
+            print(f"Error releasing search log spool segment {segment.name}: {e}")
+
+    def flush(self) -> int:
+        """Write everything queued or spooled so far from the calling thread. Returns rows written."""
+        rows = self._drain()
+        written = 0
+        for i in range(0, len(rows), self.batch_size):
+            if self._write(rows[i:i + self.batch_size]):
+                written += len(rows[i:i + self.batch_size])
+        return written + self.replay_spool()
+
+    def close(self):
+        """Stop the flusher thread and write whatever is still queued or spooled"""
+        self._stopping.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def get_stats(self) -> dict:
+        """Returns counters for this worker, the in-memory queue depth and the spool backlog"""
+        with self._lock:
+            stats = {**self._stats, "pending": self._queue.qsize()}
+        if self.spool is not None:
+            stats["spool"] = self.spool.get_stats()
+        return stats
+
+
+search_log_writer = SearchLogWriter(spool=SearchSpool(SPOOL_DIR) if SPOOL_DIR else None)
@@ -0,0 +1,166 @@
+"""Incremental hourly rollup of search_logs into search_log_hourly.
+
+Every SEARCH_ROLLUP_INTERVAL seconds a background thread counts the search events added
+since the last run, grouped by Brisbane-local hour, code, semester, year and event type,
+and adds those counts to search_log_hourly. The last id rolled up is kept in
+rollup_watermarks, so each run only reads new events and the dashboard reads hourly
+counts instead of raw events.
+
+ids are taken from a sequence before the inserting transaction commits, so a lower id can
+become visible after a higher one. Each run first takes a short EXCLUSIVE lock on
+search_logs. This waits for in-flight inserts to commit, so every id up to the current
+maximum is final before the watermark moves past it.
+
+Events for a Brisbane day that the dashboard already treats as closed (see bucket_cache.py),
+e.g. from a spool replayed after an outage, invalidate the dashboard's cached buckets.
+
+Every worker runs the thread, but a run only goes ahead in the worker holding a Postgres
+advisory lock, so the table lock is taken once per interval rather than once per worker.
+The thread is started by app.start_background_jobs from the web server only, not by the
+CLIs that import app.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import text
+
+from bucket_cache import invalidate_closed_buckets, open_tail_start
+from db_connection import db
+from flask_cache import cache
+
+REFRESH_INTERVAL = float(os.getenv("SEARCH_ROLLUP_INTERVAL", 60))
+WATERMARK_NAME = "search_log_hourly"
+LOCK_TIMEOUT = "5s"
+ADVISORY_LOCK = "search_log_hourly_rollup"
+
+ROLLUP_SQL = text("""
+    WITH counts AS (
+        SELECT
+            date_trunc('hour', ts AT TIME ZONE 'UTC' AT TIME ZONE 'Australia/Brisbane') AS bucket,
+            code, semester, year, event_type, COUNT(*) AS frequency
+        FROM search_logs
+        WHERE id > :start_id AND id <= :end_id
+        GROUP BY 1, 2, 3, 4, 5
+    ), upserted AS (
+        INSERT INTO search_log_hourly (bucket, code, semester, year, event_type, frequency)
+        SELECT bucket, code, semester, year, event_type, frequency FROM counts
+        ON CONFLICT (bucket, code, semester, year, event_type)
+        DO UPDATE SET frequency = search_log_hourly.frequency + EXCLUDED.frequency
+    )
+    SELECT COALESCE(SUM(frequency), 0), MIN(bucket) FROM counts
+""")
+
+
+class SearchRollup:
+    def __init__(self, refresh_interval: float = REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self.app = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stopping = threading.Event()
+        self._stats = {"runs": 0, "events": 0, "skipped": 0, "failed": 0, "invalidations": 0, "last_run": None}
+
+    def init_app(self, app):
+        self.app = app
+        self._ensure_started()
+
+    def _ensure_started(self):
+        # Start lazily, and again after a fork, since threads don't survive into gunicorn workers
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="search-rollup", daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def _run(self):
+        # Roll up straight away so a fresh deployment backfills before the first interval
+        while not self._stopping.is_set():
+            self.refresh()
+            self._stopping.wait(self.refresh_interval)
+
+    def refresh(self) -> int:
+        """Add events above the watermark to search_log_hourly. Returns the number of events
+        rolled up, or 0 if there was nothing new or another worker was already running."""
+        if self.app is None:
+            return 0
+        try:
+            with self.app.app_context():
+                return self._roll_up()
+        except Exception as e:
+            with self._lock:
+                self._stats["failed"] += 1
+            print(f"Error rolling up search logs: {e}")
+            return 0
+
+    def _roll_up(self) -> int:
+        with db.engine.connect() as conn:
+            # Session-level, so it is held across both transactions below and released if
+            # the connection drops
+            locked = conn.execute(
+                text("SELECT pg_try_advisory_lock(hashtext(:name))"), {"name": ADVISORY_LOCK}
+            ).scalar()
+            conn.commit()
+            if not locked:
+                with self._lock:
+                    self._stats["skipped"] += 1
+                return 0
+            try:
+                events, earliest = self._roll_up_locked(conn)
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": ADVISORY_LOCK})
+                conn.commit()
+
+        # Checked after the commit, so a bucket closed in the meantime is caught too
+        if earliest is not None and earliest < open_tail_start():
+            invalidate_closed_buckets(cache)
+            with self._lock:
+                self._stats["invalidations"] += 1
+        return events
+
+    def _roll_up_locked(self, conn) -> tuple:
+        """Returns (events rolled up, earliest hour they were added to, or None)"""
+        with conn.begin():
+            conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+            conn.execute(text("LOCK TABLE search_logs IN EXCLUSIVE MODE"))
+            end_id = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM search_logs")).scalar()
+
+        with conn.begin():
+            # SKIP LOCKED, as a second guard: if another run holds the watermark, this one has nothing to do
+            start_id = conn.execute(
+                text("SELECT last_id FROM rollup_watermarks WHERE name = :name FOR UPDATE SKIP LOCKED"),
+                {"name": WATERMARK_NAME},
+            ).scalar()
+            if start_id is None:
+                with self._lock:
+                    self._stats["skipped"] += 1
+                return 0, None
+            if end_id <= start_id:
+                return 0, None
+
+            events, earliest = conn.execute(ROLLUP_SQL, {"start_id": start_id, "end_id": end_id}).one()
+            events = int(events)
+            conn.execute(
+                text("""
+                    UPDATE rollup_watermarks SET last_id = :end_id, updated_at = CURRENT_TIMESTAMP
+                    WHERE name = :name
+                """),
+                {"end_id": end_id, "name": WATERMARK_NAME},
+            )
+
+        with self._lock:
+            self._stats["runs"] += 1
+            self._stats["events"] += events
+            self._stats["last_run"] = time.time()
+        return events, earliest
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+search_rollup = SearchRollup()
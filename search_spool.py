@@ -0,0 +1,187 @@
+"""Append-only local spool for search events.
+
+Each event is one line, `ts|code|semester|year|event_type`, appended to a segment file
+owned by the current process. The flusher seals its segment by renaming it to `ready-`.
+Any worker can claim a ready segment by renaming it to `claimed-`, and deletes it once
+its rows are committed. Every step is a rename within one directory, so a segment is
+always in exactly one state. On startup, segments left behind by dead processes are made
+ready again and replayed. A crash between the commit and the delete replays that segment
+twice, so delivery is at least once.
+"""
+import glob
+import os
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+FIELD_SEPARATOR = "|"
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def format_row(row: dict) -> str:
+    fields = [
+        row["ts"].isoformat(timespec="microseconds"),
+        row["code"],
+        str(row["semester"]),
+        str(row["year"]),
+        row["event_type"],
+    ]
+    return FIELD_SEPARATOR.join(field.replace(FIELD_SEPARATOR, "").replace("\n", "") for field in fields) + "\n"
+
+
+def parse_row(line: str):
+    """Returns the row for one spooled line, or None if the line is malformed"""
+    try:
+        ts, code, semester, year, event_type = line.rstrip("\n").split(FIELD_SEPARATOR)
+        return {
+            "ts": datetime.fromisoformat(ts),
+            "code": code,
+            "semester": int(semester),
+            "year": int(year),
+            "event_type": event_type,
+        }
+    except ValueError:
+        return None
+
+
+class SearchSpool:
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._fd = None
+        self._fd_pid = None
+        self._path = None
+        self._sequence = 0
+        self._token = secrets.token_hex(4)
+        self.active_rows = 0
+
+    def _owner(self) -> str:
+        # pid plus a per-process token, so a restarted container reusing our pid can
+        # tell our files apart from its own
+        return f"{os.getpid()}-{self._token}"
+
+    def _segment_path(self, state: str, name: str) -> Path:
+        return self.directory / f"{state}-{name}.spool"
+
+    def append(self, rows: list):
+        """Append rows to this process's active segment. Raises OSError if the disk write fails."""
+        if not rows:
+            return
+        data = "".join(format_row(row) for row in rows).encode("utf-8")
+        with self._lock:
+            if self._fd is None or self._fd_pid != os.getpid():
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._sequence += 1
+                self._path = self._segment_path("active", f"{self._owner()}-{self._sequence:06d}")
+                self._fd = os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                self._fd_pid = os.getpid()
+                self.active_rows = 0
+            # One write per call, so a crash loses at most the partial last line
+            os.write(self._fd, data)
+            self.active_rows += len(rows)
+
+    def seal(self):
+        """Close this process's active segment and make it available for replay"""
+        with self._lock:
+            if self._fd is None or self._fd_pid != os.getpid():
+                return
+            os.fsync(self._fd)
+            os.close(self._fd)
+            self._fd = None
+            os.replace(self._path, self._segment_path("ready", self._path.stem[len("active-"):]))
+            self.active_rows = 0
+
+    def claim(self):
+        """Claim the oldest ready segment. Returns its path, or None if nothing is waiting."""
+        ready = []
+        for path in glob.glob(str(self._segment_path("ready", "*"))):
+            try:
+                ready.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                continue  # Claimed by another worker since the glob
+
+        for _, path in sorted(ready):
+            path = Path(path)
+            claimed = self._segment_path("claimed", f"{self._owner()}-{path.stem[len('ready-'):]}")
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                continue  # Another worker claimed it first
+            return claimed
+        return None
+
+    def read(self, path: Path):
+        """Returns (rows, malformed line count) for a claimed segment"""
+        rows, malformed = [], 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    malformed += 1  # Partial line from a crash mid-write
+                    continue
+                row = parse_row(line)
+                if row is None:
+                    malformed += 1
+                else:
+                    rows.append(row)
+        return rows, malformed
+
+    def complete(self, path: Path):
+        path.unlink(missing_ok=True)
+
+    def release(self, path: Path):
+        """Return a claimed segment to the ready pool, e.g. when the database is unavailable"""
+        original = "-".join(path.stem.split("-")[3:])
+        os.replace(path, self._segment_path("ready", original))
+
+    def recover(self) -> int:
+        """Make segments left by processes that no longer exist ready for replay. Returns how many."""
+        recovered = 0
+        for state in ("active", "claimed"):
+            for path in glob.glob(str(self._segment_path(state, "*"))):
+                path = Path(path)
+                parts = path.stem.split("-")
+                try:
+                    pid, token = int(parts[1]), parts[2]
+                except (IndexError, ValueError):
+                    continue  # Not a segment we wrote
+                if pid_alive(pid) and not (pid == os.getpid() and token != self._token):
+                    continue
+                original = "-".join(parts[1:]) if state == "active" else "-".join(parts[3:])
+                try:
+                    os.replace(path, self._segment_path("ready", original))
+                    recovered += 1
+                except FileNotFoundError:
+                    continue
+        return recovered
+
+    def get_stats(self) -> dict:
+        """Returns the spooled backlog: segments and bytes waiting, and the age of the oldest event"""
+        segments = [Path(path) for path in glob.glob(str(self._segment_path("*", "*")))]
+        pending_bytes = 0
+        oldest = None
+        for path in segments:
+            try:
+                pending_bytes += path.stat().st_size
+                with open(path, "r", encoding="utf-8") as f:
+                    row = parse_row(f.readline())
+            except OSError:
+                continue
+            if row is not None and (oldest is None or row["ts"] < oldest):
+                oldest = row["ts"]
+
+        lag_seconds = 0.0
+        if oldest is not None:
+            # Spooled timestamps are naive UTC
+            lag_seconds = max(0.0, time.time() - oldest.replace(tzinfo=timezone.utc).timestamp())
+        return {"segments": len(segments), "bytes": pending_bytes, "lag_seconds": lag_seconds}
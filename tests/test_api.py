@@ -2,8 +2,12 @@ import importlib
 import importlib.util
 import os
 import sys
+import tempfile
+import threading
+import time
 import types
 import unittest
+from datetime import datetime
 from pathlib import Path
 from unittest.mock import Mock
 
@@ -15,6 +19,9 @@ class FakeQuery:
     def first(self):
         return None
 
+    def all(self):
+        return []
+
 
 class FakeSession:
     def query(self, model):
@@ -96,16 +103,39 @@ def load_app_module():
     fake_get_assessment.IncorrectCourseProfileError = IncorrectCourseProfileError
     fake_get_assessment.get_assessments = lambda *args, **kwargs: []
 
+    fake_scrape_engine = types.ModuleType("scrape_engine")
+    fake_scrape_engine.get_assessments = lambda *args, **kwargs: []
+
     fake_log_events = types.ModuleType("log_events")
     fake_log_events.log_search = lambda *args, **kwargs: None
     fake_log_events.log_error = lambda *args, **kwargs: None
+    fake_log_events.log_searches = lambda *args, **kwargs: None
+    fake_log_events.init_search_log_writer = Mock()
+    fake_log_events.get_search_log_stats = lambda: {}
 
     fake_cache = types.ModuleType("flask_cache")
 
     class FakeCacheBackend:
+        def __init__(self):
+            self.values = {}
+
         def init_app(self, app):
             return None
 
+        def get(self, key):
+            return self.values.get(key)
+
+        def set(self, key, value, timeout=None):
+            self.values[key] = value
+            return True
+
+        def delete(self, key):
+            return self.values.pop(key, None) is not None
+
+        def clear(self):
+            self.values.clear()
+            return True
+
         def memoize(self, timeout=None):
             def decorator(func):
                 return func
@@ -117,6 +147,7 @@ def load_app_module():
     fake_cache.get_cached_df = lambda: None
     fake_cache.get_announcement = lambda: ""
     fake_cache.init_cache = lambda app: None
+    fake_cache.get_cache_stats = lambda: {"app.get_course": {"hits": 2, "misses": 1}}
 
     fake_dash_app = types.ModuleType("dash_app")
 
@@ -126,11 +157,19 @@ def load_app_module():
 
     fake_dash_app.create_dash_app = lambda app: FakeDash()
 
+    fake_search_rollup = types.ModuleType("search_rollup")
+    fake_search_rollup.search_rollup = types.SimpleNamespace(init_app=Mock())
+
     fake_db_connection = types.ModuleType("db_connection")
     fake_db_connection.db = FakeDB()
 
     class Course:
-        pass
+        code = "code"
+        semester = "semester"
+        year = "year"
+
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
 
     class SearchLogs:
         pass
@@ -139,6 +178,15 @@ def load_app_module():
     fake_db_connection.SearchLogs = SearchLogs
     fake_db_connection.create_database = lambda app: None
     fake_db_connection.run_startup_migrations = lambda app: None
+    fake_db_connection.ensure_search_log_partitions = lambda app: []
+    fake_db_connection.get_courses_by_key = lambda keys: {}
+    fake_db_connection.get_existing_course_keys = lambda keys: set()
+    fake_db_connection.assessments_to_json = lambda weightings: [
+        {"title": title, "weight": weight} for title, weight in weightings
+    ]
+    fake_db_connection.assessments_from_json = lambda assessments: [
+        (item["title"], item["weight"]) for item in assessments
+    ]
 
     fake_cors = types.ModuleType("flask_cors")
     fake_cors.cross_origin = lambda *args, **kwargs: (lambda func: func)
@@ -177,9 +225,12 @@ def load_app_module():
     for name in [
         "app",
         "get_assessment",
+        "scrape_engine",
+        "course_index",
         "log_events",
         "flask_cache",
         "dash_app",
+        "search_rollup",
         "db_connection",
         "flask_cors",
         "flask_limiter",
@@ -191,9 +242,11 @@ def load_app_module():
         sys.modules.pop(name, None)
 
     sys.modules["get_assessment"] = fake_get_assessment
+    sys.modules["scrape_engine"] = fake_scrape_engine
     sys.modules["log_events"] = fake_log_events
     sys.modules["flask_cache"] = fake_cache
     sys.modules["dash_app"] = fake_dash_app
+    sys.modules["search_rollup"] = fake_search_rollup
     sys.modules["db_connection"] = fake_db_connection
     sys.modules["flask_cors"] = fake_cors
     sys.modules["flask_limiter"] = fake_limiter
@@ -222,8 +275,13 @@ class ApiFeatureTests(unittest.TestCase):
         self.app_module.get_announcement = lambda: ""
         self.app_module.get_course = Mock(return_value=[])
         self.app_module.log_search = Mock()
+        self.app_module.log_searches = Mock()
         self.app_module.log_error = Mock()
+        self.app_module.get_courses_by_key = Mock(return_value={})
+        self.app_module.get_existing_course_keys = Mock(return_value=set())
+        self.app_module.course_index = sys.modules["course_index"].CourseIndex()
         self.app_module.course_exists_for_semester_id = Mock(return_value=False)
+        self.app_module.cache.clear()
 
     def test_get_semesters_returns_formatted_options(self):
         self.app_module.get_semester_list = lambda: {
@@ -242,6 +300,24 @@ class ApiFeatureTests(unittest.TestCase):
             ],
         )
 
+    def test_health_cache_reports_this_workers_cache_stats(self):
+        response = self.client.get("/health/cache")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["pid"], os.getpid())
+        self.assertEqual(response.get_json()["namespaces"], {"app.get_course": {"hits": 2, "misses": 1}})
+
+    def test_background_jobs_start_from_the_web_server_not_on_import(self):
+        rollup = self.app_module.search_rollup
+        init_search_log_writer = self.app_module.init_search_log_writer
+        rollup.init_app.assert_not_called()
+        init_search_log_writer.assert_not_called()
+
+        self.app_module.start_background_jobs()
+
+        rollup.init_app.assert_called_once_with(self.app_module.app)
+        init_search_log_writer.assert_called_once_with(self.app_module.app)
+
     def test_get_course_requires_course_code_and_semester(self):
         response = self.client.get("/api/getcourse/")
 
@@ -312,6 +388,34 @@ class ApiFeatureTests(unittest.TestCase):
             "CSSE1001", "1", "2026", section_code="CSSE1001-123-456"
         )
 
+    def test_get_course_serves_cached_response_with_etag_and_304(self):
+        self.app_module.get_course.return_value = [("Final Exam", "60%")]
+
+        first = self.client.get("/api/getcourse/?courseCode=CSSE1001&semesterId=2026S1")
+        etag = first.headers["ETag"]
+        second = self.client.get(
+            "/api/getcourse/?courseCode=CSSE1001&semesterId=2026S1",
+            headers={"If-None-Match": etag},
+        )
+
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("public", first.headers["Cache-Control"])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b"")
+        self.app_module.get_course.assert_called_once()
+        self.assertEqual(self.app_module.log_search.call_count, 2)
+
+    def test_get_course_cache_max_age_is_longer_for_finished_semesters(self):
+        from datetime import date
+
+        current = self.app_module.get_course_cache_max_age(1, 2026, today=date(2026, 4, 1))
+        finished = self.app_module.get_course_cache_max_age(1, 2026, today=date(2026, 9, 1))
+        summer = self.app_module.get_course_cache_max_age(3, 2025, today=date(2026, 2, 1))
+
+        self.assertEqual(current, 60 * 60)
+        self.assertEqual(finished, 60 * 60 * 24 * 7)
+        self.assertEqual(summer, 60 * 60)
+
     def test_get_course_returns_404_when_course_is_missing(self):
         self.app_module.get_course.side_effect = self.app_module.CourseMissingError("missing")
 
@@ -338,6 +442,103 @@ class ApiFeatureTests(unittest.TestCase):
         )
         self.app_module.log_error.assert_called_once()
 
+    def test_get_courses_resolves_stored_courses_in_one_query_and_reports_each_item(self):
+        self.app_module.get_courses_by_key.return_value = {
+            ("CSSE1001", 1, 2026): [("Final Exam", "60%")],
+        }
+        self.app_module.get_course.side_effect = self.app_module.CourseMissingError("missing")
+
+        response = self.client.post(
+            "/api/getcourses/",
+            json={
+                "courses": [
+                    {"courseCode": "csse1001", "semesterId": "2026S1"},
+                    {"courseCode": "MATH1051", "semesterId": "2025S2"},
+                    {"courseCode": "bad", "semesterId": "2026S1"},
+                ]
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.get_json()["results"],
+            [
+                {
+                    "courseCode": "CSSE1001",
+                    "semesterId": "2026S1",
+                    "success": True,
+                    "assessmentItems": [{"title": "Final Exam", "weight": "60%"}],
+                },
+                {
+                    "courseCode": "MATH1051",
+                    "semesterId": "2025S2",
+                    "success": False,
+                    "error": "",
+                    "showURLRequest": True,
+                    "status": 404,
+                },
+                {
+                    "courseCode": "BAD",
+                    "semesterId": "2026S1",
+                    "success": False,
+                    "error": "Invalid course code or semester",
+                    "status": 400,
+                },
+            ],
+        )
+        self.app_module.get_courses_by_key.assert_called_once_with(
+            [("CSSE1001", 1, 2026), ("MATH1051", 2, 2025)]
+        )
+        self.app_module.get_course.assert_called_once_with("MATH1051", "2", "2025")
+        self.app_module.log_searches.assert_called_once_with(
+            [("CSSE1001", "1", "2026")],
+            self.app_module.THIS_FOLDER,
+            self.app_module.app.config["ENABLE_LOGGING"],
+        )
+
+    def test_get_courses_fetches_at_most_one_uncached_course_per_batch(self):
+        def get_course(code, semester, year):
+            if code == "DECO2200":
+                raise self.app_module.CourseMissingError(code)
+            return [("Quiz", "10%")]
+
+        self.app_module.get_course.side_effect = get_course
+        # Recently failed courses fail fast in get_course, so they don't use up the cold fetch
+        self.app_module.cache.set(
+            self.app_module.negative_course_cache_key("DECO2200", 1, 2026), "missing"
+        )
+
+        response = self.client.post(
+            "/api/getcourses/",
+            json={
+                "courses": [
+                    {"courseCode": "MATH1051", "semesterId": "2026S1"},
+                    {"courseCode": "DECO2200", "semesterId": "2026S1"},
+                    {"courseCode": "STAT1201", "semesterId": "2026S1"},
+                ]
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()["results"]
+        self.assertTrue(results[0]["success"])
+        self.assertEqual(results[1]["status"], 404)
+        self.assertEqual(results[2]["status"], 202)
+        self.assertTrue(results[2]["fetchIndividually"])
+        self.assertEqual(
+            [call.args[0] for call in self.app_module.get_course.call_args_list],
+            ["MATH1051", "DECO2200"],
+        )
+
+    def test_get_courses_rejects_more_than_maximum_courses(self):
+        response = self.client.post("/api/getcourses/", json={"courses": [{} for _ in range(11)]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.get_json(),
+            {"success": False, "error": "Maximum 10 courses per request."},
+        )
+
     def test_get_announcement_returns_success_payload(self):
         self.app_module.get_announcement = lambda: "Maintenance tonight"
 
@@ -380,9 +581,8 @@ class ApiFeatureTests(unittest.TestCase):
         )
 
     def test_analytics_page_load_logs_only_existing_courses(self):
-        self.app_module.course_exists_for_semester_id = Mock(
-            side_effect=lambda course_code, semester_id: (course_code, semester_id)
-            in {("CSSE1001", "2026S1"), ("MATH1051", "2025S2")}
+        self.app_module.get_existing_course_keys = Mock(
+            return_value={("CSSE1001", 1, 2026), ("MATH1051", 2, 2025)}
         )
 
         response = self.client.post(
@@ -393,6 +593,7 @@ class ApiFeatureTests(unittest.TestCase):
                     {"courseCode": "math1051", "semesterId": "2025S2"},
                     {"courseCode": "bad", "semesterId": "2026S1"},
                     {"courseCode": "csse1001", "semesterId": "not-a-semester"},
+                    {"courseCode": "csse1002", "semesterId": "2026S1"},
                     "skip-me",
                 ]
             },
@@ -400,24 +601,62 @@ class ApiFeatureTests(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get_json(), {"success": True, "logged": 2})
-        self.assertEqual(self.app_module.log_search.call_count, 2)
-        self.app_module.log_search.assert_any_call(
-            "CSSE1001",
-            "1",
-            "2026",
-            self.app_module.THIS_FOLDER,
-            self.app_module.app.config["ENABLE_LOGGING"],
-            event_type="page_load",
+        self.app_module.get_existing_course_keys.assert_called_once_with(
+            [("CSSE1001", 1, 2026), ("MATH1051", 2, 2025), ("CSSE1002", 1, 2026)]
         )
-        self.app_module.log_search.assert_any_call(
-            "MATH1051",
-            "2",
-            "2025",
+        self.app_module.log_search.assert_not_called()
+        self.app_module.log_searches.assert_called_once_with(
+            [("CSSE1001", "1", "2026"), ("MATH1051", "2", "2025")],
             self.app_module.THIS_FOLDER,
             self.app_module.app.config["ENABLE_LOGGING"],
             event_type="page_load",
         )
 
+    def load_course_index(self, rows):
+        index = sys.modules["course_index"].CourseIndex(refresh_interval=3600)
+        index.app = self.app_module.app
+        fake_query = Mock()
+        fake_query.all.return_value = rows
+        original_query = self.app_module.db.session.query
+        self.app_module.db.session.query = Mock(return_value=fake_query)
+        try:
+            self.assertTrue(index.load())
+        finally:
+            self.app_module.db.session.query = original_query
+        self.app_module.course_index = index
+        return index
+
+    def test_analytics_page_load_checks_index_misses_against_the_database(self):
+        index = self.load_course_index([("CSSE1001", 1, 2026)])
+        # Stored by another worker since the index was loaded
+        self.app_module.get_existing_course_keys = Mock(return_value={("MATH1051", 2, 2025)})
+
+        response = self.client.post(
+            "/api/analytics/page-load/",
+            json={
+                "entries": [
+                    {"courseCode": "csse1001", "semesterId": "2026S1"},
+                    {"courseCode": "math1051", "semesterId": "2025S2"},
+                    {"courseCode": "csse1002", "semesterId": "2026S1"},
+                ]
+            },
+        )
+
+        self.assertEqual(response.get_json(), {"success": True, "logged": 2})
+        self.app_module.get_existing_course_keys.assert_called_once_with(
+            [("MATH1051", 2, 2025), ("CSSE1002", 1, 2026)]
+        )
+        self.assertTrue(index.contains("MATH1051", 2, 2025))
+        self.assertFalse(index.contains("CSSE1002", 1, 2026))
+
+    def test_get_course_adds_served_courses_to_the_index(self):
+        index = self.load_course_index([])
+        self.app_module.get_course = Mock(return_value=[("Exam", "100%")])
+
+        response = self.client.get("/api/getcourse/?courseCode=MATH1051&semesterId=2025S2")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(index.contains("MATH1051", 2, 2025))
 
 class AppFunctionUnitTests(unittest.TestCase):
     @classmethod
@@ -426,10 +665,14 @@ class AppFunctionUnitTests(unittest.TestCase):
 
     def setUp(self):
         self.original_proxy_url = self.app_module.COURSE_PROFILE_PROXY_URL
-        self.app_module.requests.get = Mock()
+        self.original_http_get = self.app_module.http_client.get
+        self.app_module.http_client.get = Mock()
+        self.app_module.course_index = sys.modules["course_index"].CourseIndex()
+        self.app_module.cache.clear()
 
     def tearDown(self):
         self.app_module.COURSE_PROFILE_PROXY_URL = self.original_proxy_url
+        self.app_module.http_client.get = self.original_http_get
 
     def test_is_valid_course_code_accepts_expected_format(self):
         self.assertTrue(self.app_module.is_valid_course_code("CSSE1001"))
@@ -472,6 +715,42 @@ class AppFunctionUnitTests(unittest.TestCase):
         self.app_module.db.session.query.assert_called_once_with(self.app_module.Course)
         fake_query.filter_by.assert_called_once_with(code="CSSE1001", year=2026, semester=1)
 
+    def make_loaded_course_index(self, rows):
+        index = sys.modules["course_index"].CourseIndex(refresh_interval=3600)
+        index.app = self.app_module.app
+        fake_query = Mock()
+        fake_query.all.return_value = rows
+        self.app_module.db.session.query = Mock(return_value=fake_query)
+        self.assertTrue(index.load())
+        self.app_module.db.session.query = Mock(side_effect=AssertionError("database queried"))
+        return index
+
+    def test_course_exists_for_semester_id_uses_loaded_index_without_querying_db(self):
+        self.app_module.course_index = self.make_loaded_course_index([("CSSE1001", 1, 2026)])
+
+        self.assertTrue(self.app_module.course_exists_for_semester_id("CSSE1001", "2026S1"))
+        self.assertFalse(self.app_module.course_exists_for_semester_id("CSSE1001", "2026S2"))
+        self.assertFalse(self.app_module.course_exists_for_semester_id("MATH1051", "2026S1"))
+
+        self.app_module.course_index.add("MATH1051", 1, 2026)
+        self.assertTrue(self.app_module.course_exists_for_semester_id("MATH1051", "2026S1"))
+
+    def test_course_index_keeps_courses_added_while_loading(self):
+        index = sys.modules["course_index"].CourseIndex(refresh_interval=3600)
+        index.app = self.app_module.app
+        fake_query = Mock()
+
+        def rows_after_concurrent_insert():
+            index.add("MATH1051", 2, 2025)
+            return [("CSSE1001", 1, 2026)]
+
+        fake_query.all.side_effect = rows_after_concurrent_insert
+        self.app_module.db.session.query = Mock(return_value=fake_query)
+
+        self.assertTrue(index.load())
+        self.assertEqual(index.filter_existing([("CSSE1001", 1, 2026), ("MATH1051", 2, 2025), ("BAD", 1, 2026)]),
+                         {("CSSE1001", 1, 2026), ("MATH1051", 2, 2025)})
+
     def test_is_valid_course_profile_url_accepts_normal_and_archive_urls(self):
         self.assertTrue(
             self.app_module.is_valid_course_profile_url(
@@ -541,7 +820,7 @@ class AppFunctionUnitTests(unittest.TestCase):
         result = self.app_module.fetch_course_profile_url_from_proxy("CSSE1001", "1", "2026")
 
         self.assertIsNone(result)
-        self.app_module.requests.get.assert_not_called()
+        self.app_module.http_client.get.assert_not_called()
 
     def test_fetch_course_profile_url_from_proxy_returns_valid_url_from_json_payload(self):
         self.app_module.COURSE_PROFILE_PROXY_URL = "https://proxy.example/api"
@@ -549,7 +828,7 @@ class AppFunctionUnitTests(unittest.TestCase):
         response.json.return_value = {
             "courseProfileUrl": "https://course-profiles.uq.edu.au/course-profiles/CSSE1001-123-456"
         }
-        self.app_module.requests.get.return_value = response
+        self.app_module.http_client.get.return_value = response
 
         result = self.app_module.fetch_course_profile_url_from_proxy("CSSE1001", "1", "2026")
 
@@ -557,7 +836,7 @@ class AppFunctionUnitTests(unittest.TestCase):
             result,
             "https://course-profiles.uq.edu.au/course-profiles/CSSE1001-123-456",
         )
-        self.app_module.requests.get.assert_called_once_with(
+        self.app_module.http_client.get.assert_called_once_with(
             "https://proxy.example/api",
             params={"courseCode": "CSSE1001", "semester": "2026S1"},
             timeout=10,
@@ -567,7 +846,7 @@ class AppFunctionUnitTests(unittest.TestCase):
         self.app_module.COURSE_PROFILE_PROXY_URL = "https://proxy.example/api"
         response = Mock(status_code=200)
         response.json.return_value = {"courseProfileUrl": "https://example.com/not-allowed"}
-        self.app_module.requests.get.return_value = response
+        self.app_module.http_client.get.return_value = response
 
         result = self.app_module.fetch_course_profile_url_from_proxy("CSSE1001", "1", "2026")
 
@@ -575,7 +854,7 @@ class AppFunctionUnitTests(unittest.TestCase):
 
     def test_fetch_course_profile_url_from_proxy_returns_none_for_non_200_response(self):
         self.app_module.COURSE_PROFILE_PROXY_URL = "https://proxy.example/api"
-        self.app_module.requests.get.return_value = Mock(status_code=503)
+        self.app_module.http_client.get.return_value = Mock(status_code=503)
 
         result = self.app_module.fetch_course_profile_url_from_proxy("CSSE1001", "1", "2026")
 
@@ -583,12 +862,1228 @@ class AppFunctionUnitTests(unittest.TestCase):
 
     def test_fetch_course_profile_url_from_proxy_returns_none_when_request_raises(self):
         self.app_module.COURSE_PROFILE_PROXY_URL = "https://proxy.example/api"
-        self.app_module.requests.get.side_effect = RuntimeError("network error")
+        self.app_module.http_client.get.side_effect = RuntimeError("network error")
 
         result = self.app_module.fetch_course_profile_url_from_proxy("CSSE1001", "1", "2026")
 
         self.assertIsNone(result)
 
+    def test_get_course_caches_missing_course_errors(self):
+        self.app_module.COURSE_PROFILE_PROXY_URL = ""
+        self.app_module.db.session.query = Mock(return_value=FakeQuery())
+
+        with self.assertRaises(self.app_module.CourseMissingError):
+            self.app_module.get_course("csse1001", "1", "2026")
+        with self.assertRaises(self.app_module.CourseMissingError):
+            self.app_module.get_course("CSSE1001", "1", "2026")
+
+        self.app_module.db.session.query.assert_called_once()
+
+    def test_get_course_caches_incorrect_course_profile_errors_per_section_code(self):
+        self.app_module.db.session.query = Mock(return_value=FakeQuery())
+        self.app_module.get_assessments = Mock(
+            side_effect=self.app_module.IncorrectCourseProfileError("CSSE1001", 1, 2026)
+        )
+
+        for _ in range(2):
+            with self.assertRaises(self.app_module.IncorrectCourseProfileError):
+                self.app_module.get_course("CSSE1001", "1", "2026", section_code="CSSE1001-1-1")
+
+        self.app_module.get_assessments.assert_called_once()
+
+        self.app_module.get_assessments = Mock(return_value=[("Exam", "100%")])
+        result = self.app_module.get_course("CSSE1001", "1", "2026", section_code="CSSE1001-2-2")
+
+        self.assertEqual(result, [("Exam", "100%")])
+
+    def test_get_course_coalesces_concurrent_lookups_for_the_same_course(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_scrape(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return [("Exam", "100%")]
+
+        self.app_module.db.session.query = Mock(return_value=FakeQuery())
+        self.app_module.get_assessments = Mock(side_effect=slow_scrape)
+        results = []
+
+        def lookup():
+            results.append(
+                self.app_module.get_course("CSSE1001", "1", "2026", section_code="CSSE1001-1-1")
+            )
+
+        threads = [threading.Thread(target=lookup) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(results, [[("Exam", "100%")]] * 4)
+        self.app_module.get_assessments.assert_called_once()
+        self.assertEqual(self.app_module.course_flight.in_flight(), 0)
+
+
+def load_search_log_writer_module():
+    project_root = Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(project_root))
+    fake_db_connection = types.ModuleType("db_connection")
+    fake_db_connection.db = FakeDB()
+    fake_db_connection.SearchLogs = object
+
+    original = sys.modules.get("db_connection")
+    sys.modules["db_connection"] = fake_db_connection
+    try:
+        spec = importlib.util.spec_from_file_location("search_log_writer", project_root / "search_log_writer.py")
+        module = importlib.util.module_from_spec(spec)
+        assert spec.loader is not None
+        spec.loader.exec_module(module)
+    finally:
+        if original is None:
+            sys.modules.pop("db_connection", None)
+        else:
+            sys.modules["db_connection"] = original
+    return module
+
+
+class SearchLogWriterTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = load_search_log_writer_module()
+
+    def make_writer(self, **kwargs):
+        batches = []
+        writer = self.module.SearchLogWriter(write_rows=batches.append, **kwargs)
+        self.addCleanup(writer.close)
+        return writer, batches
+
+    def wait_for(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_flushes_full_batch_with_one_write(self):
+        writer, batches = self.make_writer(batch_size=3, flush_interval=30)
+
+        writer.enqueue_many([("CSSE1001", "1", "2026"), ("MATH1051", "1", "2026")], event_type="page_load")
+        writer.enqueue("CSSE1001", "2", "2026")
+
+        self.assertTrue(self.wait_for(lambda: writer.get_stats()["written"] == 3))
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(
+            [(row["code"], row["semester"], row["year"], row["event_type"]) for row in batches[0]],
+            [("CSSE1001", 1, 2026, "page_load"), ("MATH1051", 1, 2026, "page_load"), ("CSSE1001", 2, 2026, "add")],
+        )
+        self.assertIsNone(batches[0][0]["ts"].tzinfo)
+
+    def test_flushes_partial_batch_after_interval(self):
+        writer, batches = self.make_writer(batch_size=100, flush_interval=0.1)
+
+        writer.enqueue("CSSE1001", "1", "2026")
+
+        self.assertTrue(self.wait_for(lambda: len(batches) == 1))
+        self.assertEqual(len(batches[0]), 1)
+
+    def test_drops_rows_when_queue_is_full(self):
+        release = threading.Event()
+        batches = []
+
+        def slow_write(rows):
+            release.wait(5)
+            batches.append(rows)
+
+        writer = self.module.SearchLogWriter(batch_size=1, flush_interval=30, queue_size=2, write_rows=slow_write)
+        self.addCleanup(writer.close)
+
+        self.assertTrue(writer.enqueue("CSSE1001", "1", "2026"))
+        self.assertTrue(self.wait_for(lambda: writer.get_stats()["pending"] == 0))
+        self.assertTrue(writer.enqueue("CSSE1002", "1", "2026"))
+        self.assertTrue(writer.enqueue("CSSE1003", "1", "2026"))
+        self.assertFalse(writer.enqueue("CSSE1004", "1", "2026"))
+
+        release.set()
+        writer.close()
+        self.assertEqual([row["code"] for batch in batches for row in batch], ["CSSE1001", "CSSE1002", "CSSE1003"])
+        self.assertEqual(writer.get_stats()["dropped"], 1)
+
+    def make_spool(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return sys.modules["search_spool"].SearchSpool(directory.name)
+
+    def test_spooled_rows_are_replayed_in_one_write_per_segment(self):
+        spool = self.make_spool()
+        writer, batches = self.make_writer(batch_size=100, flush_interval=30, spool=spool)
+
+        writer.enqueue_many([("CSSE1001", "1", "2026"), ("MATH1051", "2", "2025")], event_type="page_load")
+        writer.enqueue("CSSE1001", "1", "2026")
+        self.assertEqual(writer.get_stats()["spool"]["segments"], 1)
+
+        self.assertEqual(writer.flush(), 3)
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(
+            [(row["code"], row["semester"], row["year"], row["event_type"]) for row in batches[0]],
+            [("CSSE1001", 1, 2026, "page_load"), ("MATH1051", 2, 2025, "page_load"), ("CSSE1001", 1, 2026, "add")],
+        )
+        self.assertEqual(writer.get_stats()["spool"], {"segments": 0, "bytes": 0, "lag_seconds": 0.0})
+
+    def test_spooled_rows_survive_failed_writes(self):
+        spool = self.make_spool()
+        batches = []
+        failing = [True]
+
+        def write_rows(rows):
+            if failing[0]:
+                raise RuntimeError("database unavailable")
+            batches.append(rows)
+
+        writer = self.module.SearchLogWriter(batch_size=100, flush_interval=30, write_rows=write_rows, spool=spool)
+        self.addCleanup(writer.close)
+        writer.enqueue("CSSE1001", "1", "2026")
+
+        self.assertEqual(writer.flush(), 0)
+        stats = writer.get_stats()
+        self.assertEqual(stats["replay_errors"], 1)
+        self.assertEqual(stats["spool"]["segments"], 1)
+
+        failing[0] = False
+        self.assertEqual(writer.flush(), 1)
+        self.assertEqual(batches[0][0]["code"], "CSSE1001")
+
+    def test_recovers_segments_left_by_dead_processes(self):
+        spool = self.make_spool()
+        spool.directory.mkdir(parents=True, exist_ok=True)
+        (spool.directory / "active-999999999-deadbeef-000001.spool").write_text(
+            "2026-03-01T01:02:03.000000|CSSE1001|1|2026|add\n"
+            "2026-03-01T01:02:04.000000|MATH10",
+            encoding="utf-8",
+        )
+        batches = []
+        writer = self.module.SearchLogWriter(batch_size=100, flush_interval=30, write_rows=batches.append, spool=spool)
+        self.addCleanup(writer.close)
+
+        self.assertGreater(writer.get_stats()["spool"]["lag_seconds"], 0)
+        self.assertEqual(spool.recover(), 1)
+        self.assertEqual(writer.flush(), 1)
+        self.assertEqual(writer.get_stats()["malformed"], 1)
+        self.assertEqual(batches[0][0]["ts"], datetime(2026, 3, 1, 1, 2, 3))
+
+    def test_claim_skips_segments_that_vanish_after_the_glob(self):
+        spool = self.make_spool()
+        spool.append([{"ts": datetime(2026, 3, 1), "code": "CSSE1001", "semester": 1, "year": 2026, "event_type": "add"}])
+        spool.seal()
+        vanished = str(spool.directory / "ready-999999999-deadbeef-000001.spool")
+        spool_module = sys.modules["search_spool"]
+        original_glob = spool_module.glob.glob
+        spool_module.glob.glob = lambda pattern: [vanished] + original_glob(pattern)
+        try:
+            claimed = spool.claim()
+        finally:
+            spool_module.glob.glob = original_glob
+
+        self.assertTrue(claimed.name.startswith("claimed-"))
+        self.assertEqual(spool.read(claimed)[0][0]["code"], "CSSE1001")
+
+    def test_recover_skips_stray_files(self):
+        spool = self.make_spool()
+        spool.directory.mkdir(parents=True, exist_ok=True)
+        (spool.directory / "active-notes.spool").write_text("", encoding="utf-8")
+        (spool.directory / "claimed-x-y-z.spool").write_text("", encoding="utf-8")
+        (spool.directory / "active-999999999-deadbeef-000001.spool").write_text("", encoding="utf-8")
+
+        self.assertEqual(spool.recover(), 1)
+        self.assertTrue((spool.directory / "active-notes.spool").exists())
+
+    def test_flusher_keeps_running_after_spool_errors(self):
+        spool = self.make_spool()
+        original_claim = spool.claim
+        failures = [OSError("disk error")]
+
+        def claim():
+            if failures:
+                raise failures.pop()
+            return original_claim()
+
+        spool.claim = claim
+        writer, batches = self.make_writer(batch_size=1, flush_interval=0.05, spool=spool)
+
+        writer.enqueue("CSSE1001", "1", "2026")
+        self.assertTrue(self.wait_for(lambda: writer.get_stats()["flusher_errors"] == 1))
+        writer.enqueue("MATH1051", "1", "2026")
+
+        self.assertTrue(self.wait_for(lambda: writer.get_stats()["written"] == 2))
+        self.assertEqual(sorted(row["code"] for batch in batches for row in batch), ["CSSE1001", "MATH1051"])
+
+    def test_close_writes_pending_rows(self):
+        writer, batches = self.make_writer(batch_size=100, flush_interval=30)
+        writer.enqueue_many([("CSSE1001", "1", "2026"), ("MATH1051", "1", "2026")])
+
+        writer.close()
+
+        self.assertEqual(sum(len(batch) for batch in batches), 2)
+        self.assertEqual(writer.get_stats()["pending"], 0)
+
+
+class ScrapeEngineTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        project_root = Path(__file__).resolve().parents[1]
+        # Only the page fetch and parse are stubbed out, the engine itself is real
+        stub = types.ModuleType("get_assessment")
+        stub.fetch_assessment_page = lambda section_code, semester, year: (200, "")
+        stub.parse_assessment_page = lambda status_code, html, code, semester, year: []
+        original = sys.modules.get("get_assessment")
+        sys.modules["get_assessment"] = stub
+        try:
+            spec = importlib.util.spec_from_file_location("real_scrape_engine", project_root / "scrape_engine.py")
+            cls.module = importlib.util.module_from_spec(spec)
+            assert spec.loader is not None
+            spec.loader.exec_module(cls.module)
+        finally:
+            if original is None:
+                sys.modules.pop("get_assessment")
+            else:
+                sys.modules["get_assessment"] = original
+
+    def setUp(self):
+        self.module.engine = self.module.ScrapeEngine(concurrency=2)
+        self.addCleanup(setattr, self.module, "SCRAPE_TIMEOUT", self.module.SCRAPE_TIMEOUT)
+
+    def test_scrape_timeout_is_below_gunicorn_timeout(self):
+        self.assertLess(self.module.SCRAPE_TIMEOUT, 60)
+
+    def test_get_assessments_returns_parsed_items(self):
+        parsed = []
+        self.module.fetch_assessment_page = lambda section_code, semester, year: (200, f"<html>{section_code}</html>")
+
+        def parse(status_code, html, code, semester, year):
+            parsed.append((status_code, html, code, semester, year))
+            return [("Final Exam", "60%")]
+
+        self.module.parse_assessment_page = parse
+
+        result = self.module.get_assessments("CSSE1001", "2", "2026", "CSSE1001-1-2")
+
+        self.assertEqual(result, [("Final Exam", "60%")])
+        self.assertEqual(parsed, [(200, "<html>CSSE1001-1-2</html>", "CSSE1001", 2, 2026)])
+
+    def test_get_assessments_times_out(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def slow_fetch(section_code, semester, year):
+            release.wait(5)
+            return 200, ""
+
+        self.module.fetch_assessment_page = slow_fetch
+        self.module.SCRAPE_TIMEOUT = 0.05
+
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            self.module.get_assessments("CSSE1001", "2", "2026", "CSSE1001-1-2")
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_get_assessments_propagates_scrape_errors(self):
+        class CourseNotFoundError(Exception):
+            pass
+
+        self.module.fetch_assessment_page = lambda section_code, semester, year: (404, "")
+
+        def parse(status_code, html, code, semester, year):
+            raise CourseNotFoundError(code)
+
+        self.module.parse_assessment_page = parse
+
+        with self.assertRaises(CourseNotFoundError):
+            self.module.get_assessments("CSSE1001", "2", "2026", "CSSE1001-1-2")
+        # The engine keeps serving after a failed scrape
+        self.module.parse_assessment_page = lambda status_code, html, code, semester, year: []
+        self.assertEqual(self.module.get_assessments("CSSE1001", "2", "2026", "CSSE1001-1-2"), [])
+
+
+class HttpClientRetryTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        if importlib.util.find_spec("requests") is None:
+            raise unittest.SkipTest("requests is not installed in the active interpreter")
+        project_root = Path(__file__).resolve().parents[1]
+        spec = importlib.util.spec_from_file_location("real_http_client", project_root / "http_client.py")
+        cls.module = importlib.util.module_from_spec(spec)
+        assert spec.loader is not None
+        spec.loader.exec_module(cls.module)
+        cls.module.BACKOFF_FACTOR = 0
+        cls.module._session = None
+
+    def serve(self, delay=0.0, status=200):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        hits = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                hits.append(self.path)
+                time.sleep(delay)
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                return None
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_address[1]}/", hits
+
+    def test_read_timeouts_are_not_retried(self):
+        import requests
+
+        url, hits = self.serve(delay=0.5)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.module.get(url, timeout=(1, 0.1))
+        self.assertEqual(len(hits), 1)
+
+    def test_server_errors_are_retried(self):
+        url, hits = self.serve(status=503)
+        response = self.module.get(url)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(hits), self.module.MAX_RETRIES + 1)
+
+
+class WebhookDispatcherTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        if importlib.util.find_spec("requests") is None:
+            raise unittest.SkipTest("requests is not installed in the active interpreter")
+        project_root = Path(__file__).resolve().parents[1]
+        sys.path.insert(0, str(project_root))
+        spec = importlib.util.spec_from_file_location("webhook_dispatcher", project_root / "webhook_dispatcher.py")
+        cls.module = importlib.util.module_from_spec(spec)
+        assert spec.loader is not None
+        spec.loader.exec_module(cls.module)
+
+    def make_dispatcher(self, responses=None, **kwargs):
+        posts = []
+        responses = list(responses or [])
+
+        def post(url, json=None, headers=None):
+            posts.append((url, json))
+            return responses.pop(0) if responses else types.SimpleNamespace(status_code=204)
+
+        dispatcher = self.module.WebhookDispatcher(flush_interval=30, post=post, **kwargs)
+        self.addCleanup(dispatcher.close)
+        return dispatcher, posts
+
+    def test_coalesces_embeds_into_messages_within_discord_limits(self):
+        dispatcher, posts = self.make_dispatcher()
+        for i in range(12):
+            dispatcher.send("https://example.invalid/log", title=f"CSSE{1000 + i}", description="1 2026")
+        dispatcher.send("https://example.invalid/error", title="Input", description="x" * 5000, content="<@1>")
+
+        self.assertEqual(dispatcher.flush(), 3)
+        self.assertEqual([len(data["embeds"]) for url, data in posts], [10, 2, 1])
+        self.assertEqual(posts[2][1]["content"], "<@1>")
+        self.assertEqual(len(posts[2][1]["embeds"][0]["description"]), self.module.MAX_DESCRIPTION_CHARACTERS)
+
+    def test_retries_after_rate_limit(self):
+        rate_limited = types.SimpleNamespace(status_code=429, json=lambda: {"retry_after": 0}, headers={})
+        dispatcher, posts = self.make_dispatcher(responses=[rate_limited])
+        dispatcher.send("https://example.invalid/log", title="CSSE1001", description="1 2026")
+
+        self.assertEqual(dispatcher.flush(), 1)
+        self.assertEqual(len(posts), 2)
+        self.assertEqual(dispatcher.get_stats()["rate_limited"], 1)
+
+    def test_reports_dropped_embeds_when_queue_is_full(self):
+        dispatcher, posts = self.make_dispatcher(queue_size=2)
+        results = [
+            dispatcher.send("https://example.invalid/log", title=f"CSSE{1000 + i}", description="1 2026")
+            for i in range(5)
+        ]
+
+        self.assertEqual(results, [True, True, False, False, False])
+        dispatcher.flush()
+        embeds = posts[0][1]["embeds"]
+        self.assertEqual(len(embeds), 3)
+        self.assertIn("3 log messages were dropped", embeds[-1]["description"])
+
+
+def load_get_assessment_module():
+    for name in ("bs4", "lxml", "pandas", "requests"):
+        if importlib.util.find_spec(name) is None:
+            raise unittest.SkipTest(f"{name} is not installed in the active interpreter")
+
+    project_root = Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(project_root))
+    # Loaded under its own name so the fake get_assessment used by load_app_module stays intact
+    spec = importlib.util.spec_from_file_location("real_get_assessment", project_root / "get_assessment.py")
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+class AssessmentExtractionTests(unittest.TestCase):
+    FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.get_assessment = load_get_assessment_module()
+        cls.extract = importlib.import_module("assessment_extract")
+
+    def read_fixture(self, name):
+        return (self.FIXTURES / name).read_text(encoding="utf-8")
+
+    def test_course_profile_fast_path_matches_full_parser(self):
+        for name, code, semester, year in [
+            ("course_profile.html", "CSSE1001", 2, 2025),
+            ("course_profile_numeric_weights.html", "DECO2200", 3, 2025),
+        ]:
+            with self.subTest(name=name):
+                html = self.read_fixture(name)
+                expected = self.get_assessment.parse_course_profile(html, code, semester, year)
+                self.assertTrue(expected)
+                self.assertEqual(self.extract.extract_course_profile(html, code, semester, year), expected)
+
+    def test_legacy_report_fast_path_matches_full_parser(self):
+        html = self.read_fixture("legacy_report.html")
+        expected = self.get_assessment.parse_legacy_report(200, html, "CSSE2002", 1, 2023)
+        self.assertEqual(
+            self.extract.extract_legacy_report(200, html, "CSSE2002", 1, 2023),
+            expected,
+        )
+        self.assertEqual(expected[1], ("Assignment 1", "20%"))
+
+    def test_parse_assessment_page_rejects_other_semesters(self):
+        html = self.read_fixture("course_profile.html")
+        self.assertIsNone(self.extract.extract_course_profile(html, "CSSE1001", 1, 2025))
+        with self.assertRaises(self.get_assessment.IncorrectCourseProfileError):
+            self.get_assessment.parse_assessment_page(200, html, "CSSE1001", 1, 2025)
+
+    def test_parse_assessment_page_falls_back_for_unhandled_layouts(self):
+        html = self.read_fixture("legacy_report.html").replace("<td>5%</td>", '<td colspan="1">5%</td>')
+        with self.assertRaises(self.extract.ExtractionError):
+            self.extract.extract_legacy_report(200, html, "CSSE2002", 1, 2023)
+
+        self.assertEqual(
+            self.get_assessment.parse_assessment_page(200, html, "CSSE2002", 1, 2023),
+            self.get_assessment.parse_legacy_report(200, html, "CSSE2002", 1, 2023),
+        )
+
+
+def load_db_connection_module():
+    # load_app_module leaves a fake sqlalchemy in sys.modules, so set it aside while importing
+    fake_sqlalchemy = sys.modules.get("sqlalchemy")
+    if fake_sqlalchemy is not None and fake_sqlalchemy.__spec__ is None:
+        sys.modules.pop("sqlalchemy")
+    else:
+        fake_sqlalchemy = None
+
+    try:
+        for name in ("flask_sqlalchemy", "sqlalchemy"):
+            if importlib.util.find_spec(name) is None:
+                raise unittest.SkipTest(f"{name} is not installed in the active interpreter")
+
+        project_root = Path(__file__).resolve().parents[1]
+        sys.path.insert(0, str(project_root))
+        # Loaded under its own name so the fake db_connection used by load_app_module stays intact
+        spec = importlib.util.spec_from_file_location("real_db_connection", project_root / "db_connection.py")
+        module = importlib.util.module_from_spec(spec)
+        assert spec.loader is not None
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        if fake_sqlalchemy is not None:
+            sys.modules["sqlalchemy"] = fake_sqlalchemy
+
+
+class LegacyCourseQuery:
+    def __init__(self, courses):
+        self.courses = courses
+
+    def filter(self, *criteria):
+        return self
+
+    def all(self):
+        return self.courses
+
+
+class LegacyCourseSession:
+    def __init__(self, courses):
+        self.courses = courses
+        self.commits = 0
+
+    def query(self, model):
+        return LegacyCourseQuery(self.courses)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        return None
+
+
+class AssessmentJsonTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = load_db_connection_module()
+
+    def test_assessments_round_trip_through_json(self):
+        weightings = [("Assignment 1", "20%"), ("Quiz", "33.33%"), ("Final Exam", "Pass/Fail")]
+        stored = self.module.assessments_to_json(weightings)
+
+        self.assertEqual(stored[0], {"title": "Assignment 1", "weight": "20%", "weight_value": 20.0})
+        self.assertEqual(stored[1]["weight_value"], 33.33)
+        self.assertIsNone(stored[2]["weight_value"])
+        self.assertEqual(self.module.assessments_from_json(stored), weightings)
+
+    def test_backfill_converts_legacy_rows_and_skips_malformed_ones(self):
+        from flask import Flask
+
+        courses = [
+            types.SimpleNamespace(code="CSSE1001", semester=2, year=2025, asmts="[('Assignment 1', '20%'), ('Exam', '80%')]", assessments=None),
+            types.SimpleNamespace(code="MATH1051", semester=1, year=2025, asmts="[('Quiz', '10%'", assessments=None),
+            types.SimpleNamespace(code="DECO2200", semester=1, year=2025, asmts="[1, 2]", assessments=None),
+        ]
+        session = LegacyCourseSession(courses)
+        original_db = self.module.db
+        self.module.db = types.SimpleNamespace(session=session)
+        try:
+            result = self.module.backfill_course_assessments(Flask(__name__))
+        finally:
+            self.module.db = original_db
+
+        self.assertEqual(result, (1, 2))
+        self.assertEqual(session.commits, 1)
+        self.assertEqual(
+            self.module.assessments_from_json(courses[0].assessments),
+            [("Assignment 1", "20%"), ("Exam", "80%")],
+        )
+        self.assertIsNone(courses[1].assessments)
+        self.assertIsNone(courses[2].assessments)
+
+
+class CacheBackendTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        for name in ("flask", "flask_caching"):
+            if importlib.util.find_spec(name) is None:
+                raise unittest.SkipTest(f"{name} is not installed in the active interpreter")
+        project_root = Path(__file__).resolve().parents[1]
+        sys.path.insert(0, str(project_root))
+        cls.module = importlib.import_module("cache_backends")
+
+    def setUp(self):
+        from flask import Flask
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.app = Flask(__name__)
+        self.cache = self.module.NamespacedCache()
+        self.cache.init_app(self.app, config={
+            "CACHE_TYPE": "cache_backends.SQLiteStatsCache",
+            "CACHE_DEFAULT_TIMEOUT": 300,
+            "CACHE_THRESHOLD": 100,
+            "CACHE_SQLITE_PATH": str(Path(self.tmpdir.name) / "cache.sqlite"),
+        })
+
+    def test_memoize_through_sqlite_backend_counts_stats_per_function(self):
+        calls = []
+
+        @self.cache.memoize(timeout=60)
+        def course_weights(code, semester):
+            calls.append((code, semester))
+            return [("Exam", "60%")]
+
+        with self.app.app_context():
+            self.assertEqual(course_weights("CSSE1001", 2), [("Exam", "60%")])
+            self.assertEqual(course_weights("CSSE1001", 2), [("Exam", "60%")])
+            self.assertEqual(course_weights("MATH1051", 1), [("Exam", "60%")])
+
+            self.cache.set("semester_list", {"2026S2": "Semester 2 2026"})
+            self.cache.get("semester_list")
+            self.cache.get("announcement")
+
+            stats = self.cache.get_stats()
+
+        self.assertEqual(calls, [("CSSE1001", 2), ("MATH1051", 1)])
+        memoized = [namespace for namespace in stats if namespace.endswith("course_weights")]
+        self.assertEqual(len(memoized), 1)
+        self.assertEqual(stats[memoized[0]], {"hits": 1, "misses": 2})
+        self.assertEqual(stats["semester_list"], {"hits": 1, "misses": 0})
+        self.assertEqual(stats["announcement"], {"hits": 0, "misses": 1})
+
+    def test_sqlite_cache_is_shared_between_instances_and_honours_timeouts(self):
+        path = Path(self.tmpdir.name) / "shared.sqlite"
+        writer = self.module.SQLiteStatsCache(path)
+        reader = self.module.SQLiteStatsCache(path)
+
+        self.assertTrue(writer.set("course", {"weights": [1, 2]}, timeout=0))
+        self.assertTrue(writer.set("expired", "value", timeout=-1))
+        self.assertTrue(writer.add("other", 1))
+        self.assertFalse(writer.add("other", 2))
+
+        self.assertEqual(reader.get("course"), {"weights": [1, 2]})
+        self.assertIsNone(reader.get("expired"))
+        self.assertEqual(reader.get_many("course", "missing", "other"), [{"weights": [1, 2]}, None, 1])
+        self.assertTrue(reader.delete("course"))
+        self.assertFalse(writer.has("course"))
+
+
+class RecordingPartitionConnection:
+    """Answers the catalogue queries made by ensure/detach_search_log_partitions and records the rest"""
+
+    def __init__(self, partitions, stranded=()):
+        self.partitions = partitions
+        self.stranded = set(stranded)
+        self.statements = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        if "relkind = 'p'" in sql:
+            return Mock(scalar=Mock(return_value=True))
+        if "FROM pg_inherits" in sql:
+            return Mock(fetchall=Mock(return_value=[(name,) for name in self.partitions]))
+        if sql.startswith("SELECT EXISTS"):
+            return Mock(scalar=Mock(return_value=params["start"] in self.stranded))
+        self.statements.append(sql)
+        return Mock()
+
+
+class SearchLogPartitionTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = load_db_connection_module()
+
+    def run_with_connection(self, conn, func, *args, **kwargs):
+        from flask import Flask
+
+        original_db = self.module.db
+        self.module.db = types.SimpleNamespace(engine=types.SimpleNamespace(begin=lambda: conn))
+        try:
+            return func(Flask(__name__), *args, **kwargs)
+        finally:
+            self.module.db = original_db
+
+    def test_plans_monthly_partitions_across_a_year_boundary(self):
+        from datetime import date
+
+        self.assertEqual(
+            self.module.plan_search_log_partitions(date(2026, 11, 30), 2),
+            [
+                ("search_logs_2026_11", date(2026, 11, 1), date(2026, 12, 1)),
+                ("search_logs_2026_12", date(2026, 12, 1), date(2027, 1, 1)),
+                ("search_logs_2027_01", date(2027, 1, 1), date(2027, 2, 1)),
+            ],
+        )
+
+    def test_selects_partitions_whose_month_ended_before_the_cutoff(self):
+        from datetime import date
+
+        partitions = {
+            "search_logs_2025_10": date(2025, 10, 1),
+            "search_logs_2025_08": date(2025, 8, 1),
+            "search_logs_2025_09": date(2025, 9, 1),
+            "search_logs_2026_10": date(2026, 10, 1),
+        }
+        self.assertEqual(
+            self.module.search_log_partitions_to_detach(partitions, 12, date(2026, 10, 18)),
+            ["search_logs_2025_08", "search_logs_2025_09"],
+        )
+
+    def test_ensure_creates_missing_partitions_and_moves_stranded_rows(self):
+        from datetime import date
+
+        conn = RecordingPartitionConnection(["search_logs_default", "search_logs_2026_10"], stranded=[date(2026, 11, 1)])
+
+        created = self.run_with_connection(conn, self.module.ensure_search_log_partitions, 2, today=date(2026, 10, 18))
+
+        self.assertEqual(created, ["search_logs_2026_11", "search_logs_2026_12"])
+        self.assertIn("CREATE TABLE search_logs_2026_11 (LIKE search_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)", conn.statements)
+        self.assertIn(
+            "ALTER TABLE search_logs ATTACH PARTITION search_logs_2026_11 FOR VALUES FROM ('2026-11-01') TO ('2026-12-01')",
+            conn.statements,
+        )
+        self.assertIn(
+            "CREATE TABLE search_logs_2026_12 PARTITION OF search_logs FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')",
+            conn.statements,
+        )
+
+    def test_detach_drops_only_when_asked(self):
+        from datetime import date
+
+        conn = RecordingPartitionConnection(["search_logs_2025_08", "search_logs_2026_10"])
+
+        detached = self.run_with_connection(conn, self.module.detach_search_log_partitions, 12, drop=True, today=date(2026, 10, 18))
+
+        self.assertEqual(detached, ["search_logs_2025_08"])
+        self.assertEqual(
+            conn.statements,
+            ["ALTER TABLE search_logs DETACH PARTITION search_logs_2025_08", "DROP TABLE search_logs_2025_08"],
+        )
+
+
+def load_search_rollup_module():
+    # load_app_module leaves fake sqlalchemy and db_connection modules in sys.modules
+    fake_sqlalchemy = sys.modules.get("sqlalchemy")
+    if fake_sqlalchemy is not None and fake_sqlalchemy.__spec__ is None:
+        sys.modules.pop("sqlalchemy")
+    else:
+        fake_sqlalchemy = None
+    originals = {name: sys.modules.get(name) for name in ("db_connection", "flask_cache")}
+    fake_db_connection = types.ModuleType("db_connection")
+    fake_db_connection.db = FakeDB()
+    sys.modules["db_connection"] = fake_db_connection
+    fake_flask_cache = types.ModuleType("flask_cache")
+    fake_flask_cache.cache = None  # Replaced per test
+    sys.modules["flask_cache"] = fake_flask_cache
+
+    try:
+        for name in ("sqlalchemy", "cachelib"):
+            if importlib.util.find_spec(name) is None:
+                raise unittest.SkipTest(f"{name} is not installed in the active interpreter")
+        project_root = Path(__file__).resolve().parents[1]
+        sys.path.insert(0, str(project_root))
+        spec = importlib.util.spec_from_file_location("real_search_rollup", project_root / "search_rollup.py")
+        module = importlib.util.module_from_spec(spec)
+        assert spec.loader is not None
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        if fake_sqlalchemy is not None:
+            sys.modules["sqlalchemy"] = fake_sqlalchemy
+        for name, original in originals.items():
+            if original is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = original
+
+
+class FakeRollupDatabase:
+    """search_logs ids, the rollup watermark and the advisory lock, as seen by SearchRollup"""
+
+    def __init__(self):
+        self.ids = []
+        self.hours = {}  # id: Brisbane hour it is counted in, if not the current one
+        self.watermark = 0
+        self.counted = []
+        self.statements = []
+        self.advisory_lock_free = True
+
+    def connect(self):
+        return FakeRollupConnection(self)
+
+
+class FakeRollupConnection:
+    def __init__(self, database):
+        self.database = database
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def begin(self):
+        return self
+
+    def commit(self):
+        return None
+
+    def execute(self, statement, params=None):
+        database = self.database
+        sql = " ".join(str(statement).split())
+        database.statements.append(sql)
+        result = None
+        if "pg_try_advisory_lock" in sql:
+            result = database.advisory_lock_free
+        elif "MAX(id)" in sql:
+            result = max(database.ids, default=0)
+        elif "FROM rollup_watermarks" in sql:
+            result = database.watermark
+        elif "INSERT INTO search_log_hourly" in sql:
+            counted = [i for i in database.ids if params["start_id"] < i <= params["end_id"]]
+            database.counted.extend(counted)
+            current_hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+            earliest = min((database.hours.get(i, current_hour) for i in counted), default=None)
+            return Mock(one=Mock(return_value=(len(counted), earliest)))
+        elif sql.startswith("UPDATE rollup_watermarks"):
+            database.watermark = params["end_id"]
+        return Mock(scalar=Mock(return_value=result))
+
+
+class SearchRollupTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        if importlib.util.find_spec("flask") is None:
+            raise unittest.SkipTest("flask is not installed in the active interpreter")
+        cls.module = load_search_rollup_module()
+
+    def setUp(self):
+        from cachelib import SimpleCache
+        from flask import Flask
+
+        self.database = FakeRollupDatabase()
+        self.original_db = self.module.db
+        self.module.db = types.SimpleNamespace(engine=self.database)
+        self.addCleanup(setattr, self.module, "db", self.original_db)
+        self.module.cache = SimpleCache()
+        # Not init_app, so no background thread runs alongside the test
+        self.rollup = self.module.SearchRollup()
+        self.rollup.app = Flask(__name__)
+
+    def test_watermark_advances_over_new_events(self):
+        self.database.ids = [1, 2, 3]
+        self.assertEqual(self.rollup.refresh(), 3)
+        self.assertEqual(self.database.watermark, 3)
+
+        self.database.ids += [4, 5]
+        self.assertEqual(self.rollup.refresh(), 2)
+        self.assertEqual(self.database.watermark, 5)
+        self.assertEqual(self.rollup.get_stats()["events"], 5)
+
+    def test_rerunning_counts_nothing_twice(self):
+        self.database.ids = [1, 2, 3]
+        self.rollup.refresh()
+        inserts = sum("INSERT INTO search_log_hourly" in sql for sql in self.database.statements)
+
+        self.assertEqual(self.rollup.refresh(), 0)
+        self.assertEqual(self.rollup.refresh(), 0)
+
+        self.assertEqual(self.database.counted, [1, 2, 3])
+        self.assertEqual(sum("INSERT INTO search_log_hourly" in sql for sql in self.database.statements), inserts)
+        self.assertEqual(self.database.statements[-1], "SELECT pg_advisory_unlock(hashtext(:name))")
+
+    def test_late_events_for_closed_days_invalidate_dashboard_buckets(self):
+        bucket_cache = sys.modules["bucket_cache"]
+        generation = bucket_cache.get_generation(self.module.cache)
+
+        self.database.ids = [1, 2]
+        self.rollup.refresh()
+        self.assertEqual(bucket_cache.get_generation(self.module.cache), generation)
+
+        self.database.ids += [3]
+        self.database.hours[3] = datetime(2026, 3, 1, 9)
+        self.rollup.refresh()
+        self.assertNotEqual(bucket_cache.get_generation(self.module.cache), generation)
+        self.assertEqual(self.rollup.get_stats()["invalidations"], 1)
+
+    def test_skips_without_table_lock_when_another_worker_holds_the_advisory_lock(self):
+        self.database.ids = [1, 2, 3]
+        self.database.advisory_lock_free = False
+
+        self.assertEqual(self.rollup.refresh(), 0)
+
+        self.assertEqual(self.rollup.get_stats()["skipped"], 1)
+        self.assertEqual(self.database.watermark, 0)
+        self.assertFalse(any(sql.startswith("LOCK TABLE") for sql in self.database.statements))
+
+
+class BucketCacheTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        if importlib.util.find_spec("cachelib") is None:
+            raise unittest.SkipTest("cachelib is not installed in the active interpreter")
+        project_root = Path(__file__).resolve().parents[1]
+        spec = importlib.util.spec_from_file_location("bucket_cache", project_root / "bucket_cache.py")
+        cls.module = importlib.util.module_from_spec(spec)
+        assert spec.loader is not None
+        spec.loader.exec_module(cls.module)
+
+    def test_split_date_range_uses_closed_months_days_and_one_open_tail(self):
+        from datetime import date
+
+        buckets = self.module.split_date_range(date(2026, 8, 30), date(2026, 10, 18), today=date(2026, 10, 18))
+
+        self.assertEqual(buckets[0], (date(2026, 8, 30), date(2026, 8, 31), True))
+        self.assertEqual(buckets[2], (date(2026, 9, 1), date(2026, 10, 1), True))
+        self.assertEqual(buckets[3], (date(2026, 10, 1), date(2026, 10, 2), True))
+        self.assertEqual(buckets[-1], (date(2026, 10, 17), date(2026, 10, 19), False))
+        self.assertEqual(len(buckets), 2 + 1 + 16 + 1)
+        self.assertTrue(all(a.end == b.start for a, b in zip(buckets, buckets[1:])))
+
+    def test_get_bucketed_only_fetches_uncached_buckets(self):
+        from datetime import date
+        from cachelib import SimpleCache
+
+        cache = SimpleCache()
+        fetched = []
+
+        def fetch(buckets):
+            fetched.append(buckets)
+            return {bucket: (bucket.end - bucket.start).days for bucket in buckets}
+
+        today = date(2026, 10, 18)
+        first = self.module.get_bucketed(cache, "days", (2026, 2), date(2026, 9, 1), date(2026, 10, 5), fetch, today=today)
+        second = self.module.get_bucketed(cache, "days", (2026, 2), date(2026, 9, 1), date(2026, 10, 7), fetch, today=today)
+
+        self.assertEqual(sum(first), 35)
+        self.assertEqual(sum(second), 37)
+        self.assertEqual(len(fetched), 2)
+        self.assertEqual([(bucket.start, bucket.end) for bucket in fetched[1]], [
+            (date(2026, 10, 6), date(2026, 10, 7)),
+            (date(2026, 10, 7), date(2026, 10, 8)),
+        ])
+
+
+    def test_invalidate_closed_buckets_refetches_every_bucket(self):
+        from datetime import date
+        from cachelib import SimpleCache
+
+        cache = SimpleCache()
+        fetched = []
+
+        def fetch(buckets):
+            fetched.append(buckets)
+            return {bucket: 1 for bucket in buckets}
+
+        today = date(2026, 10, 18)
+        self.module.get_bucketed(cache, "days", (), date(2026, 9, 1), date(2026, 9, 30), fetch, today=today)
+        self.module.get_bucketed(cache, "days", (), date(2026, 9, 1), date(2026, 9, 30), fetch, today=today)
+        self.module.invalidate_closed_buckets(cache)
+        self.module.get_bucketed(cache, "days", (), date(2026, 9, 1), date(2026, 9, 30), fetch, today=today)
+        cache.delete(self.module.GENERATION_KEY)
+        self.module.get_bucketed(cache, "days", (), date(2026, 9, 1), date(2026, 9, 30), fetch, today=today)
+
+        self.assertEqual(len(fetched), 3)
+
+
+def load_dash_app_module():
+    # load_app_module leaves fake sqlalchemy, db_connection, flask_cache and dash_app modules in sys.modules
+    for name in ("flask_sqlalchemy", "flask_caching", "pandas", "dash", "dash_bootstrap_components", "plotly"):
+        if importlib.util.find_spec(name) is None:
+            raise unittest.SkipTest(f"{name} is not installed in the active interpreter")
+    db_connection = load_db_connection_module()
+    cache_backends = importlib.import_module("cache_backends")
+
+    fake_sqlalchemy = sys.modules.get("sqlalchemy")
+    if fake_sqlalchemy is not None and fake_sqlalchemy.__spec__ is None:
+        sys.modules.pop("sqlalchemy")
+    else:
+        fake_sqlalchemy = None
+    originals = {name: sys.modules.get(name) for name in ("db_connection", "flask_cache")}
+    sys.modules["db_connection"] = db_connection
+    fake_flask_cache = types.ModuleType("flask_cache")
+    fake_flask_cache.cache = cache_backends.NamespacedCache()
+    fake_flask_cache.get_semester_list = lambda: {}
+    fake_flask_cache.get_cached_df = lambda: None
+    sys.modules["flask_cache"] = fake_flask_cache
+
+    try:
+        project_root = Path(__file__).resolve().parents[1]
+        spec = importlib.util.spec_from_file_location("real_dash_app", project_root / "dash_app.py")
+        module = importlib.util.module_from_spec(spec)
+        assert spec.loader is not None
+        spec.loader.exec_module(module)
+        # SQLAlchemy and pandas import sqlalchemy lazily, so tests put the real one back while they run.
+        # It may be a fresh copy of the package whose submodules were imported into an earlier one.
+        real_sqlalchemy = sys.modules["sqlalchemy"]
+        for name, submodule in list(sys.modules.items()):
+            if name.count(".") == 1 and name.startswith("sqlalchemy.") and submodule is not None:
+                setattr(real_sqlalchemy, name.split(".")[1], submodule)
+        module.real_sqlalchemy = real_sqlalchemy
+        return module
+    finally:
+        if fake_sqlalchemy is not None:
+            sys.modules["sqlalchemy"] = fake_sqlalchemy
+        for name, original in originals.items():
+            if original is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = original
+
+
+class DashboardCourseCountTests(unittest.TestCase):
+    """The course rankings and statistics read from search_log_hourly, here in an in-memory SQLite database"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.module = load_dash_app_module()
+
+    def setUp(self):
+        from flask import Flask
+
+        self.addCleanup(sys.modules.__setitem__, "sqlalchemy", sys.modules["sqlalchemy"])
+        sys.modules["sqlalchemy"] = self.module.real_sqlalchemy
+        self.app = Flask(__name__)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        self.module.db.init_app(self.app)
+        self.module.cache.init_app(self.app, config={"CACHE_TYPE": "SimpleCache"})
+        self.context = self.app.app_context()
+        self.context.push()
+        self.addCleanup(self.context.pop)
+        self.module.SearchLogHourly.__table__.create(self.module.db.engine)
+
+    def seed(self, counts):
+        """counts: (Brisbane hour, code, frequency) rows for semester 1 of 2026"""
+        self.module.db.session.execute(self.module.SearchLogHourly.__table__.insert(), [
+            {"bucket": bucket, "code": code, "semester": 1, "year": 2026, "event_type": "add", "frequency": frequency}
+            for bucket, code, frequency in counts
+        ])
+        self.module.db.session.commit()
+
+    def test_most_searched_courses_are_bounded_by_the_date_range(self):
+        self.seed([
+            (datetime(2026, 3, 2, 9), "CSSE1001", 5),
+            (datetime(2026, 3, 3, 23), "MATH1051", 3),
+            (datetime(2026, 3, 4, 10), "DECO1400", 1),
+            (datetime(2026, 2, 27, 12), "DECO1400", 50),
+            (datetime(2026, 3, 5, 0), "MATH1051", 40),
+        ])
+
+        top = self.module.get_most_searched_course(start_date="2026-03-01", end_date="2026-03-04", limit=2)
+
+        self.assertEqual(list(top["code"]), ["CSSE1001", "MATH1051"])
+        self.assertEqual(list(top["frequency"]), [5, 3])
+
+    def test_selected_course_is_appended_when_outside_the_top(self):
+        self.seed([
+            (datetime(2026, 3, 2, 9), "CSSE1001", 5),
+            (datetime(2026, 3, 2, 10), "MATH1051", 3),
+            (datetime(2026, 3, 2, 11), "DECO1400", 1),
+        ])
+
+        top = self.module.get_most_searched_course(start_date="2026-03-01", end_date="2026-03-31", limit=1, code="DECO1400")
+
+        self.assertEqual(list(top["code"]), ["CSSE1001", "DECO1400"])
+        self.assertEqual(list(top["frequency"]), [5, 1])
+
+    def test_empty_range_gives_an_empty_ranking(self):
+        self.seed([(datetime(2026, 3, 2, 9), "CSSE1001", 5)])
+
+        top = self.module.get_most_searched_course(start_date="2026-04-01", end_date="2026-04-30", limit=1)
+        stats = self.module.get_course_stats(start_date="2026-04-01", end_date="2026-04-30")
+
+        self.assertTrue(top.empty)
+        self.assertEqual(list(top.columns), ["code", "frequency"])
+        self.assertEqual(stats["num_courses"], 0)
+        self.assertIsNone(stats["median"])
+        self.assertEqual(stats["top_50_share"], 0)
+
+    def test_course_stats_over_known_counts(self):
+        # 60 courses searched 1..60 times, split across two days and a month boundary
+        counts = []
+        for i in range(1, 61):
+            counts.append((datetime(2026, 3, 31, 12), f"TEST{i:04d}", i // 2))
+            counts.append((datetime(2026, 4, 1, 12), f"TEST{i:04d}", i - i // 2))
+        self.seed(counts)
+
+        stats = self.module.get_course_stats(start_date="2026-03-01", end_date="2026-04-30", limit=3, code="TEST0001")
+
+        self.assertEqual(stats["num_courses"], 60)
+        self.assertEqual(stats["median"], 30.5)
+        self.assertAlmostEqual(stats["top_50_share"], sum(range(11, 61)) / sum(range(1, 61)))
+        self.assertEqual(list(stats["top_courses"]["code"]), ["TEST0060", "TEST0059", "TEST0058", "TEST0001"])
+        self.assertEqual(list(stats["top_courses"]["frequency"]), [60, 59, 58, 1])
+
+
+class HourlySeriesTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        if importlib.util.find_spec("pandas") is None:
+            raise unittest.SkipTest("pandas is not installed in the active interpreter")
+        project_root = Path(__file__).resolve().parents[1]
+        spec = importlib.util.spec_from_file_location("timeseries_store", project_root / "timeseries_store.py")
+        cls.module = importlib.util.module_from_spec(spec)
+        assert spec.loader is not None
+        spec.loader.exec_module(cls.module)
+
+    def test_concat_series_orders_bucket_partials(self):
+        import pandas as pd
+
+        partials = [
+            pd.DataFrame({"timestamp": pd.to_datetime(["2026-10-18 09:00"]), "frequency": [2]}),
+            pd.DataFrame({"timestamp": pd.Series(dtype="datetime64[ns]"), "frequency": pd.Series(dtype="int64")}),
+            pd.DataFrame({"timestamp": pd.to_datetime(["2026-09-30 23:00", "2026-10-01 00:00"]), "frequency": [1, 3]}),
+        ]
+
+        series = self.module.concat_series(partials)
+        empty = self.module.concat_series([])
+
+        self.assertEqual(list(series["timestamp"]), list(pd.to_datetime(["2026-09-30 23:00", "2026-10-01 00:00", "2026-10-18 09:00"])))
+        self.assertEqual(list(series["frequency"]), [1, 3, 2])
+        self.assertTrue(empty.empty)
+        self.assertEqual(list(empty.columns), ["timestamp", "frequency"])
+
+    def test_resample_series_matches_date_trunc_intervals(self):
+        import pandas as pd
+
+        series = pd.DataFrame({
+            "timestamp": pd.to_datetime(["2026-09-27 23:00", "2026-09-28 01:00", "2026-10-04 12:00", "2026-10-05 00:00"]),
+            "frequency": [1, 2, 3, 4],
+        })
+
+        weekly = self.module.resample_series(series, "W")
+        monthly = self.module.resample_series(series, "M")
+
+        self.assertEqual(list(weekly["timestamp"]), list(pd.to_datetime(["2026-09-21", "2026-09-28", "2026-10-05"])))
+        self.assertEqual(list(weekly["frequency"]), [1, 5, 4])
+        self.assertEqual(list(monthly["frequency"]), [3, 7])
+
+
+class DownsampleTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        for name in ("pandas", "plotly", "dash", "dash_bootstrap_components"):
+            if importlib.util.find_spec(name) is None:
+                raise unittest.SkipTest(f"{name} is not installed in the active interpreter")
+        project_root = Path(__file__).resolve().parents[1]
+        spec = importlib.util.spec_from_file_location("analyse_search", project_root / "analyse_search.py")
+        cls.module = importlib.util.module_from_spec(spec)
+        assert spec.loader is not None
+        spec.loader.exec_module(cls.module)
+
+    def make_series(self, points=5000):
+        import numpy as np
+        import pandas as pd
+
+        frequency = np.tile([3, 5, 4, 6], points // 4)
+        frequency[points // 3] = 400
+        return pd.DataFrame({
+            "timestamp": pd.date_range("2023-02-01", periods=points, freq="h"),
+            "frequency": frequency,
+        })
+
+    def test_downsampling_keeps_budget_peaks_and_endpoints(self):
+        df = self.make_series()
+        for method in ("minmax", "lttb"):
+            with self.subTest(method=method):
+                sampled = self.module.downsample_series(df, 500, method)
+                self.assertLessEqual(len(sampled), 500)
+                self.assertIn(400, sampled["frequency"].tolist())
+                self.assertEqual(sampled["timestamp"].iloc[0], df["timestamp"].iloc[0])
+                self.assertEqual(sampled["timestamp"].iloc[-1], df["timestamp"].iloc[-1])
+                self.assertTrue(sampled["timestamp"].is_monotonic_increasing)
+
+    def test_short_series_and_zero_budget_are_unchanged(self):
+        df = self.make_series(400)
+        self.assertIs(self.module.downsample_series(df, 500), df)
+        self.assertIs(self.module.downsample_series(df, 0), df)
+
+    def test_hourly_heatmap_places_counts_by_day_and_hour(self):
+        import pandas as pd
+
+        df = pd.DataFrame({"dow": [1, 1, 0], "hour": [9, 9, 23], "frequency": [2, 3, 7]})
+        fig = self.module.gen_hourly_heatmap(df, "CSSE1001")
+        heatmap = fig.data[0]
+        self.assertEqual(list(heatmap.y), ["Sunday", "Saturday", "Friday", "Thursday", "Wednesday", "Tuesday", "Monday"])
+        self.assertEqual(heatmap.z[6][9], 5)
+        self.assertEqual(heatmap.z[0][23], 7)
+        self.assertEqual(sum(map(sum, heatmap.z)), 12)
+        self.assertIn("CSSE1001", fig.layout.title.text)
+
 
 if __name__ == "__main__":
     unittest.main()
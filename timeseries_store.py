@@ -0,0 +1,64 @@
+"""Hourly search series for the dashboard line chart.
+
+The series of searches per Brisbane-local hour is cached in the same aligned date buckets
+as the other dashboard aggregates (see bucket_cache.py). Each closed month or day is one
+cached chunk, and only the open tail and uncached chunks are queried. Only the chunks
+covering the requested range are read, so a callback costs the same however much history
+there is before it. Any interval is then a resample of the hourly series.
+"""
+import pandas as pd
+
+
+def empty_series() -> pd.DataFrame:
+    return pd.DataFrame({
+        "timestamp": pd.Series(dtype="datetime64[ns]"),
+        "frequency": pd.Series(dtype="int64"),
+    })
+
+
+def concat_series(partials: list) -> pd.DataFrame:
+    """Join per-bucket hourly series into one, oldest first.
+
+    Args:
+        partials (list[pd.DataFrame]): timestamp (hour) and frequency for each bucket
+
+    Returns:
+        pd.DataFrame: timestamp and frequency, sorted by timestamp
+    """
+    partials = [partial for partial in partials if not partial.empty]
+    if not partials:
+        return empty_series()
+    series = pd.concat(partials, ignore_index=True)[["timestamp", "frequency"]]
+    series = series.astype({"timestamp": "datetime64[ns]", "frequency": "int64"})
+    return series.sort_values("timestamp", ignore_index=True)
+
+
+def resample_series(series: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """Sum an hourly series per interval, like date_trunc.
+
+    Args:
+        series (pd.DataFrame): Hourly timestamp and frequency, already bounded to the requested range
+        interval (str): 'H', 'D', 'W' (weeks starting Monday) or 'M'
+
+    Returns:
+        pd.DataFrame: timestamp (start of each interval with searches) and frequency
+    """
+    if series.empty:
+        return empty_series()
+
+    timestamps = pd.to_datetime(series["timestamp"])
+    if interval == "H":
+        truncated = timestamps.dt.floor("h")
+    elif interval == "D":
+        truncated = timestamps.dt.floor("D")
+    elif interval == "W":
+        truncated = timestamps.dt.floor("D") - pd.to_timedelta(timestamps.dt.dayofweek, unit="D")
+    elif interval == "M":
+        truncated = timestamps.dt.to_period("M").dt.to_timestamp()
+    else:
+        raise ValueError(f"Unsupported interval: {interval}")
+
+    return (
+        series.assign(timestamp=truncated)
+        .groupby("timestamp", as_index=False)["frequency"].sum()
+    )
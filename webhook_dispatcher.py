@@ -0,0 +1,195 @@
+"""Background delivery of Discord webhook messages.
+
+Log calls queue an embed and return immediately. A dispatcher thread wakes every
+WEBHOOK_FLUSH_INTERVAL seconds. It groups queued embeds by destination and packs them
+into as few messages as Discord allows (10 embeds and 6000 characters per message).
+Messages are sent through the shared http_client session. A 429 response is retried
+after the retry_after Discord asks for. If the queue fills while Discord is slow or
+rate limiting, new embeds are dropped, and the next message to that webhook reports
+how many were lost.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+
+import http_client
+
+FLUSH_INTERVAL = float(os.getenv("WEBHOOK_FLUSH_INTERVAL", 2))
+QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", 1000))
+MAX_ATTEMPTS = 3
+MAX_RETRY_AFTER = 60
+
+# Discord webhook limits
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_MESSAGE_CHARACTERS = 6000
+MAX_TITLE_CHARACTERS = 256
+MAX_DESCRIPTION_CHARACTERS = 4096
+
+
+def truncate(text, limit: int) -> str:
+    text = str(text)
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def embed_size(embed: dict) -> int:
+    return len(embed.get("title", "")) + len(embed.get("description", ""))
+
+
+def pack_embeds(embeds: list) -> list:
+    """Split embeds into messages that fit Discord's per-message limits"""
+    messages = []
+    current, size = [], 0
+    for embed in embeds:
+        if current and (len(current) == MAX_EMBEDS_PER_MESSAGE or size + embed_size(embed) > MAX_MESSAGE_CHARACTERS):
+            messages.append(current)
+            current, size = [], 0
+        current.append(embed)
+        size += embed_size(embed)
+    if current:
+        messages.append(current)
+    return messages
+
+
+def get_retry_after(response) -> float:
+    """Seconds Discord asked us to wait, from the JSON body or the Retry-After header"""
+    try:
+        retry_after = float(response.json().get("retry_after"))
+    except Exception:
+        try:
+            retry_after = float(response.headers.get("Retry-After", 1))
+        except (TypeError, ValueError):
+            retry_after = 1.0
+    return min(max(retry_after, 0.0), MAX_RETRY_AFTER)
+
+
+class WebhookDispatcher:
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL, queue_size: int = QUEUE_SIZE, post=None):
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._post = post or http_client.post
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stopping = threading.Event()
+        self._dropped_since_report = {}
+        self._stats = {"queued": 0, "dropped": 0, "messages": 0, "rate_limited": 0, "failed": 0}
+
+    def _ensure_started(self):
+        # Start lazily, and again after a fork, since threads don't survive into gunicorn workers
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="webhook-dispatcher", daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+                atexit.register(self.close)
+
+    def send(self, url: str, title, description, content: str = "", username: str = "UQmarks", headers=None) -> bool:
+        """Queue one embed for a webhook. Returns False if it was dropped because the queue is full.
+
+        Args:
+            url (str): Webhook URL
+            title (str): Embed title
+            description (str): Embed description
+            content (str): Message text, shared by every embed coalesced into the same message
+            username (str): Name the message is posted under
+            headers (dict, optional): Request headers
+        """
+        if not url:
+            return False
+        self._ensure_started()
+        embed = {
+            "title": truncate(title, MAX_TITLE_CHARACTERS),
+            "description": truncate(description, MAX_DESCRIPTION_CHARACTERS),
+        }
+        try:
+            self._queue.put_nowait((url, username, content, headers, embed))
+        except queue.Full:
+            with self._lock:
+                self._stats["dropped"] += 1
+                self._dropped_since_report[url] = self._dropped_since_report.get(url, 0) + 1
+            return False
+        with self._lock:
+            self._stats["queued"] += 1
+        return True
+
+    def _run(self):
+        while not self._stopping.wait(self.flush_interval):
+            self.flush()
+
+    def _drain(self) -> list:
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def flush(self) -> int:
+        """Send everything queued so far from the calling thread. Returns messages sent."""
+        with self._send_lock:
+            groups = {}
+            for url, username, content, headers, embed in self._drain():
+                group = groups.setdefault((url, username, content), {"headers": headers, "embeds": []})
+                group["embeds"].append(embed)
+
+            with self._lock:
+                dropped, self._dropped_since_report = self._dropped_since_report, {}
+            for url, count in dropped.items():
+                group = groups.setdefault((url, "UQmarks", ""), {"headers": None, "embeds": []})
+                group["embeds"].append({
+                    "title": "Log messages dropped",
+                    "description": f"{count} log messages were dropped because the webhook queue was full",
+                })
+
+            sent = 0
+            for (url, username, content), group in groups.items():
+                for embeds in pack_embeds(group["embeds"]):
+                    data = {"content": content, "username": username, "embeds": embeds}
+                    if self._deliver(url, data, group["headers"]):
+                        sent += 1
+            return sent
+
+    def _deliver(self, url: str, data: dict, headers) -> bool:
+        for _ in range(MAX_ATTEMPTS):
+            try:
+                response = self._post(url, json=data, headers=headers)
+            except Exception as e:
+                print(f"Error posting to webhook: {e}")
+                break
+            if response.status_code == 429:
+                with self._lock:
+                    self._stats["rate_limited"] += 1
+                time.sleep(get_retry_after(response))
+                continue
+            if response.status_code >= 400:
+                print(f"Webhook responded with {response.status_code}")
+                break
+            with self._lock:
+                self._stats["messages"] += 1
+            return True
+
+        with self._lock:
+            self._stats["failed"] += 1
+        return False
+
+    def close(self):
+        """Stop the dispatcher thread and send whatever is still queued"""
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def get_stats(self) -> dict:
+        """Returns counters for this worker plus the current queue depth"""
+        with self._lock:
+            return {**self._stats, "pending": self._queue.qsize()}
+
+
+webhook_dispatcher = WebhookDispatcher()